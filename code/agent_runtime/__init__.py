@@ -0,0 +1,25 @@
+"""Shared runtime for the report and LinkedIn agents.
+
+The package root only exports the pieces the agents themselves import
+(admission control, the LLM scheduler and the usage ledger). The HTTP service
+lives in agent_runtime.server, the job queue in agent_runtime.jobs and the
+worker pool in agent_runtime.workers.
+"""
+
+from .admission import AdmissionController, Overloaded
+from .ledger import Budget, BudgetExceeded, UsageLedger, ledger_config
+from .scheduler import LLMScheduler, get_scheduler, llm_priority, llm_slot, scheduler_stats
+
+__all__ = [
+    "AdmissionController",
+    "Budget",
+    "BudgetExceeded",
+    "LLMScheduler",
+    "Overloaded",
+    "UsageLedger",
+    "get_scheduler",
+    "ledger_config",
+    "llm_priority",
+    "llm_slot",
+    "scheduler_stats",
+]
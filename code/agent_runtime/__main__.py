@@ -0,0 +1,37 @@
+"""Run the agent service.
+
+    cd code && python -m agent_runtime --port 8080 --max-active 8 --max-queue 32
+"""
+
+import argparse
+import logging
+
+from aiohttp import web
+
+from linkedin_agent.limits import configure_limits
+
+from .jobs import JobStore
+from .server import create_app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HTTP service for the report and LinkedIn agents")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-active", type=int, default=8, help="Agent runs executing at once")
+    parser.add_argument("--max-queue", type=int, default=32, help="Runs waiting for a slot before 429s")
+    parser.add_argument("--queue-timeout", type=float, default=None, help="Seconds a run may wait before a 429")
+    parser.add_argument("--llm-concurrency", type=int, default=None, help="Shared limit on in-flight LLM calls")
+    parser.add_argument("--search-concurrency", type=int, default=None, help="Shared limit on in-flight searches")
+    parser.add_argument("--jobs-db", default=None, help="Job database to expose under /v1/jobs (see agent_runtime.jobs)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    configure_limits(args.llm_concurrency, args.search_concurrency)
+    jobs = JobStore(args.jobs_db) if args.jobs_db else None
+    app = create_app(args.max_active, args.max_queue, args.queue_timeout, jobs)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Admission control for agent runs.
+
+At most `max_active` runs execute at once and at most `max_queue` more wait
+for a slot. Anything beyond that is rejected straight away with Overloaded,
+so an overloaded server answers 429 in microseconds instead of piling up
+requests that would time out anyway.
+"""
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+# Weight of the latest run in the moving average of run durations
+_EWMA_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """Raised when a run cannot be admitted. `retry_after` is a hint in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Server overloaded, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class Run:
+    """An admitted run. Call `fail()` when it failed without raising, e.g. after an
+    error response was already sent, so it is not counted as completed."""
+
+    def __init__(self) -> None:
+        self.failed = False
+
+    def fail(self) -> None:
+        self.failed = True
+
+
+class AdmissionController:
+    """Bounded concurrency plus a bounded wait queue."""
+
+    def __init__(self, max_active: int = 8, max_queue: int = 32, queue_timeout: float | None = None):
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.mean_run_seconds = 0.0
+        self._slots = asyncio.Semaphore(max_active)
+
+    def retry_after(self) -> int:
+        """Rough seconds until a queue slot frees up, from the average run duration."""
+        backlog = (self.queued + 1) / self.max_active
+        return max(1, math.ceil(backlog * self.mean_run_seconds))
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[Run]:
+        """Hold a run slot, waiting in the queue if needed; raises Overloaded when full.
+
+        Only runs that complete feed the average run duration behind Retry-After.
+        """
+        if self.active >= self.max_active and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded(self.retry_after())
+
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise Overloaded(self.retry_after()) from None
+        finally:
+            self.queued -= 1
+
+        self.active += 1
+        self.admitted += 1
+        start = time.perf_counter()
+        run = Run()
+        try:
+            yield run
+        except BaseException:
+            self.failed += 1
+            raise
+        else:
+            if run.failed:
+                self.failed += 1
+                return
+            self.completed += 1
+            seconds = time.perf_counter() - start
+            self.mean_run_seconds = (
+                seconds if self.completed == 1 else (1 - _EWMA_ALPHA) * self.mean_run_seconds + _EWMA_ALPHA * seconds
+            )
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "max_active": self.max_active,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "mean_run_seconds": round(self.mean_run_seconds, 3),
+        }
@@ -0,0 +1,72 @@
+"""The agents the runtime can run, keyed by name, and how to start a run from a JSON body."""
+
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable
+
+from docgen_agent.agent import AgentState, Report
+from docgen_agent.events import stream_report_events
+from linkedin_agent.batch import abuild_state, row_prompt
+from linkedin_agent.events import stream_post_events
+
+from .cassette import maybe_record
+from .ledger import Budget, UsageLedger, ledger_config
+
+EventStream = Callable[[dict[str, Any]], AsyncIterator[dict[str, Any]]]
+
+
+def _ledger(body: dict[str, Any]) -> UsageLedger:
+    """A ledger for one run, with the body's optional "budget" overriding the environment's."""
+    budget = body.get("budget")
+    if budget is None:
+        return UsageLedger()
+    if not isinstance(budget, dict):
+        raise ValueError("'budget' must be an object with max_tokens, max_cost and/or on_exceed")
+    return UsageLedger(Budget(**{**vars(Budget.from_env()), **budget}))
+
+
+def report_events(body: dict[str, Any]) -> AsyncIterator[dict[str, Any]]:
+    """Start a report run. Raises ValueError for an invalid body."""
+    if not body.get("topic") or not body.get("report_structure"):
+        raise ValueError("'topic' and 'report_structure' are required")
+    # A previous run's "report_plan" turns the run into an update of that report
+    previous_plan = Report.model_validate(body["previous_plan"]) if body.get("previous_plan") else None
+    return stream_report_events(
+        AgentState(topic=body["topic"], report_structure=body["report_structure"], previous_plan=previous_plan),
+        ledger_config(_ledger(body)),
+    )
+
+
+def post_events(body: dict[str, Any]) -> AsyncIterator[dict[str, Any]]:
+    """Start a LinkedIn post run. Raises ValueError for an invalid body."""
+    row = {"id": "http", **body}
+    row_prompt(row)
+    config = ledger_config(_ledger(body))
+
+    async def events() -> AsyncIterator[dict[str, Any]]:
+        # Image ingest happens once the run is admitted, in the image process pool
+        state = await abuild_state(row)
+        async with aclosing(stream_post_events(state, config)) as stream:
+            async for event in stream:
+                yield event
+
+    return events()
+
+
+def _recordable(name: str, events_for: EventStream) -> EventStream:
+    # With CASSETTE_DIR set, each run's model and search traffic is recorded
+    return lambda body: maybe_record(name, body, events_for(body))
+
+
+AGENTS: dict[str, EventStream] = {
+    "reports": _recordable("reports", report_events),
+    "linkedin": _recordable("linkedin", post_events),
+}
+
+
+async def run_to_completion(events: AsyncIterator[dict[str, Any]]) -> dict[str, Any] | None:
+    """Drain a run's events and return its final `done` event."""
+    done = None
+    async for event in events:
+        if event["type"] == "done":
+            done = event
+    return done
@@ -0,0 +1,413 @@
+"""
+Record and replay of model and search traffic.
+
+While a Recorder is active, every ChatNVIDIA call (plain or streamed) and
+every Tavily search made by the run is written to a cassette: a JSON-lines
+file (gzip-compressed when the name ends in .gz) holding each request's key,
+the full response and the latency observed. While a Player is active, the same
+calls are answered from a cassette instead of the network, sleeping for the
+recorded latency times `speed` (1 = real time, 0 = as fast as possible).
+
+Requests are matched on a hash of the model, its parameters, bound tools and
+messages (or the search query and options). A request the cassette does not
+contain, which happens once a new build changes a prompt, gets the next unused
+response recorded for the same model and kind, and counts as a fuzzy match.
+With nothing left to serve, the call fails with CassetteMiss. Nothing is ever
+sent to the network during a replay.
+
+Recorders and players are per run (a context variable), so a server can record
+each request into its own cassette. Set CASSETTE_DIR to do that for every run
+the service or the job workers execute. The command line that records, replays
+and compares single runs lives in agent_runtime/traffic.py.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterator
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.messages.utils import message_chunk_to_message
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_nvidia_ai_endpoints import ChatNVIDIA
+from tavily import AsyncTavilyClient
+
+from .response_cache import no_response_cache
+from .source_index import no_source_index
+
+_LOGGER = logging.getLogger(__name__)
+
+CASSETTE_DIR = os.getenv("CASSETTE_DIR")
+_FORMAT_VERSION = 1
+_STREAM_PIECE = 16  # characters per replayed stream chunk
+# Search options that do not change the answer
+_SEARCH_TRANSPORT_OPTIONS = ("timeout",)
+
+
+class CassetteMiss(RuntimeError):
+    """A replayed run made a request the cassette has no response left for."""
+
+
+def _message_record(message: BaseMessage) -> dict[str, Any]:
+    """What identifies a request message: its role, text, tool calls and tool results."""
+    return {
+        "type": message.type,
+        "content": message.content,
+        "name": getattr(message, "name", None),
+        "tool_calls": [
+            {"name": call["name"], "args": call["args"], "id": call.get("id")}
+            for call in getattr(message, "tool_calls", None) or []
+        ],
+        "tool_call_id": getattr(message, "tool_call_id", None),
+    }
+
+
+def _model_params(model: ChatNVIDIA, stop: Any, kwargs: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "model": model.model,
+        "temperature": getattr(model, "temperature", None),
+        "top_p": getattr(model, "top_p", None),
+        "max_tokens": getattr(model, "max_tokens", None),
+        "stop": stop,
+        **kwargs,
+    }
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+
+def llm_request_key(model: ChatNVIDIA, messages: list[BaseMessage], stop: Any, kwargs: dict[str, Any]) -> str:
+    return _digest({"params": _model_params(model, stop, kwargs), "messages": [_message_record(m) for m in messages]})
+
+
+def search_request_key(query: str, options: dict[str, Any]) -> str:
+    return _digest({"query": query, **{k: v for k, v in options.items() if k not in _SEARCH_TRANSPORT_OPTIONS}})
+
+
+def _preview(messages: list[BaseMessage], limit: int = 160) -> str:
+    text = str(messages[-1].content) if messages else ""
+    return text[:limit]
+
+
+def _response_record(message: BaseMessage) -> dict[str, Any]:
+    if isinstance(message, AIMessageChunk):
+        message = message_chunk_to_message(message)
+    return message_to_dict(message)
+
+
+def _stream_chunks(message: AIMessage) -> Iterator[ChatGenerationChunk]:
+    """Split a recorded answer back into stream chunks, tool calls and usage last."""
+    text = message.content if isinstance(message.content, str) else ""
+    for start in range(0, len(text), _STREAM_PIECE):
+        yield ChatGenerationChunk(message=AIMessageChunk(content=text[start:start + _STREAM_PIECE], id=message.id))
+    yield ChatGenerationChunk(message=AIMessageChunk(
+        content="" if text else message.content,
+        id=message.id,
+        tool_call_chunks=[
+            {"name": call["name"], "args": json.dumps(call["args"]), "id": call.get("id"), "index": index}
+            for index, call in enumerate(message.tool_calls)
+        ],
+        usage_metadata=message.usage_metadata,
+        response_metadata=message.response_metadata,
+    ))
+
+
+class Recorder:
+    """Collects the traffic of one run."""
+
+    def __init__(self, meta: dict[str, Any] | None = None):
+        self.meta = meta or {}
+        self.entries: list[dict[str, Any]] = []
+        self.result: dict[str, Any] | None = None
+        self.started = time.perf_counter()
+        self.finished: float | None = None
+        self._lock = threading.Lock()
+
+    def add(self, entry: dict[str, Any]) -> None:
+        with self._lock:
+            self.entries.append(entry)
+
+    def save(self, path: str | Path) -> Path:
+        """Write the cassette: a header line, one line per call, then the run's result."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        wall = (self.finished or time.perf_counter()) - self.started
+        lines = [{"kind": "header", "version": _FORMAT_VERSION, "recorded_at": time.time(), "wall": round(wall, 4), **self.meta}]
+        lines += sorted(self.entries, key=lambda entry: entry["t"])
+        if self.result is not None:
+            lines.append({"kind": "result", "done": self.result})
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "wt", encoding="utf-8") as f:
+            for line in lines:
+                f.write(json.dumps(line, ensure_ascii=False, separators=(",", ":"), default=str) + "\n")
+        return path
+
+
+def load_cassette(path: str | Path) -> tuple[dict[str, Any], list[dict[str, Any]], dict[str, Any] | None]:
+    """Return (header, call entries, result) of a cassette file."""
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    header = next((line for line in lines if line["kind"] == "header"), {})
+    if header.get("version", _FORMAT_VERSION) != _FORMAT_VERSION:
+        raise ValueError(f"Unsupported cassette version {header.get('version')} in {path}")
+    result = next((line["done"] for line in lines if line["kind"] == "result"), None)
+    return header, [line for line in lines if line["kind"] in ("llm", "search")], result
+
+
+class Player:
+    """Serves a run's calls from a recorded cassette."""
+
+    def __init__(self, entries: list[dict[str, Any]], speed: float = 1.0, recorder: Recorder | None = None):
+        self.entries = entries
+        self.speed = speed
+        # A replay can record what the new build did, for comparison with the original
+        self.recorder = recorder
+        self._exact: dict[str, deque[int]] = {}
+        self._similar: dict[tuple[str, str], deque[int]] = {}
+        for index, entry in enumerate(entries):
+            self._exact.setdefault(entry["key"], deque()).append(index)
+            self._similar.setdefault((entry["kind"], entry.get("model", "")), deque()).append(index)
+        self._used: set[int] = set()
+        self._lock = threading.Lock()
+        self.exact = self.fuzzy = self.missed = 0
+
+    def take(self, kind: str, key: str, model: str = "") -> tuple[dict[str, Any], bool]:
+        """The recorded entry for a request, and whether it matched exactly."""
+        with self._lock:
+            for queue, exact in ((self._exact.get(key), True), (self._similar.get((kind, model)), False)):
+                while queue:
+                    index = queue.popleft()
+                    if index not in self._used:
+                        self._used.add(index)
+                        if exact:
+                            self.exact += 1
+                        else:
+                            self.fuzzy += 1
+                        return self.entries[index], exact
+            self.missed += 1
+        raise CassetteMiss(f"No recorded {kind} response left for {model or 'request'} {key}")
+
+    async def wait(self, seconds: float) -> None:
+        if self.speed > 0 and seconds > 0:
+            await asyncio.sleep(seconds * self.speed)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "exact": self.exact,
+            "fuzzy": self.fuzzy,
+            "missed": self.missed,
+            "unused": len(self.entries) - len(self._used),
+        }
+
+
+_active: ContextVar[Recorder | Player | None] = ContextVar("cassette", default=None)
+
+
+def _recorder() -> Recorder | None:
+    active = _active.get()
+    return active.recorder if isinstance(active, Player) else active
+
+
+@contextmanager
+def recording(recorder: Recorder) -> Iterator[Recorder]:
+    """Record the calls made in this block (and the tasks it starts) into `recorder`."""
+    install()
+    token = _active.set(recorder)
+    try:
+        # Answers replayed from the response cache or the source index are not traffic,
+        # so go to the endpoint
+        with no_response_cache(), no_source_index():
+            yield recorder
+    finally:
+        recorder.finished = time.perf_counter()
+        _reset(token)
+
+
+@contextmanager
+def replaying(player: Player) -> Iterator[Player]:
+    """Serve the calls made in this block from `player`'s cassette."""
+    install()
+    token = _active.set(player)
+    try:
+        with no_response_cache(), no_source_index():
+            yield player
+    finally:
+        if player.recorder:
+            player.recorder.finished = time.perf_counter()
+        _reset(token)
+
+
+def _reset(token) -> None:
+    try:
+        _active.reset(token)
+    except ValueError:
+        pass  # an async generator finalized from another context; that context ends with it
+
+
+# --- Patched client methods ---------------------------------------------------
+
+_original: dict[str, Any] = {}
+
+
+async def _agenerate(self: ChatNVIDIA, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+    active = _active.get()
+    if active is None:
+        return await _original["_agenerate"](self, messages, stop, run_manager, **kwargs)
+
+    key = llm_request_key(self, messages, stop, kwargs)
+    start = time.perf_counter()
+    if isinstance(active, Player):
+        entry, exact = active.take("llm", key, self.model)
+        await active.wait(entry["latency"])
+        message = messages_from_dict([entry["response"]])[0]
+        result = ChatResult(generations=[ChatGeneration(message=message)])
+    else:
+        entry, exact = None, True
+        result = await _original["_agenerate"](self, messages, stop, run_manager, **kwargs)
+
+    recorder = _recorder()
+    if recorder:
+        recorder.add({
+            "kind": "llm", "key": key, "model": self.model, "stream": False,
+            "t": round(start - recorder.started, 4), "latency": round(time.perf_counter() - start, 4),
+            "messages": len(messages), "prompt": _preview(messages),
+            "response": _response_record(result.generations[0].message),
+            **({"matched": "exact" if exact else "fuzzy"} if entry else {}),
+        })
+    return result
+
+
+async def _astream(self: ChatNVIDIA, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+    active = _active.get()
+    if active is None:
+        async for chunk in _original["_astream"](self, messages, stop, run_manager, **kwargs):
+            yield chunk
+        return
+
+    key = llm_request_key(self, messages, stop, kwargs)
+    start = time.perf_counter()
+    first_token: float | None = None
+    aggregate: ChatGenerationChunk | None = None
+    entry, exact = None, True
+
+    if isinstance(active, Player):
+        entry, exact = active.take("llm", key, self.model)
+        chunks = list(_stream_chunks(messages_from_dict([entry["response"]])[0]))
+        ttft = entry.get("ttft") or entry["latency"]
+        await active.wait(ttft)
+        # Spread the rest of the recorded latency over the chunks
+        gap = max(entry["latency"] - ttft, 0.0) / max(len(chunks) - 1, 1)
+        for index, chunk in enumerate(chunks):
+            if index:
+                await active.wait(gap)
+            first_token = first_token or time.perf_counter()
+            if run_manager and chunk.text:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            aggregate = chunk if aggregate is None else aggregate + chunk
+            yield chunk
+    else:
+        async for chunk in _original["_astream"](self, messages, stop, run_manager, **kwargs):
+            first_token = first_token or time.perf_counter()
+            aggregate = chunk if aggregate is None else aggregate + chunk
+            yield chunk
+
+    recorder = _recorder()
+    if recorder and aggregate is not None:
+        recorder.add({
+            "kind": "llm", "key": key, "model": self.model, "stream": True,
+            "t": round(start - recorder.started, 4), "latency": round(time.perf_counter() - start, 4),
+            "ttft": round((first_token or start) - start, 4),
+            "messages": len(messages), "prompt": _preview(messages),
+            "response": _response_record(aggregate.message),
+            **({"matched": "exact" if exact else "fuzzy"} if entry else {}),
+        })
+
+
+async def _search(self: AsyncTavilyClient, query: str, **kwargs) -> dict:
+    active = _active.get()
+    if active is None:
+        return await _original["search"](self, query, **kwargs)
+
+    key = search_request_key(query, kwargs)
+    start = time.perf_counter()
+    if isinstance(active, Player):
+        entry, exact = active.take("search", key)
+        await active.wait(entry["latency"])
+        response = entry["response"]
+    else:
+        entry, exact = None, True
+        response = await _original["search"](self, query, **kwargs)
+
+    recorder = _recorder()
+    if recorder:
+        recorder.add({
+            "kind": "search", "key": key, "query": query,
+            "options": {k: v for k, v in kwargs.items() if k not in _SEARCH_TRANSPORT_OPTIONS},
+            "t": round(start - recorder.started, 4), "latency": round(time.perf_counter() - start, 4),
+            "response": response,
+            **({"matched": "exact" if exact else "fuzzy"} if entry else {}),
+        })
+    return response
+
+
+def _available_models(self: ChatNVIDIA) -> list:
+    # with_structured_output lists a self-hosted endpoint's models; only to decide whether to warn
+    if isinstance(_active.get(), Player):
+        return []
+    return _original["available_models"](self)
+
+
+def install() -> None:
+    """Route ChatNVIDIA and Tavily calls through the cassette hooks (idempotent).
+
+    Outside a recording or replay the hooks call straight through.
+    """
+    if _original:
+        return
+    _original.update(
+        _agenerate=ChatNVIDIA._agenerate,
+        _astream=ChatNVIDIA._astream,
+        available_models=ChatNVIDIA.available_models.fget,
+        search=AsyncTavilyClient.search,
+    )
+    ChatNVIDIA._agenerate = _agenerate
+    ChatNVIDIA._astream = _astream
+    ChatNVIDIA.available_models = property(_available_models)
+    AsyncTavilyClient.search = _search
+
+
+async def record_events(
+    agent: str, body: dict[str, Any], events: AsyncIterator[dict[str, Any]], path: Path
+) -> AsyncIterator[dict[str, Any]]:
+    """Pass a run's events through while recording its traffic; the cassette is written when the run ends."""
+    recorder = Recorder({"agent": agent, "body": body})
+    try:
+        with recording(recorder):
+            async for event in events:
+                if event["type"] == "done":
+                    recorder.result = event
+                yield event
+    finally:
+        await asyncio.to_thread(recorder.save, path)
+        _LOGGER.info("📼 Recorded %d calls to %s", len(recorder.entries), path)
+
+
+def maybe_record(agent: str, body: dict[str, Any], events: AsyncIterator[dict[str, Any]]) -> AsyncIterator[dict[str, Any]]:
+    """Record the run into CASSETTE_DIR if it is set, otherwise return its events unchanged."""
+    if not CASSETTE_DIR:
+        return events
+    path = Path(CASSETTE_DIR).expanduser() / f"{agent}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.jsonl.gz"
+    return record_events(agent, body, events, path)
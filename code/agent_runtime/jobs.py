@@ -0,0 +1,215 @@
+"""
+Durable job queue for report and post runs.
+
+Jobs live in a SQLite database in WAL mode, so any number of worker
+processes on one machine can share it while readers never block writers.
+A worker claims a job by taking a lease on it and keeps the lease alive with
+heartbeats while the run is in progress. If a worker dies, its lease expires
+and the job is handed to another worker (at-least-once delivery) until it
+has been attempted `max_attempts` times. Finished runs write their final
+`done` event to the results table.
+
+The worker pool and command line live in workers.py.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from linkedin_agent.metrics import percentile
+
+_LOGGER = logging.getLogger(__name__)
+
+JOBS_DB = Path(os.getenv("AGENT_JOBS_DB", "~/.cache/agent_runtime/jobs.sqlite3")).expanduser()
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, enqueued_at);
+CREATE TABLE IF NOT EXISTS results (
+    job_id TEXT PRIMARY KEY REFERENCES jobs (id),
+    result TEXT NOT NULL
+);
+"""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    payload: dict[str, Any]
+    attempts: int
+    max_attempts: int
+
+
+class JobStore:
+    """SQLite job table plus result store. Safe to share between threads and processes."""
+
+    def __init__(self, path: Path = JOBS_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit mode; claims and completions open their own IMMEDIATE transactions
+        self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _write(self, sql: str, params: tuple = ()) -> int:
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount
+
+    def enqueue(self, kind: str, payload: dict[str, Any], max_attempts: int = JOB_MAX_ATTEMPTS) -> str:
+        """Add a job and return its id."""
+        job_id = uuid.uuid4().hex
+        self._write(
+            "INSERT INTO jobs (id, kind, payload, max_attempts, enqueued_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(payload), max_attempts, time.time()),
+        )
+        return job_id
+
+    def claim(self, worker: str, lease_seconds: float = JOB_LEASE_SECONDS, kinds: list[str] | None = None) -> Job | None:
+        """Lease the oldest runnable job: queued, or running with an expired lease."""
+        now = time.time()
+        kind_filter = f"AND kind IN ({', '.join('?' * len(kinds))})" if kinds else ""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._fail_exhausted(now)
+                row = self._conn.execute(
+                    f"""SELECT * FROM jobs
+                        WHERE (status = 'queued' OR (status = 'running' AND lease_expires < ?)) {kind_filter}
+                        ORDER BY enqueued_at LIMIT 1""",
+                    (now, *(kinds or ())),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                if row["status"] == "running":
+                    _LOGGER.warning("⏰ Lease on job %s expired (owner %s), reclaiming", row["id"], row["lease_owner"])
+                self._conn.execute(
+                    """UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?,
+                       lease_expires = ?, started_at = ? WHERE id = ?""",
+                    (worker, now + lease_seconds, now, row["id"]),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return Job(row["id"], row["kind"], json.loads(row["payload"]), row["attempts"] + 1, row["max_attempts"])
+
+    def _fail_exhausted(self, now: float) -> None:
+        # Expired leases on jobs that used up their attempts are never retried
+        self._conn.execute(
+            """UPDATE jobs SET status = 'failed', finished_at = ?, lease_owner = NULL,
+               error = COALESCE(error, 'lease expired on final attempt')
+               WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts""",
+            (now, now),
+        )
+
+    def heartbeat(self, job_id: str, worker: str, lease_seconds: float = JOB_LEASE_SECONDS) -> bool:
+        """Extend a lease. False means the worker lost the job to someone else."""
+        return self._write(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+            (time.time() + lease_seconds, job_id, worker),
+        ) == 1
+
+    def complete(self, job_id: str, worker: str, result: dict[str, Any] | None) -> bool:
+        """Store a job's result and mark it succeeded, if the worker still holds the lease."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                updated = self._conn.execute(
+                    """UPDATE jobs SET status = 'succeeded', finished_at = ?, lease_owner = NULL, error = NULL
+                       WHERE id = ? AND lease_owner = ? AND status = 'running'""",
+                    (time.time(), job_id, worker),
+                ).rowcount
+                if updated:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO results (job_id, result) VALUES (?, ?)",
+                        (job_id, json.dumps(result, default=str)),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return bool(updated)
+
+    def fail(self, job_id: str, worker: str, error: str, retry: bool = True) -> bool:
+        """Record a failed attempt: requeue the job, or fail it for good on its last attempt (or if not `retry`)."""
+        final = "NOT ? OR attempts >= max_attempts"
+        return self._write(
+            f"""UPDATE jobs SET
+                   status = CASE WHEN {final} THEN 'failed' ELSE 'queued' END,
+                   finished_at = CASE WHEN {final} THEN ? ELSE NULL END,
+                   lease_owner = NULL, lease_expires = NULL, error = ?
+               WHERE id = ? AND lease_owner = ? AND status = 'running'""",
+            (retry, retry, time.time(), error, job_id, worker),
+        ) == 1
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        """A job's status row, with its result once it succeeded."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT jobs.*, results.result FROM jobs LEFT JOIN results ON results.job_id = jobs.id WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def stats(self, window: float = 3600) -> dict[str, Any]:
+        """Queue depth by status, plus throughput and latency percentiles over the last `window` seconds."""
+        now = time.time()
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            finished = self._conn.execute(
+                """SELECT enqueued_at, started_at, finished_at FROM jobs
+                   WHERE status = 'succeeded' AND finished_at >= ?""",
+                (now - window,),
+            ).fetchall()
+
+        latencies = [row["finished_at"] - row["enqueued_at"] for row in finished]
+        run_times = [row["finished_at"] - row["started_at"] for row in finished]
+        span = max(row["finished_at"] for row in finished) - min(row["started_at"] for row in finished) if finished else 0
+        return {
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "succeeded": counts.get("succeeded", 0),
+            "failed": counts.get("failed", 0),
+            "throughput_per_min": len(finished) / span * 60 if span else 0.0,
+            "latency_p50": percentile(latencies, 50),
+            "latency_p95": percentile(latencies, 95),
+            "latency_p99": percentile(latencies, 99),
+            "run_p50": percentile(run_times, 50),
+            "run_p95": percentile(run_times, 95),
+        }
@@ -0,0 +1,366 @@
+"""
+Tolerant JSON extraction from model replies.
+
+Models asked for JSON often answer with something close to it: the object
+wrapped in a ```json fence or in prose, a trailing comma, single-quoted
+strings, Python literals, a missing comma between fields, or a reply cut off
+by the token limit. A strict parser turns each of these into a retry (a full
+model round trip) or into fallback data. `extract_json` recovers the value
+instead:
+
+    critique = extract_json(reply, CRITIQUE_SCHEMA, site="critique")
+    plan = extract_json(reply, Report, site="report_planner", retried=True)
+
+It takes the first fenced block or the first JSON value in the text, repairs
+it while scanning (closing whatever a truncated reply left open), and with a
+schema (a JSON schema dict or a pydantic model) coerces the result: field
+names matched case-insensitively, "8/10" read as a number, a lone value
+wrapped in a list, missing strings and lists filled in empty (for pydantic
+and retried schemas only below the top level, so a reply cut off before a
+required field is rejected). A pydantic schema returns a validated
+instance. Each call is counted per site. A reply that only parsed because of
+the repair counts as a retry avoided at sites that ask the model again on
+failure (`retried=True`), and as a fallback avoided at sites that fall back
+to default data.
+"""
+
+import json
+import re
+import threading
+from typing import Any, Iterator
+
+from pydantic import BaseModel, ValidationError
+
+from .summary import summary_line
+
+_FENCE = re.compile(r"```[a-zA-Z]*[ \t]*\n?(.*?)(?:```|$)", re.DOTALL)
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_\-]*")
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?")
+_LITERALS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null"}
+_MAX_STARTS = 20  # opening brackets tried before giving up on a reply
+
+_MISSING = object()
+_LOCK = threading.Lock()
+_STATS: dict[str, dict[str, int]] = {}
+_RETRIED_SITES: set[str] = set()
+
+
+def _record(site: str, outcome: str, retried: bool) -> None:
+    with _LOCK:
+        counts = _STATS.setdefault(site, {"parsed": 0, "repaired": 0, "failed": 0})
+        counts[outcome] += 1
+        if retried:
+            _RETRIED_SITES.add(site)
+
+
+def json_repair_stats() -> dict[str, Any]:
+    """Per-site counts of replies parsed as-is, repaired and lost, and the retries and
+    fallbacks the repairs avoided."""
+    with _LOCK:
+        sites = {site: dict(counts) for site, counts in _STATS.items()}
+        retried = set(_RETRIED_SITES)
+    return {
+        "sites": sites,
+        "retries_avoided": sum(counts["repaired"] for site, counts in sites.items() if site in retried),
+        "fallbacks_avoided": sum(counts["repaired"] for site, counts in sites.items() if site not in retried),
+    }
+
+
+
+@summary_line
+def json_repair_summary() -> str | None:
+    repairs = json_repair_stats()
+    if not (repairs["retries_avoided"] or repairs["fallbacks_avoided"]):
+        return None
+    return (
+        f"JSON replies repaired: {repairs['retries_avoided']} retries and "
+        f"{repairs['fallbacks_avoided']} fallbacks avoided; " + ", ".join(
+            f"{site} {counts['repaired']}/{sum(counts.values())}" for site, counts in repairs["sites"].items()
+        )
+    )
+
+
+def reset_json_repair_stats() -> None:
+    with _LOCK:
+        _STATS.clear()
+        _RETRIED_SITES.clear()
+
+
+def _repair(text: str, start: int) -> str:
+    """Rewrite the JSON value starting at text[start] into strict JSON, closing it if it was cut off."""
+    out: list[str] = []
+    stack: list[str] = []
+    after_value = False  # a complete value was just written, so the next one needs a comma
+    i, length = start, len(text)
+
+    def separate() -> None:
+        if after_value and out and out[-1] not in ",:[{":
+            out.append(",")
+
+    while i < length:
+        char = text[i]
+        if char in "\"'":
+            # A string, re-emitted with double quotes
+            separate()
+            quote, i = char, i + 1
+            chunk = ['"']
+            closed = False
+            while i < length:
+                char = text[i]
+                if char == "\\" and i + 1 < length:
+                    escaped = text[i + 1]
+                    chunk.append("'" if escaped == "'" else "\\" + escaped)
+                    i += 2
+                    continue
+                if char == quote:
+                    closed = True
+                    i += 1
+                    break
+                if char == '"':
+                    chunk.append('\\"')
+                elif char == "\n":
+                    chunk.append("\\n")
+                elif char == "\t":
+                    chunk.append("\\t")
+                elif char != "\r":
+                    chunk.append(char)
+                i += 1
+            if not closed and chunk[-1].startswith("\\") and len(chunk[-1]) == 1:
+                chunk.pop()
+            out.append("".join(chunk) + '"')
+            after_value = True
+            continue
+        if char in "{[":
+            separate()
+            stack.append("}" if char == "{" else "]")
+            out.append(char)
+            after_value = False
+        elif char in "}]":
+            while out and out[-1] == ",":
+                out.pop()
+            if char not in stack:
+                i += 1
+                continue
+            while stack:
+                closer = stack.pop()
+                out.append(closer)
+                if closer == char:
+                    break
+            after_value = True
+            if not stack:
+                break
+        elif char == ",":
+            if out and out[-1] not in ",[{":
+                out.append(",")
+            after_value = False
+        elif char == ":":
+            out.append(":")
+            after_value = False
+        elif char == "/" and text.startswith("//", i):
+            end = text.find("\n", i)
+            i = length if end == -1 else end
+            continue
+        elif char == "/" and text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = length if end == -1 else end + 2
+            continue
+        elif char.isdigit() or (char in "-+." and i + 1 < length and text[i + 1].isdigit()):
+            match = _NUMBER.match(text, i + (char == "+"))
+            if match:
+                separate()
+                out.append(match.group())
+                after_value = True
+                i = match.end()
+                continue
+        elif char.isalpha() or char == "_":
+            word = _WORD.match(text, i).group()
+            rest = text[i + len(word):].lstrip()
+            if stack and stack[-1] == "}" and rest.startswith(":"):
+                separate()
+                out.append(json.dumps(word))  # unquoted key
+            elif word in _LITERALS:
+                separate()
+                out.append(_LITERALS[word])
+            elif not rest and any(literal.startswith(word) for literal in ("true", "false", "null")):
+                separate()
+                out.append(next(literal for literal in ("true", "false", "null") if literal.startswith(word)))
+            else:
+                # Prose between values; skip it
+                i += len(word)
+                continue
+            after_value = True
+            i += len(word)
+            continue
+        i += 1
+
+    if stack:
+        # Cut off: drop a dangling separator or key, then close what is open
+        while out and out[-1] == ",":
+            out.pop()
+        if out and out[-1] == ":":
+            out.pop()
+        if stack[-1] == "}" and out and out[-1].startswith('"') and (len(out) < 2 or out[-2] in ",{"):
+            out.pop()
+            while out and out[-1] == ",":
+                out.pop()
+        out.extend(reversed(stack))
+    return "".join(out)
+
+
+def _candidates(text: str, opener: str | None) -> Iterator[tuple[Any, bool]]:
+    """(value, repaired) for each JSON value the text might hold, most likely first."""
+    stripped = text.strip()
+    fenced = _FENCE.search(stripped)
+    body = fenced.group(1).strip() if fenced else stripped
+    try:
+        yield json.loads(body), False
+    except json.JSONDecodeError:
+        pass
+
+    openers = opener or "{["
+    tried = 0
+    for source in ((body, stripped) if fenced else (stripped,)):
+        for index, char in enumerate(source):
+            if char not in openers:
+                continue
+            tried += 1
+            if tried > _MAX_STARTS:
+                return
+            try:
+                yield json.loads(_repair(source, index), strict=False), True
+            except json.JSONDecodeError:
+                continue
+
+
+def _resolve(schema: dict[str, Any], root: dict[str, Any]) -> dict[str, Any]:
+    while "$ref" in schema:
+        name = schema["$ref"].rsplit("/", 1)[-1]
+        schema = root.get("$defs", root.get("definitions", {})).get(name, {})
+    return schema
+
+
+def _empty(schema: dict[str, Any], root: dict[str, Any]) -> Any:
+    """A stand-in for a missing required field, or _MISSING if none is safe."""
+    schema = _resolve(schema, root)
+    if "default" in schema:
+        return schema["default"]
+    return {"string": "", "array": []}.get(schema.get("type"), _MISSING)
+
+
+def _key(name: Any) -> str:
+    return str(name).strip().lower().replace(" ", "_")
+
+
+def _coerce(value: Any, schema: dict[str, Any], root: dict[str, Any], fill: bool = True) -> Any:
+    """Bend a parsed value towards `schema` where the intent is unambiguous.
+
+    Missing required strings and lists are filled in empty below the top level,
+    and at the top level too when `fill` is set.
+    """
+    schema = _resolve(schema, root)
+    for key in ("anyOf", "oneOf"):
+        if key in schema:
+            options = [option for option in schema[key] if _resolve(option, root).get("type") != "null"]
+            if value is None or not options:
+                return value
+            return _coerce(value, options[0], root, fill)
+    kind = schema.get("type")
+
+    if kind == "object":
+        if isinstance(value, list) and len(value) == 1 and isinstance(value[0], dict):
+            value = value[0]
+        if not isinstance(value, dict):
+            return value
+        properties = schema.get("properties", {})
+        by_name = {_key(name): name for name in properties}
+        result: dict[str, Any] = {}
+        for key, item in value.items():
+            name = key if key in properties else by_name.get(_key(key), key)
+            result[name] = _coerce(item, properties[name], root) if name in properties else item
+        for name in schema.get("required", []) if fill else ():
+            if name not in result and (filler := _empty(properties.get(name, {}), root)) is not _MISSING:
+                result[name] = filler
+        return result
+    if kind == "array":
+        if value is None:
+            return value
+        items = value if isinstance(value, list) else [value]
+        return [_coerce(item, schema.get("items", {}), root) for item in items]
+    if kind in ("number", "integer"):
+        if isinstance(value, str) and (match := _NUMBER.search(value)):
+            number = float(match.group())
+            return int(number) if kind == "integer" else number
+        return value
+    if kind == "boolean":
+        if isinstance(value, str) and value.strip().lower() in ("true", "yes", "y", "1", "false", "no", "n", "0"):
+            return value.strip().lower() in ("true", "yes", "y", "1")
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return bool(value)
+        return value
+    if kind == "string" and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return value
+
+
+def _known_keys(value: Any, schema: dict[str, Any]) -> bool:
+    """False for an object none of whose keys the schema names, such as a nested
+    object of a reply found on its own after the whole reply failed."""
+    properties = schema.get("properties")
+    if schema.get("type") != "object" or not properties:
+        return True
+    if isinstance(value, list) and len(value) == 1:
+        value = value[0]
+    if not isinstance(value, dict):
+        return True
+    names = {_key(name) for name in properties}
+    return any(_key(key) in names for key in value)
+
+
+def _matches(value: Any, schema: dict[str, Any]) -> bool:
+    """Top-level check for a dict schema: the right type and every required field present."""
+    kind = schema.get("type")
+    if kind == "object":
+        return isinstance(value, dict) and all(name in value for name in schema.get("required", []))
+    if kind == "array":
+        return isinstance(value, list)
+    return True
+
+
+def extract_json(
+    text: str, schema: type[BaseModel] | dict[str, Any] | None = None, *, site: str = "default", retried: bool = False
+) -> Any:
+    """The JSON value in a model reply, repaired and coerced as needed; None if nothing usable is in it.
+
+    With a pydantic model as `schema` the result is a validated instance of it.
+    `retried` tells the stats that the caller asks the model again when this returns None.
+    For a pydantic or retried schema, missing top-level fields are not filled in: a
+    reply cut off before them is rejected rather than passed on half empty.
+    """
+    json_schema: dict[str, Any] | None = None
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        json_schema = schema.model_json_schema()
+    elif isinstance(schema, dict):
+        json_schema = schema
+    kind = (json_schema or {}).get("type")
+    opener = "{" if kind == "object" else "[" if kind == "array" else None
+
+    fill = not (retried or isinstance(schema, type))
+    for value, repaired in _candidates(text or "", opener):
+        if json_schema is not None:
+            if not _known_keys(value, json_schema):
+                continue
+            coerced = _coerce(value, json_schema, json_schema, fill)
+            repaired = repaired or coerced != value
+            value = coerced
+            if isinstance(schema, type):
+                try:
+                    value = schema.model_validate(value)
+                except ValidationError:
+                    continue
+            elif not _matches(value, json_schema):
+                continue
+        _record(site, "repaired" if repaired else "parsed", retried)
+        return value
+
+    _record(site, "failed", retried)
+    return None
@@ -0,0 +1,279 @@
+"""
+Per-run token and cost ledger with budget enforcement.
+
+A UsageLedger is a callback handler attached to one run through its
+RunnableConfig, so every model call in the run (including nested graphs such
+as the report's section writers) reports into it:
+
+    ledger = UsageLedger(Budget(max_tokens=50_000))
+    result = await graph.ainvoke(state, ledger_config(ledger))
+    result["usage"] = ledger.summary()
+
+It counts prompt and completion tokens per node and per model, prices them
+from LLM_PRICES, and checks the run's budget after every call. Answers
+replayed from the response cache are counted separately and cost nothing. Once the
+budget is spent, the "abort" policy fails every further model call with
+BudgetExceeded, while "degrade" lets the run finish but makes the optional
+steps (more research, more refinement rounds) stop early: routers ask
+`budget_exhausted(config, ...)` before choosing them.
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import RunnableConfig
+
+_LOGGER = logging.getLogger(__name__)
+
+BUDGET_POLICIES = ("degrade", "abort")
+RUN_TOKEN_BUDGET = int(os.getenv("RUN_TOKEN_BUDGET", "0"))
+RUN_COST_BUDGET = float(os.getenv("RUN_COST_BUDGET", "0"))
+BUDGET_POLICY = os.getenv("BUDGET_POLICY", "degrade")
+# USD per million tokens, e.g. {"meta/llama-3.3-70b-instruct": {"input": 0.2, "output": 0.6}}
+LLM_PRICES: dict[str, dict[str, float]] = json.loads(os.getenv("LLM_PRICES", "{}"))
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Limits for one run. None means unlimited."""
+
+    max_tokens: int | None = None
+    max_cost: float | None = None
+    on_exceed: str = "degrade"
+
+    def __post_init__(self):
+        if self.on_exceed not in BUDGET_POLICIES:
+            raise ValueError(f"Unknown budget policy '{self.on_exceed}', expected one of {BUDGET_POLICIES}")
+
+    @classmethod
+    def from_env(cls) -> "Budget":
+        return cls(RUN_TOKEN_BUDGET or None, RUN_COST_BUDGET or None, BUDGET_POLICY)
+
+
+class BudgetExceeded(RuntimeError):
+    """A run spent its token or cost budget under the "abort" policy."""
+
+    def __init__(self, message: str, usage: dict[str, Any]):
+        super().__init__(message)
+        self.usage = usage
+
+
+@dataclass
+class _Usage:
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+
+    def add(self, prompt_tokens: int, completion_tokens: int, cost: float) -> None:
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cost += cost
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+            "cost": round(self.cost, 6),
+        }
+
+
+@dataclass
+class _PendingCall:
+    node: str
+    model: str
+    prompt_estimate: int
+
+
+def _node_path(metadata: dict[str, Any]) -> str:
+    """'section_author_orchestrator/writer' for a model call inside a subgraph node."""
+    namespace = metadata.get("langgraph_checkpoint_ns") or ""
+    # Parallel subgraph calls add task-index segments ("node:id|1:id|child:id"); drop them
+    names = [name for name in (part.split(":", 1)[0] for part in namespace.split("|")) if name and not name.isdigit()]
+    return "/".join(names) or metadata.get("langgraph_node") or "(none)"
+
+
+def _estimate(text: str) -> int:
+    return max(1, len(text) // 4) if text else 0
+
+
+class UsageLedger(BaseCallbackHandler):
+    """Token and cost accounting for one run, enforcing its Budget."""
+
+    # Bookkeeping is cheap, so run on the caller's thread; raise so "abort" stops the call
+    run_inline = True
+    raise_error = True
+    ignore_chain = True
+    ignore_agent = True
+    ignore_retriever = True
+    ignore_custom_event = True
+
+    def __init__(self, budget: Budget | None = None, prices: dict[str, dict[str, float]] | None = None):
+        self.budget = budget or Budget.from_env()
+        self.prices = LLM_PRICES if prices is None else prices
+        self.run_id = uuid.uuid4()
+        self.total = _Usage()
+        self.cached = _Usage()
+        self.by_node: dict[str, _Usage] = {}
+        self.by_model: dict[str, _Usage] = {}
+        self.estimated_calls = 0
+        self.exceeded = False
+        self.degraded: list[str] = []
+        self._pending: dict[uuid.UUID, _PendingCall] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: uuid.UUID, prompt_text: str, metadata: dict[str, Any] | None, kwargs: dict[str, Any]) -> None:
+        if self.exceeded and self.budget.on_exceed == "abort":
+            raise BudgetExceeded(f"Run budget exhausted: {self._describe()}", self.summary())
+        metadata = metadata or {}
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model") or params.get("model_name") or metadata.get("ls_model_name") or "unknown"
+        with self._lock:
+            self._pending[run_id] = _PendingCall(_node_path(metadata), model, _estimate(prompt_text))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs) -> None:
+        text = "".join(str(message.content) for batch in messages for message in batch)
+        self._start(run_id, text, metadata, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs) -> None:
+        self._start(run_id, "".join(prompts), metadata, kwargs)
+
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs) -> None:
+        with self._lock:
+            call = self._pending.pop(run_id, None)
+        if call is None:
+            return
+        prompt_tokens, completion_tokens = self._tokens(response)
+        if any((generation.generation_info or {}).get("cached") for generations in response.generations for generation in generations):
+            # Replayed from the response cache: nothing was spent
+            with self._lock:
+                self.cached.add(prompt_tokens or 0, completion_tokens, 0.0)
+            return
+        if prompt_tokens is None:
+            completion_text = "".join(gen.text for generations in response.generations for gen in generations)
+            prompt_tokens, completion_tokens = call.prompt_estimate, _estimate(completion_text)
+            with self._lock:
+                self.estimated_calls += 1
+
+        price = self.prices.get(call.model, {})
+        cost = (prompt_tokens * price.get("input", 0.0) + completion_tokens * price.get("output", 0.0)) / 1_000_000
+        with self._lock:
+            self.total.add(prompt_tokens, completion_tokens, cost)
+            self.by_node.setdefault(call.node, _Usage()).add(prompt_tokens, completion_tokens, cost)
+            self.by_model.setdefault(call.model, _Usage()).add(prompt_tokens, completion_tokens, cost)
+            newly_exceeded = not self.exceeded and self._over_budget()
+            self.exceeded = self.exceeded or newly_exceeded
+        if newly_exceeded:
+            _LOGGER.warning("💸 Run %s exceeded its budget (%s); policy: %s", self.run_id, self._describe(), self.budget.on_exceed)
+
+    def on_llm_error(self, error: BaseException, *, run_id, **kwargs) -> None:
+        with self._lock:
+            self._pending.pop(run_id, None)
+
+    @staticmethod
+    def _tokens(response: LLMResult) -> tuple[int | None, int]:
+        """Reported (prompt, completion) tokens, or (None, 0) if the endpoint sent no usage."""
+        prompt = completion = 0
+        found = False
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    prompt += usage.get("input_tokens", 0)
+                    completion += usage.get("output_tokens", 0)
+                    found = True
+        if not found:
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            if usage:
+                return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+            return None, 0
+        return prompt, completion
+
+    def _over_budget(self) -> bool:
+        tokens = self.total.prompt_tokens + self.total.completion_tokens
+        return bool(
+            (self.budget.max_tokens and tokens >= self.budget.max_tokens)
+            or (self.budget.max_cost and self.total.cost >= self.budget.max_cost)
+        )
+
+    def _describe(self) -> str:
+        tokens = self.total.prompt_tokens + self.total.completion_tokens
+        return (
+            f"{tokens} tokens of {self.budget.max_tokens or 'unlimited'}, "
+            f"${self.total.cost:.4f} of {self.budget.max_cost or 'unlimited'}"
+        )
+
+    def degrade(self, step: str) -> bool:
+        """True if a "degrade" budget is spent and `step` should be skipped; records the skip.
+
+        Over an "abort" budget the next model call fails instead, so nothing is skipped.
+        """
+        if not self.exceeded or self.budget.on_exceed != "degrade":
+            return False
+        if step not in self.degraded:
+            _LOGGER.info("💸 Over budget, skipping %s", step)
+            self.degraded.append(step)
+        return True
+
+    def raise_if_aborted(self) -> None:
+        """Raise BudgetExceeded if the run went over an "abort" budget (even if a node swallowed the error)."""
+        if self.exceeded and self.budget.on_exceed == "abort":
+            raise BudgetExceeded(f"Run budget exhausted: {self._describe()}", self.summary())
+
+    def summary(self) -> dict[str, Any]:
+        """Usage for the run, per node and per model, and the budget's state."""
+        with self._lock:
+            return {
+                "run_id": str(self.run_id),
+                **self.total.as_dict(),
+                "estimated_calls": self.estimated_calls,
+                "cached": self.cached.as_dict(),
+                "by_node": {node: usage.as_dict() for node, usage in sorted(self.by_node.items())},
+                "by_model": {model: usage.as_dict() for model, usage in sorted(self.by_model.items())},
+                "budget": {
+                    "max_tokens": self.budget.max_tokens,
+                    "max_cost": self.budget.max_cost,
+                    "on_exceed": self.budget.on_exceed,
+                    "exceeded": self.exceeded,
+                    "skipped": list(self.degraded),
+                },
+            }
+
+
+def ledger_config(ledger: UsageLedger, config: RunnableConfig | None = None) -> RunnableConfig:
+    """A copy of `config` that reports into `ledger` and names the run after it."""
+    config = dict(config or {})
+    callbacks = config.get("callbacks")
+    if callbacks is None:
+        callbacks = [ledger]
+    elif isinstance(callbacks, list):
+        callbacks = [*callbacks, ledger]
+    else:
+        callbacks = callbacks.copy()
+        callbacks.add_handler(ledger, inherit=True)
+    config["callbacks"] = callbacks
+    config.setdefault("run_id", ledger.run_id)
+    return RunnableConfig(**config)
+
+
+def find_ledger(config: RunnableConfig | None) -> UsageLedger | None:
+    """The ledger attached to a run's config, if any."""
+    callbacks = (config or {}).get("callbacks")
+    handlers = callbacks if isinstance(callbacks, list) else getattr(callbacks, "handlers", None) or []
+    return next((handler for handler in handlers if isinstance(handler, UsageLedger)), None)
+
+
+def budget_exhausted(config: RunnableConfig | None, step: str) -> bool:
+    """True if the run is over a "degrade" budget and should skip the optional `step`."""
+    ledger = find_ledger(config)
+    return ledger is not None and ledger.degrade(step)
@@ -0,0 +1,252 @@
+"""
+Persistent exact-match cache for deterministic model calls.
+
+A model created with temperature 0 returns the same answer for the same
+request, so re-running a report (or asking the planner the same question
+twice) does not need to go back to the endpoint. `with_response_cache(llm)`
+attaches a LangChain cache to such a model. Entries are keyed by a SHA-256
+hash of the model's identity (name, endpoint, temperature, limits), the
+per-call parameters (bound tools, tool choice, structured-output schema) and
+the messages with run-specific ids removed. Responses are stored whole, tool
+calls included, in a SQLite file shared by every process, and the least
+recently used entries are evicted once the file holds more than
+LLM_CACHE_MAX_ENTRIES responses or LLM_CACHE_MAX_MB.
+
+Calls that must reach the model can opt out for a block:
+
+    with no_response_cache():
+        response = await llm.ainvoke(messages)
+"""
+
+import ast
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator, Sequence
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration
+
+_LOGGER = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") == "1"
+LLM_CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", "~/.cache/agent_runtime/llm_responses.sqlite3")).expanduser()
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "256"))
+
+# Model fields that change what a request returns
+_IDENTITY_FIELDS = ("model", "base_url", "temperature", "top_p", "max_tokens", "seed", "stop")
+# Message fields that differ between otherwise identical conversations
+_VOLATILE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+_bypass: ContextVar[bool] = ContextVar("response_cache_bypass", default=False)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_used);
+"""
+
+
+@contextmanager
+def no_response_cache() -> Iterator[None]:
+    """Send the model calls made in this block to the endpoint, and do not store their answers."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def _call_params(llm_string: str) -> dict[str, Any] | None:
+    """Per-call parameters from LangChain's llm_string, or None if they cannot be read."""
+    try:
+        return dict(ast.literal_eval(llm_string.rsplit("---", 1)[-1]))
+    except (ValueError, SyntaxError, TypeError):
+        return None
+
+
+def _normalize(prompt: str) -> str:
+    """The serialized messages without ids and response metadata, in canonical JSON."""
+    try:
+        messages = json.loads(prompt)
+    except json.JSONDecodeError:
+        return prompt
+    for message in messages if isinstance(messages, list) else []:
+        fields = message.get("kwargs") if isinstance(message, dict) else None
+        if isinstance(fields, dict):
+            for name in _VOLATILE_FIELDS:
+                fields.pop(name, None)
+    return json.dumps(messages, sort_keys=True, separators=(",", ":"))
+
+
+class ResponseStore:
+    """SQLite table of serialized responses with least-recently-used eviction."""
+
+    def __init__(self, path: Path = LLM_CACHE_PATH, max_entries: int = LLM_CACHE_MAX_ENTRIES, max_mb: float = LLM_CACHE_MAX_MB):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.hits = self.misses = self.stores = self.evictions = 0
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, value, size, created, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, value, len(value), now, now),
+            )
+            self.stores += 1
+            self._evict()
+
+    def _evict(self) -> None:
+        entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return
+        # Evict down to 90% of the limits so the next few stores do not evict again
+        excess_entries = entries - int(self.max_entries * 0.9)
+        excess_bytes = size - int(self.max_bytes * 0.9)
+        evicted = freed = 0
+        for key, entry_size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            if evicted >= excess_entries and freed >= excess_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            evicted += 1
+            freed += entry_size
+        self.evictions += evicted
+        _LOGGER.info("🧹 Evicted %d cached responses (%.1f MB)", evicted, freed / 1024 / 1024)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "mb": round(size / 1024 / 1024, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+
+class ModelResponseCache(BaseCache):
+    """LangChain cache for one model, backed by a shared ResponseStore.
+
+    ChatNVIDIA's own cache key (llm_string) leaves out the model name and
+    temperature, so the model's identity is folded into every key here.
+    """
+
+    def __init__(self, identity: dict[str, Any], store: ResponseStore | None = None):
+        self._store = store
+        self.model = str(identity.get("model"))
+        self._identity = json.dumps(identity, sort_keys=True, default=str)
+
+    @property
+    def store(self) -> ResponseStore:
+        # Opened on first use, so importing a module that defines a model creates no file
+        if self._store is None:
+            self._store = get_response_store()
+        return self._store
+
+    def _key(self, prompt: str, llm_string: str) -> str | None:
+        if _bypass.get():
+            return None
+        params = _call_params(llm_string)
+        if params is None or params.get("temperature", 0) not in (0, 0.0, None):
+            # Unreadable, or sampled: a per-call temperature override is not deterministic
+            return None
+        call = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256("\x00".join((self._identity, call, _normalize(prompt))).encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        key = self._key(prompt, llm_string)
+        value = self.store.get(key) if key else None
+        if value is None:
+            return None
+        generations = []
+        for entry in json.loads(value):
+            message = messages_from_dict([entry["message"]])[0]
+            # Marked so usage accounting can tell a replay from a paid call
+            generations.append(ChatGeneration(message=message, generation_info={**(entry.get("info") or {}), "cached": True}))
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self._key(prompt, llm_string)
+        if not key or not all(isinstance(generation, ChatGeneration) for generation in return_val):
+            return
+        value = json.dumps([
+            {"message": message_to_dict(generation.message), "info": generation.generation_info}
+            for generation in return_val
+        ], default=str)
+        self.store.put(key, self.model, value)
+
+    async def alookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        return await asyncio.to_thread(self.lookup, prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        await asyncio.to_thread(self.update, prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.store.clear()
+
+
+_STORE: ResponseStore | None = None
+
+
+def get_response_store() -> ResponseStore:
+    """Return the process-wide response store."""
+    global _STORE
+    if _STORE is None:
+        _STORE = ResponseStore()
+    return _STORE
+
+
+def with_response_cache(llm: BaseChatModel, fields: Sequence[str] = _IDENTITY_FIELDS) -> BaseChatModel:
+    """Attach the persistent response cache to a temperature-0 model; other models are returned unchanged."""
+    if not LLM_CACHE_ENABLED or getattr(llm, "temperature", None) != 0:
+        return llm
+    identity = {name: getattr(llm, name, None) for name in fields}
+    llm.cache = ModelResponseCache(identity)
+    return llm
+
+
+def response_cache_stats() -> dict[str, Any]:
+    return get_response_store().stats()
@@ -0,0 +1,249 @@
+"""
+Process-wide scheduler for LLM calls from both agents.
+
+Every model call holds one slot while it runs. When all slots are taken,
+waiting calls are served by priority class first (interactive, then batch,
+then background refresh), and within a class by weighted fair queuing
+across flows (a tenant, a report, a batch row...), so one report's fifty
+section writers take turns with another user's post instead of going first.
+A waiter moves up one class for every SCHEDULER_AGING_SECONDS it has waited,
+so lower classes are delayed but never starved.
+
+The class and flow come from a context variable, which asyncio tasks (and
+so LangGraph nodes) inherit from the code that started the run:
+
+    with llm_priority("interactive", flow="tenant-a:post-42"):
+        await graph.ainvoke(state)
+
+This module only uses the standard library so both agents can import it.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field, replace
+from typing import Any, AsyncIterator, Iterator
+
+from .summary import summary_line
+
+_LOGGER = logging.getLogger(__name__)
+
+PRIORITY_CLASSES = ("interactive", "batch", "background")
+SCHEDULER_AGING_SECONDS = float(os.getenv("SCHEDULER_AGING_SECONDS", "10"))
+_MAX_SAMPLES = 10_000
+_MAX_IDLE_FLOWS = 1_000
+
+
+@dataclass(frozen=True)
+class Priority:
+    """Scheduling identity of the current run."""
+
+    cls: str = "batch"
+    flow: str = "default"
+    weight: float = 1.0
+
+
+_priority: ContextVar[Priority] = ContextVar("llm_priority", default=Priority())
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+def set_priority(cls: str | None = None, flow: str | None = None, weight: float | None = None) -> Token:
+    """Set the priority for the current task (and tasks it starts); returns a reset token."""
+    if cls is not None and cls not in PRIORITY_CLASSES:
+        raise ValueError(f"Unknown priority class '{cls}', expected one of {PRIORITY_CLASSES}")
+    current = _priority.get()
+    return _priority.set(replace(
+        current,
+        cls=cls or current.cls,
+        flow=flow or current.flow,
+        weight=weight or current.weight,
+    ))
+
+
+def reset_priority(token: Token) -> None:
+    """Undo a set_priority call made in the same task."""
+    _priority.reset(token)
+
+
+@contextmanager
+def llm_priority(cls: str | None = None, flow: str | None = None, weight: float | None = None) -> Iterator[Priority]:
+    """Run a block under a priority class and flow."""
+    token = set_priority(cls, flow, weight)
+    try:
+        yield _priority.get()
+    finally:
+        _priority.reset(token)
+
+
+def new_flow(prefix: str) -> str:
+    """A fresh flow name, so each run is queued fairly against the others."""
+    return f"{prefix}:{uuid.uuid4().hex[:8]}"
+
+
+@dataclass
+class _Waiter:
+    priority: Priority
+    rank: int
+    start_tag: float
+    finish_tag: float
+    enqueued: float
+    seq: int
+    future: asyncio.Future = field(repr=False)
+
+
+@dataclass
+class _ClassStats:
+    granted: int = 0
+    aged: int = 0
+    waits: deque = field(default_factory=lambda: deque(maxlen=_MAX_SAMPLES))
+
+
+class LLMScheduler:
+    """Bounded slots granted by priority class, aging and weighted fair queuing."""
+
+    def __init__(self, max_concurrent: int | None = None, aging_seconds: float = SCHEDULER_AGING_SECONDS):
+        self.max_concurrent = max_concurrent
+        self.aging_seconds = aging_seconds
+        self.active = 0
+        self._waiting: list[_Waiter] = []
+        self._virtual_time = {cls: 0.0 for cls in PRIORITY_CLASSES}
+        self._flow_finish: dict[tuple[str, str], float] = {}
+        self._seq = itertools.count()
+        self._stats = {cls: _ClassStats() for cls in PRIORITY_CLASSES}
+
+    def configure(self, max_concurrent: int | None) -> None:
+        """Change the number of slots (None = unlimited); waiters are re-dispatched."""
+        self.max_concurrent = max_concurrent
+        self._dispatch()
+
+    def reset_stats(self) -> None:
+        """Clear grant counts and queue-wait samples."""
+        self._stats = {cls: _ClassStats() for cls in PRIORITY_CLASSES}
+
+    def _has_capacity(self) -> bool:
+        return self.max_concurrent is None or self.active < self.max_concurrent
+
+    @asynccontextmanager
+    async def slot(self, cost: float = 1.0) -> AsyncIterator[None]:
+        """Hold one slot for the duration of a model call."""
+        priority = _priority.get()
+        if self._has_capacity() and not self._waiting:
+            self.active += 1
+            self._record(priority.cls, 0.0, aged=False)
+        else:
+            await self._wait(priority, cost)
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._dispatch()
+
+    async def _wait(self, priority: Priority, cost: float) -> None:
+        key = (priority.cls, priority.flow)
+        start = max(self._virtual_time[priority.cls], self._flow_finish.get(key, 0.0))
+        finish = start + cost / priority.weight
+        self._flow_finish[key] = finish
+        waiter = _Waiter(
+            priority=priority,
+            rank=PRIORITY_CLASSES.index(priority.cls),
+            start_tag=start,
+            finish_tag=finish,
+            enqueued=time.monotonic(),
+            seq=next(self._seq),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._waiting.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as we were cancelled: hand the slot on
+                self.active -= 1
+                self._dispatch()
+            else:
+                self._waiting.remove(waiter)
+            raise
+
+    def _effective_rank(self, waiter: _Waiter, now: float) -> int:
+        if self.aging_seconds <= 0:
+            return waiter.rank
+        return max(0, waiter.rank - int((now - waiter.enqueued) / self.aging_seconds))
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        while self._waiting and self._has_capacity():
+            waiter = min(
+                self._waiting,
+                key=lambda w: (self._effective_rank(w, now), w.finish_tag, w.seq),
+            )
+            self._waiting.remove(waiter)
+            if waiter.future.done():  # cancelled while queued
+                continue
+            self.active += 1
+            cls = waiter.priority.cls
+            self._virtual_time[cls] = max(self._virtual_time[cls], waiter.start_tag)
+            self._record(cls, now - waiter.enqueued, aged=self._effective_rank(waiter, now) < waiter.rank)
+            waiter.future.set_result(None)
+
+        if len(self._flow_finish) > _MAX_IDLE_FLOWS:
+            # Forget flows that are no longer ahead of their class's virtual time
+            self._flow_finish = {
+                key: finish for key, finish in self._flow_finish.items() if finish > self._virtual_time[key[0]]
+            }
+
+    def _record(self, cls: str, wait: float, aged: bool) -> None:
+        stats = self._stats[cls]
+        stats.granted += 1
+        stats.aged += aged
+        stats.waits.append(wait)
+
+    def stats(self) -> dict[str, Any]:
+        """Slots in use, plus per-class queue depth, grants and queue-wait percentiles."""
+        classes = {}
+        for cls, stats in self._stats.items():
+            waits = sorted(stats.waits)
+            classes[cls] = {
+                "queued": sum(1 for waiter in self._waiting if waiter.priority.cls == cls),
+                "granted": stats.granted,
+                "aged": stats.aged,
+                "wait_p50": waits[len(waits) // 2] if waits else 0.0,
+                "wait_p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+                "wait_max": waits[-1] if waits else 0.0,
+            }
+        return {"active": self.active, "max_concurrent": self.max_concurrent, "classes": classes}
+
+
+_SCHEDULER = LLMScheduler()
+
+
+def get_scheduler() -> LLMScheduler:
+    """Return the process-wide scheduler."""
+    return _SCHEDULER
+
+
+def llm_slot(cost: float = 1.0):
+    """Hold one slot of the process-wide LLM budget for the duration of a call."""
+    return _SCHEDULER.slot(cost)
+
+
+def scheduler_stats() -> dict[str, Any]:
+    return _SCHEDULER.stats()
+
+
+@summary_line
+def scheduler_summary() -> str | None:
+    waits = {cls: stats for cls, stats in scheduler_stats()["classes"].items() if stats["granted"] and stats["wait_max"]}
+    if not waits:
+        return None
+    return "LLM queue wait (p50/p95): " + ", ".join(
+        f"{cls} {stats['wait_p50']:.2f}s/{stats['wait_p95']:.2f}s" for cls, stats in waits.items()
+    )
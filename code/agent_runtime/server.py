@@ -0,0 +1,188 @@
+"""
+HTTP endpoints for both agents.
+
+    POST /v1/reports         {"topic": ..., "report_structure": ...}
+    POST /v1/linkedin/posts  {"prompt": ..., "image_path"/"image_base64", "post_type", style levels...}
+    GET  /healthz            liveness plus admission counters
+    GET  /stats              admission counters and LinkedIn workflow metrics
+
+With a job store (see jobs.py) it also queues durable background runs for the
+worker pool (workers.py):
+
+    POST /v1/jobs            {"kind": "reports" | "linkedin", "payload": {...}} -> 202 {"id": ...}
+    GET  /v1/jobs            queue depth, throughput and latency percentiles
+    GET  /v1/jobs/{id}       status and, once finished, the result
+
+Runs are scheduled for model calls (scheduler.py) under the class given by
+`?priority=` or the X-Priority header - posts default to interactive and
+reports to batch - and are queued fairly per X-Tenant.
+
+A POST answers with the run's final `done` event as JSON. With `?stream=1`
+(or `Accept: text/event-stream`) it streams every progress event as
+server-sent events instead, ending with `done` or `error`.
+
+Every request is served by the same process and event loop, so model and
+search clients, the image/research/hashtag caches and the LLM/search budgets
+(linkedin_agent.limits) are shared and stay warm between requests.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator
+
+from aiohttp import web
+
+from linkedin_agent import metrics
+from linkedin_agent.loop_monitor import loop_lag_stats, maybe_start_loop_monitor
+
+from .admission import AdmissionController, Overloaded, Run
+from .agents import AGENTS, EventStream, run_to_completion
+from .jobs import JobStore
+from .json_repair import json_repair_stats
+from .response_cache import LLM_CACHE_ENABLED, response_cache_stats
+from .scheduler import PRIORITY_CLASSES, new_flow, reset_priority, scheduler_stats, set_priority
+from .source_index import SEARCH_OFFLINE, SOURCE_INDEX_ENABLED, source_index_stats
+
+_LOGGER = logging.getLogger(__name__)
+
+ADMISSION_KEY = web.AppKey("admission", AdmissionController)
+JOBS_KEY = web.AppKey("jobs", JobStore)
+
+
+def _wants_stream(request: web.Request) -> bool:
+    return request.query.get("stream") in ("1", "true") or "text/event-stream" in request.headers.get("Accept", "")
+
+
+def _sse(event: dict[str, Any]) -> bytes:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n".encode()
+
+
+def _agent_handler(name: str, events_for: EventStream, default_priority: str):
+    async def handler(request: web.Request) -> web.StreamResponse:
+        priority = request.query.get("priority") or request.headers.get("X-Priority") or default_priority
+        tenant = request.headers.get("X-Tenant", "anonymous")
+        try:
+            if priority not in PRIORITY_CLASSES:
+                raise ValueError(f"'priority' must be one of {list(PRIORITY_CLASSES)}")
+            body = await request.json()
+            if not isinstance(body, dict):
+                raise ValueError("Request body must be a JSON object")
+            events = events_for(body)
+        except (ValueError, TypeError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+
+        # The handler task runs the graph, so its model calls inherit this
+        token = set_priority(priority, flow=new_flow(f"{tenant}:{name}"))
+        admission = request.app[ADMISSION_KEY]
+        start = time.perf_counter()
+        try:
+            async with admission.admit() as run, aclosing(events):
+                metrics.observe(f"server.{name}.queue_wait", time.perf_counter() - start)
+                if _wants_stream(request):
+                    return await _stream(request, events, run)
+                return await _collect(events, run)
+        except Overloaded as e:
+            metrics.incr(f"server.{name}.rejected")
+            return web.json_response(
+                {"error": str(e)}, status=429, headers={"Retry-After": str(e.retry_after)}
+            )
+        finally:
+            metrics.observe(f"server.{name}.latency", time.perf_counter() - start)
+            reset_priority(token)
+
+    return handler
+
+
+async def _collect(events: AsyncIterator[dict[str, Any]], run: Run) -> web.Response:
+    try:
+        done = await run_to_completion(events)
+    except Exception as e:
+        _LOGGER.exception("Agent run failed")
+        run.fail()
+        return web.json_response({"error": str(e)}, status=500)
+    return web.json_response(done, dumps=lambda value: json.dumps(value, default=str))
+
+
+async def _stream(request: web.Request, events: AsyncIterator[dict[str, Any]], run: Run) -> web.StreamResponse:
+    response = web.StreamResponse(
+        headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+    await response.prepare(request)
+    try:
+        async for event in events:
+            await response.write(_sse(event))
+    except ConnectionResetError:
+        # Client went away; leaving the loop closes the stream, which cancels the run
+        _LOGGER.info("Client disconnected, abandoning run")
+        run.fail()
+        return response
+    except Exception as e:
+        _LOGGER.exception("Agent run failed")
+        run.fail()
+        await response.write(_sse({"type": "error", "message": str(e)}))
+    await response.write_eof()
+    return response
+
+
+async def healthz(request: web.Request) -> web.Response:
+    return web.json_response({"status": "ok", **request.app[ADMISSION_KEY].stats()})
+
+
+async def stats(request: web.Request) -> web.Response:
+    return web.json_response({
+        "admission": request.app[ADMISSION_KEY].stats(),
+        "loop": loop_lag_stats(),
+        "scheduler": scheduler_stats(),
+        "response_cache": await asyncio.to_thread(response_cache_stats) if LLM_CACHE_ENABLED else None,
+        "json_repair": json_repair_stats(),
+        "source_index": await asyncio.to_thread(source_index_stats) if SOURCE_INDEX_ENABLED or SEARCH_OFFLINE else None,
+        "metrics": metrics.snapshot(),
+    })
+
+
+async def _start_loop_monitor(app: web.Application) -> None:
+    maybe_start_loop_monitor()
+
+
+async def enqueue_job(request: web.Request) -> web.Response:
+    try:
+        body = await request.json()
+    except ValueError as e:
+        return web.json_response({"error": f"Request body must be JSON: {e}"}, status=400)
+    if not isinstance(body, dict) or body.get("kind") not in AGENTS or not isinstance(body.get("payload"), dict):
+        return web.json_response({"error": f"'kind' must be one of {sorted(AGENTS)} and 'payload' an object"}, status=400)
+    job_id = await asyncio.to_thread(request.app[JOBS_KEY].enqueue, body["kind"], body["payload"])
+    return web.json_response({"id": job_id}, status=202)
+
+
+async def job_status(request: web.Request) -> web.Response:
+    job = await asyncio.to_thread(request.app[JOBS_KEY].get, request.match_info["job_id"])
+    if job is None:
+        return web.json_response({"error": "Unknown job"}, status=404)
+    return web.json_response(job)
+
+
+async def job_stats(request: web.Request) -> web.Response:
+    return web.json_response(await asyncio.to_thread(request.app[JOBS_KEY].stats))
+
+
+def create_app(
+    max_active: int = 8, max_queue: int = 32, queue_timeout: float | None = None, jobs: JobStore | None = None
+) -> web.Application:
+    """Build the service. Admission limits apply across both agents."""
+    app = web.Application(client_max_size=32 * 1024 * 1024)  # room for base64 images
+    app[ADMISSION_KEY] = AdmissionController(max_active, max_queue, queue_timeout)
+    app.router.add_post("/v1/reports", _agent_handler("reports", AGENTS["reports"], "batch"))
+    app.router.add_post("/v1/linkedin/posts", _agent_handler("linkedin", AGENTS["linkedin"], "interactive"))
+    app.router.add_get("/healthz", healthz)
+    app.router.add_get("/stats", stats)
+    app.on_startup.append(_start_loop_monitor)
+    if jobs:
+        app[JOBS_KEY] = jobs
+        app.router.add_post("/v1/jobs", enqueue_job)
+        app.router.add_get("/v1/jobs", job_stats)
+        app.router.add_get("/v1/jobs/{job_id}", job_status)
+    return app
@@ -0,0 +1,307 @@
+"""
+Local full-text index of every source the agents have fetched.
+
+Each Tavily response either agent receives is ingested into a SQLite FTS5
+index: one row per URL (a later fetch of the same URL replaces it), with its
+title, snippet, full text when it was fetched, the search topic, the query
+that found it and the time it was fetched. Searches go through
+`indexed_search`, which answers from the index when it can:
+
+    response = await indexed_search(tavily_client.search, query, max_results=5, topic="news")
+
+A query already searched within the freshness window gets the same sources
+back, however many there were. Any other query is matched against the index
+with BM25, and sources that contain most of the query's words count as hits.
+With at least SOURCE_INDEX_MIN_RESULTS fresh hits the network is skipped;
+otherwise the search goes to Tavily and its results are ingested. Sources are
+fresh for SOURCE_INDEX_MAX_AGE seconds, or SOURCE_INDEX_NEWS_MAX_AGE for news
+searches.
+
+With SEARCH_OFFLINE=1 nothing is sent to the network: every search is answered
+from the index, whatever the age of its sources, even if it finds nothing.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterator
+
+from .summary import summary_line
+
+_LOGGER = logging.getLogger(__name__)
+
+SOURCE_INDEX_ENABLED = os.getenv("SOURCE_INDEX", "1") == "1"
+SOURCE_INDEX_PATH = Path(os.getenv("SOURCE_INDEX_PATH", "~/.cache/agent_runtime/sources.sqlite3")).expanduser()
+SOURCE_INDEX_MIN_RESULTS = int(os.getenv("SOURCE_INDEX_MIN_RESULTS", "3"))
+# Share of a query's words a source must contain to count as a hit
+SOURCE_INDEX_MIN_COVERAGE = float(os.getenv("SOURCE_INDEX_MIN_COVERAGE", "0.75"))
+SOURCE_INDEX_MAX_AGE = float(os.getenv("SOURCE_INDEX_MAX_AGE", str(3 * 24 * 3600)))
+SOURCE_INDEX_NEWS_MAX_AGE = float(os.getenv("SOURCE_INDEX_NEWS_MAX_AGE", str(6 * 3600)))
+SEARCH_OFFLINE = os.getenv("SEARCH_OFFLINE", "0") == "1"
+
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or that the this to vs what when which who why with".split()
+)
+_CANDIDATES_PER_RESULT = 4  # FTS matches read per requested result before the coverage check
+
+SearchFunction = Callable[..., Awaitable[dict[str, Any]]]
+
+_bypass: ContextVar[bool] = ContextVar("source_index_bypass", default=False)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    raw_content TEXT,
+    score REAL,
+    published_date TEXT,
+    topic TEXT NOT NULL,
+    query TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS sources_fts USING fts5(title, content, content='sources', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS sources_insert AFTER INSERT ON sources BEGIN
+    INSERT INTO sources_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS sources_delete AFTER DELETE ON sources BEGIN
+    INSERT INTO sources_fts (sources_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS sources_update AFTER UPDATE ON sources BEGIN
+    INSERT INTO sources_fts (sources_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    INSERT INTO sources_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+CREATE TABLE IF NOT EXISTS searches (
+    query TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    urls TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (query, topic)
+);
+"""
+
+_COLUMNS = ("url", "title", "content", "raw_content", "score", "published_date", "fetched_at")
+
+
+@contextmanager
+def no_source_index() -> Iterator[None]:
+    """Send the searches made in this block to the network, and leave the index alone."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _words(text: str) -> set[str]:
+    return {word for word in _WORD.findall(text.lower()) if len(word) > 1 and word not in _STOPWORDS}
+
+
+class SourceIndex:
+    """SQLite FTS5 index of fetched sources, with the queries that found them."""
+
+    def __init__(self, path: Path = SOURCE_INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.hits = self.misses = self.offline = self.ingested = 0
+
+    def ingest(self, query: str, topic: str, response: dict[str, Any]) -> int:
+        """Store a search response's sources and remember which ones the query returned."""
+        now = time.time()
+        urls = []
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for result in response.get("results") or []:
+                    if not result.get("url"):
+                        continue
+                    urls.append(result["url"])
+                    self._conn.execute(
+                        """INSERT INTO sources (url, title, content, raw_content, score, published_date, topic, query, fetched_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (url) DO UPDATE SET
+                            title = excluded.title, content = excluded.content,
+                            raw_content = COALESCE(excluded.raw_content, sources.raw_content),
+                            score = excluded.score, published_date = excluded.published_date,
+                            topic = excluded.topic, query = excluded.query, fetched_at = excluded.fetched_at""",
+                        (
+                            result["url"], result.get("title") or "", result.get("content") or "",
+                            result.get("raw_content"), result.get("score"), result.get("published_date"),
+                            topic, query, now,
+                        ),
+                    )
+                if urls:
+                    # Only searches that found something can answer a repeat of the query
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO searches (query, topic, urls, fetched_at) VALUES (?, ?, ?, ?)",
+                        (_normalize(query), topic, json.dumps(urls), now),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.ingested += len(urls)
+        return len(urls)
+
+    def _rows(self, sql: str, params: tuple[Any, ...]) -> list[dict[str, Any]]:
+        return [dict(zip(_COLUMNS, row)) for row in self._conn.execute(sql, params).fetchall()]
+
+    def lookup(
+        self,
+        query: str,
+        topic: str = "general",
+        max_results: int = 5,
+        max_age: float | None = None,
+        include_raw_content: bool = False,
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """Indexed sources for a query, best first, and whether they are all of the query's own
+        earlier results. A query not searched before gets full-text matches that contain most
+        of its words.
+
+        `max_age` (seconds) leaves out older fetches; with `include_raw_content`
+        only sources stored with their full text are returned.
+        """
+        since = time.time() - max_age if max_age is not None else 0.0
+        select = f"SELECT {', '.join('s.' + column for column in _COLUMNS)} FROM sources s"
+        with self._lock:
+            search = self._conn.execute(
+                "SELECT urls FROM searches WHERE query = ? AND topic = ? AND fetched_at >= ?",
+                (_normalize(query), topic, since),
+            ).fetchone()
+            # An earlier search that found nothing is no answer; look the query up like a new one
+            urls = json.loads(search[0]) if search else []
+            if urls:
+                by_url = {
+                    row["url"]: row
+                    for row in self._rows(f"{select} WHERE s.url IN ({', '.join('?' * len(urls))})", tuple(urls))
+                }
+                rows = [by_url[url] for url in urls if url in by_url]
+            else:
+                words = _words(query)
+                if not words:
+                    return [], False
+                rows = self._rows(
+                    f"{select} JOIN sources_fts ON sources_fts.rowid = s.id "
+                    "WHERE sources_fts MATCH ? AND s.topic = ? AND s.fetched_at >= ? "
+                    "ORDER BY bm25(sources_fts) LIMIT ?",
+                    (" OR ".join(f'"{word}"' for word in sorted(words)), topic, since, max_results * _CANDIDATES_PER_RESULT),
+                )
+                rows = [
+                    row for row in rows
+                    if len(words & _words(f"{row['title']} {row['content']}")) >= SOURCE_INDEX_MIN_COVERAGE * len(words)
+                ]
+        if include_raw_content:
+            rows = [row for row in rows if row["raw_content"]]
+        return rows[:max_results], bool(urls) and len(rows) == len(urls)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sources")
+            self._conn.execute("DELETE FROM searches")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            sources = self._conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+            searches = self._conn.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "sources": sources,
+            "queries": searches,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "offline": self.offline,
+            "ingested": self.ingested,
+        }
+
+
+_INDEX: SourceIndex | None = None
+
+
+def get_source_index() -> SourceIndex:
+    """Return the process-wide source index."""
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = SourceIndex()
+    return _INDEX
+
+
+async def indexed_search(search: SearchFunction, query: str, **options: Any) -> dict[str, Any]:
+    """A Tavily search answered from the local index when it holds enough fresh sources.
+
+    `search` is the network call (e.g. `tavily_client.search`) and `options`
+    its keyword arguments. Network responses are ingested before they are
+    returned. Index answers have the shape of a Tavily response, with
+    "source_index": True.
+    """
+    if not (SOURCE_INDEX_ENABLED or SEARCH_OFFLINE) or _bypass.get():
+        return await search(query, **options)
+
+    index = get_source_index()
+    topic = options.get("topic") or "general"
+    max_results = int(options.get("max_results") or 5)
+    include_raw_content = bool(options.get("include_raw_content"))
+    start = time.perf_counter()
+
+    if SEARCH_OFFLINE:
+        results, _ = await asyncio.to_thread(index.lookup, query, topic, max_results, None, include_raw_content)
+        index.offline += 1
+        _LOGGER.info("Offline search for %r: %d indexed sources", query, len(results))
+    else:
+        max_age = SOURCE_INDEX_NEWS_MAX_AGE if topic == "news" else SOURCE_INDEX_MAX_AGE
+        results, repeated = await asyncio.to_thread(index.lookup, query, topic, max_results, max_age, include_raw_content)
+        if not repeated and len(results) < min(SOURCE_INDEX_MIN_RESULTS, max_results):
+            index.misses += 1
+            response = await search(query, **options)
+            try:
+                await asyncio.to_thread(index.ingest, query, topic, response)
+            except sqlite3.Error as e:
+                _LOGGER.warning("Could not index the results for %r: %s", query, e)
+            return response
+        index.hits += 1
+        _LOGGER.info("Answered %r from %d indexed sources", query, len(results))
+
+    for result in results:
+        result.pop("fetched_at")
+    return {
+        "query": query,
+        "results": results,
+        "response_time": round(time.perf_counter() - start, 4),
+        "source_index": True,
+    }
+
+
+def source_index_stats() -> dict[str, Any]:
+    return get_source_index().stats()
+
+
+@summary_line
+def source_index_summary() -> str | None:
+    if not (SOURCE_INDEX_ENABLED or SEARCH_OFFLINE):
+        return None
+    index = source_index_stats()
+    if not (index["hits"] or index["misses"] or index["offline"]):
+        return None
+    return (
+        f"Source index: {index['hits']}/{index['hits'] + index['misses']} searches answered locally "
+        f"({index['hit_rate']:.0%}), {index['offline']} offline; {index['sources']} sources indexed"
+    )
@@ -0,0 +1,99 @@
+"""
+State backends for the agents' graphs.
+
+The agents declare their graph states as pydantic models. LangGraph rebuilds
+the state object from its channels before every node and router, and for a
+pydantic model that means validating every field again and copying the
+message list. The "slots" backend runs a graph on a `__slots__` dataclass
+generated from the same model: same fields, defaults and reducers, but no
+validation and a smaller object. Input is still validated where it enters,
+because callers build the pydantic model and pass it as the graph's input.
+
+Each graph picks its backend when it is built:
+
+    workflow = state_graph(AgentState, state_backend("report"))
+
+`state_backend(name)` reads <NAME>_STATE_BACKEND and falls back to
+STATE_BACKEND ("pydantic" unless set). Nodes that need a modified copy of
+their state use `copy_state`, which works with either backend.
+"""
+
+import copy
+import dataclasses
+import os
+from functools import cache
+from typing import Annotated, Any, Hashable
+
+from langgraph.graph import StateGraph
+from pydantic import BaseModel
+
+STATE_BACKENDS = ("pydantic", "slots")
+STATE_BACKEND = os.getenv("STATE_BACKEND", "pydantic")
+
+
+def state_backend(graph_name: str) -> str:
+    """The backend configured for one graph, e.g. REPORT_STATE_BACKEND for "report"."""
+    backend = os.getenv(f"{graph_name.upper()}_STATE_BACKEND", STATE_BACKEND)
+    if backend not in STATE_BACKENDS:
+        raise ValueError(f"Unknown state backend '{backend}' for {graph_name}, expected one of {STATE_BACKENDS}")
+    return backend
+
+
+@cache
+def slots_state(model: type[BaseModel]) -> type:
+    """A `__slots__` dataclass with the fields, annotations (reducers included) and defaults of `model`."""
+    fields: list[tuple[str, Any, dataclasses.Field]] = []
+    for name, info in model.model_fields.items():
+        annotation = Annotated[(info.annotation, *info.metadata)] if info.metadata else info.annotation
+        if info.is_required():
+            spec = dataclasses.field()
+        elif info.default_factory is not None:
+            spec = dataclasses.field(default_factory=info.default_factory)
+        elif isinstance(info.default, (list, dict, set)):
+            # pydantic copies mutable defaults for every instance; so must we
+            spec = dataclasses.field(default_factory=lambda default=info.default: copy.deepcopy(default))
+        else:
+            spec = dataclasses.field(default=info.default)
+        fields.append((name, annotation, spec))
+    state_class = dataclasses.make_dataclass(f"{model.__name__}Slots", fields, slots=True, kw_only=True)
+    state_class.__module__ = model.__module__
+    return state_class
+
+
+def state_schema(model: type[BaseModel], backend: str) -> type:
+    """The class a graph built on `backend` uses for the state declared as `model`."""
+    if backend not in STATE_BACKENDS:
+        raise ValueError(f"Unknown state backend '{backend}', expected one of {STATE_BACKENDS}")
+    return slots_state(model) if backend == "slots" else model
+
+
+class _StateGraph(StateGraph):
+    """StateGraph whose nodes and routers all read the graph's own state class.
+
+    LangGraph otherwise takes a node's input class from its first parameter's
+    annotation, which is the pydantic model for every node in this repo.
+    """
+
+    def add_node(self, node: Any, action: Any = None, **kwargs: Any) -> "_StateGraph":
+        kwargs.setdefault("input_schema", self.state_schema)
+        super().add_node(node, action, **kwargs)
+        return self
+
+    def add_conditional_edges(self, source: str, path: Any, path_map: dict[Hashable, str] | list[str] | None = None) -> "_StateGraph":
+        existing = set(self.branches[source])
+        super().add_conditional_edges(source, path, path_map)
+        for name in set(self.branches[source]) - existing:
+            self.branches[source][name] = self.branches[source][name]._replace(input_schema=self.state_schema)
+        return self
+
+
+def state_graph(model: type[BaseModel], backend: str) -> StateGraph:
+    """A StateGraph for the state declared as `model`, running on `backend`."""
+    return _StateGraph(state_schema(model, backend))
+
+
+def copy_state(state: Any, **changes: Any) -> Any:
+    """A copy of a node's state with some fields changed, for either backend."""
+    if isinstance(state, BaseModel):
+        return state.model_copy(update=changes)
+    return dataclasses.replace(state, **changes)
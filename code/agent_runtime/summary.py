@@ -0,0 +1,47 @@
+"""
+One-line run summaries contributed by each subsystem.
+
+A subsystem registers a function that returns its line for the end-of-run
+summary, or None when it has nothing to report:
+
+    @summary_line
+    def speculation_summary() -> str | None:
+        ...
+
+Batch runs print `summary_lines()` under their latency table, so a new
+subsystem reports itself without changes to the batch runner. Lines come out
+in registration (import) order.
+
+This module only uses the standard library so every subsystem can import it.
+"""
+
+import logging
+from typing import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+SummaryLine = Callable[[], "str | None"]
+
+_LINES: list[SummaryLine] = []
+
+
+def summary_line(func: SummaryLine) -> SummaryLine:
+    """Register `func` as a summary line provider; returns it unchanged."""
+    if func not in _LINES:
+        _LINES.append(func)
+    return func
+
+
+def summary_lines() -> list[str]:
+    """The lines of every registered provider that has something to report."""
+    lines = []
+    for func in _LINES:
+        try:
+            line = func()
+        except Exception as e:
+            # A broken stats source should not cost the rest of the summary
+            _LOGGER.warning("Summary line %s failed: %s", func.__qualname__, e)
+            continue
+        if line:
+            lines.append(line)
+    return lines
@@ -0,0 +1,201 @@
+"""
+Record a run's model and search traffic, replay it offline and compare runs.
+
+    cd code
+    python -m agent_runtime.traffic record linkedin '{"prompt": "Teamwork in tech"}' -o run.jsonl.gz
+    python -m agent_runtime.traffic replay run.jsonl.gz --speed 0 -o replay.jsonl.gz
+    python -m agent_runtime.traffic compare run.jsonl.gz replay.jsonl.gz
+    python -m agent_runtime.traffic show run.jsonl.gz
+
+A replay runs the recorded request through this build with every model call
+and search answered from the cassette (see cassette.py), then prints how its
+call counts, latencies and output differ from the recording. Both commands
+start with empty LinkedIn caches unless --keep-caches is given, so a cache
+hit at record time does not turn into a missing search at replay time.
+"""
+
+import argparse
+import asyncio
+import difflib
+import json
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from .cassette import Player, Recorder, load_cassette, recording, replaying
+
+_LOGGER = logging.getLogger(__name__)
+
+_MAX_DIFF_LINES = 60
+
+
+def _prepare_env(keep_caches: bool, offline: bool) -> None:
+    # Must run before the agents are imported: their clients and caches read these at import time
+    if not keep_caches:
+        os.environ["LINKEDIN_CACHE_DIR"] = tempfile.mkdtemp(prefix="linkedin_cache_")
+    if offline:
+        # The clients need a key to be created; no request leaves the process
+        os.environ.setdefault("NVIDIA_API_KEY", "replay")
+        os.environ.setdefault("TAVILY_API_KEY", "replay")
+
+
+async def _run(agent: str, body: dict[str, Any]) -> dict[str, Any] | None:
+    from .agents import AGENTS, run_to_completion
+
+    return await run_to_completion(AGENTS[agent](body))
+
+
+async def record(agent: str, body: dict[str, Any], path: Path) -> Recorder:
+    """Run one request against the live endpoints and save its traffic."""
+    recorder = Recorder({"agent": agent, "body": body})
+    with recording(recorder):
+        recorder.result = await _run(agent, body)
+    recorder.save(path)
+    return recorder
+
+
+async def replay(path: Path, speed: float, out: Path | None = None) -> tuple[Recorder, Player]:
+    """Run a recorded request through this build, serving every call from the cassette."""
+    header, entries, _ = load_cassette(path)
+    recorder = Recorder({"agent": header["agent"], "body": header["body"], "replay_of": str(path), "speed": speed})
+    player = Player(entries, speed, recorder)
+    with replaying(player):
+        try:
+            recorder.result = await _run(header["agent"], header["body"])
+        except Exception as e:
+            _LOGGER.error("❌ Replay failed: %s", e)
+            recorder.result = {"type": "error", "error": str(e)}
+    if out:
+        recorder.save(out)
+    return recorder, player
+
+
+def _output(result: dict[str, Any] | None) -> str:
+    if not result:
+        return ""
+    return result.get("report") or result.get("final_post") or result.get("error") or ""
+
+
+def _summary(header: dict[str, Any], entries: list[dict[str, Any]]) -> dict[str, Any]:
+    from linkedin_agent.metrics import percentile
+
+    llm = [entry for entry in entries if entry["kind"] == "llm"]
+    searches = [entry for entry in entries if entry["kind"] == "search"]
+    latencies = [entry["latency"] for entry in llm]
+    models: dict[str, int] = {}
+    for entry in llm:
+        models[entry["model"]] = models.get(entry["model"], 0) + 1
+    return {
+        "wall": header.get("wall", 0.0),
+        "llm_calls": len(llm),
+        "searches": len(searches),
+        "llm_seconds": sum(latencies),
+        "llm_p50": percentile(latencies, 50),
+        "llm_p95": percentile(latencies, 95),
+        "ttft_p50": percentile([entry["ttft"] for entry in llm if "ttft" in entry], 50),
+        "search_seconds": sum(entry["latency"] for entry in searches),
+        "models": models,
+    }
+
+
+def compare(old_path: Path, new_path: Path) -> str:
+    """Call counts, latencies and output differences between two cassettes of the same request."""
+    old_header, old_entries, old_result = load_cassette(old_path)
+    new_header, new_entries, new_result = load_cassette(new_path)
+    old, new = _summary(old_header, old_entries), _summary(new_header, new_entries)
+
+    lines = [f"{'':<16}{'recorded':>12}{'replayed':>12}{'change':>10}"]
+    for name, fmt in (
+        ("wall", "{:.2f}s"), ("llm_calls", "{}"), ("searches", "{}"), ("llm_seconds", "{:.2f}s"),
+        ("llm_p50", "{:.2f}s"), ("llm_p95", "{:.2f}s"), ("ttft_p50", "{:.2f}s"), ("search_seconds", "{:.2f}s"),
+    ):
+        change = f"{(new[name] - old[name]) / old[name]:+.0%}" if old[name] else ""
+        lines.append(f"{name:<16}{fmt.format(old[name]):>12}{fmt.format(new[name]):>12}{change:>10}")
+    for model in sorted(set(old["models"]) | set(new["models"])):
+        lines.append(f"  {model:<30}{old['models'].get(model, 0):>6}{new['models'].get(model, 0):>12}")
+
+    matched = [entry.get("matched") for entry in new_entries if entry.get("matched")]
+    if matched:
+        lines.append(
+            f"Matched calls: {matched.count('exact')} exact, {matched.count('fuzzy')} fuzzy, "
+            f"{len(old_entries) - len(matched)} recorded calls unused"
+        )
+
+    old_text, new_text = _output(old_result), _output(new_result)
+    if old_text == new_text:
+        lines.append("Output: identical")
+    else:
+        diff = list(difflib.unified_diff(
+            old_text.splitlines(), new_text.splitlines(), "recorded", "replayed", lineterm="", n=1
+        ))
+        ratio = difflib.SequenceMatcher(None, old_text, new_text).ratio()
+        lines.append(f"Output: differs ({ratio:.0%} similar)")
+        lines.extend(diff[:_MAX_DIFF_LINES])
+        if len(diff) > _MAX_DIFF_LINES:
+            lines.append(f"... {len(diff) - _MAX_DIFF_LINES} more diff lines")
+    return "\n".join(lines)
+
+
+def show(path: Path) -> str:
+    """One line per recorded call."""
+    header, entries, result = load_cassette(path)
+    lines = [f"{header.get('agent')} run, {len(entries)} calls in {header.get('wall', 0):.2f}s: {json.dumps(header.get('body'))[:120]}"]
+    for entry in entries:
+        if entry["kind"] == "llm":
+            what = f"{entry['model']} ({entry['messages']} msgs{', stream' if entry['stream'] else ''}) {entry['prompt'][:60]!r}"
+        else:
+            what = f"search {entry['query']!r}"
+        lines.append(f"t+{entry['t']:>7.2f}s {entry['latency']:>6.2f}s  {what}")
+    lines.append(f"Output: {_output(result)[:200]!r}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record, replay and compare agent runs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Run a request live and record its traffic")
+    record_parser.add_argument("agent", choices=["reports", "linkedin"])
+    record_parser.add_argument("body", help="JSON request body")
+    record_parser.add_argument("-o", "--out", type=Path, required=True, help="Cassette to write (.jsonl or .jsonl.gz)")
+    record_parser.add_argument("--keep-caches", action="store_true", help="Use the existing LinkedIn caches")
+
+    replay_parser = commands.add_parser("replay", help="Re-run a recorded request offline and compare")
+    replay_parser.add_argument("cassette", type=Path)
+    replay_parser.add_argument("--speed", type=float, default=1.0, help="1 = recorded latencies, 0 = as fast as possible")
+    replay_parser.add_argument("-o", "--out", type=Path, help="Also write the replay's own cassette")
+    replay_parser.add_argument("--keep-caches", action="store_true", help="Use the existing LinkedIn caches")
+
+    compare_parser = commands.add_parser("compare", help="Compare two cassettes of the same request")
+    compare_parser.add_argument("recorded", type=Path)
+    compare_parser.add_argument("replayed", type=Path)
+
+    show_parser = commands.add_parser("show", help="List a cassette's calls")
+    show_parser.add_argument("cassette", type=Path)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
+
+    if args.command == "record":
+        _prepare_env(args.keep_caches, offline=False)
+        recorder = asyncio.run(record(args.agent, json.loads(args.body), args.out))
+        print(f"📼 Recorded {len(recorder.entries)} calls to {args.out}")
+    elif args.command == "replay":
+        _prepare_env(args.keep_caches, offline=True)
+        out = args.out or Path(tempfile.mkdtemp(prefix="replay_")) / "replay.jsonl.gz"
+        _, player = asyncio.run(replay(args.cassette, args.speed, out))
+        print(f"▶ Replayed {args.cassette}: {json.dumps(player.stats())}")
+        print(compare(args.cassette, out))
+        if player.missed:
+            sys.exit(1)
+    elif args.command == "compare":
+        print(compare(args.recorded, args.replayed))
+    else:
+        print(show(args.cassette))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Worker pool for the durable job queue (jobs.py).
+
+Each worker process runs its own event loop, claims jobs with a lease and
+keeps it alive with heartbeats while the run is in progress. Start as many
+workers as the machine (and the model quota) can take:
+
+    cd code
+    python -m agent_runtime.workers enqueue linkedin '{"prompt": "Teamwork in tech"}'
+    python -m agent_runtime.workers work --workers 4 --concurrency 2
+    python -m agent_runtime.workers stats
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from contextlib import aclosing
+from pathlib import Path
+from typing import Any
+
+from linkedin_agent.loop_monitor import maybe_start_loop_monitor
+
+from .agents import AGENTS, run_to_completion
+from .jobs import JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOBS_DB, Job, JobStore
+from .ledger import BudgetExceeded
+from .scheduler import PRIORITY_CLASSES, set_priority
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds an idle worker waits before polling the queue again
+_POLL_INTERVAL = 0.5
+
+
+def _priority(job: Job) -> str:
+    """The job's scheduling class; a missing or null "priority" means batch."""
+    return job.payload.get("priority") or "batch"
+
+
+async def _run_job(job: Job, events: Any) -> dict[str, Any] | None:
+    # Runs in its own task: queue this job's model calls as one flow of its tenant
+    set_priority(_priority(job), flow=f"{job.payload.get('tenant', 'jobs')}:{job.id}")
+    async with aclosing(events):
+        return await run_to_completion(events)
+
+
+async def _process(store: JobStore, job: Job, worker: str, lease_seconds: float) -> None:
+    """Run one claimed job, heartbeating until it finishes or the lease is lost."""
+    try:
+        if job.kind not in AGENTS:
+            raise ValueError(f"Unknown job kind '{job.kind}'")
+        if _priority(job) not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority '{job.payload['priority']}'")
+        events = AGENTS[job.kind](job.payload)
+    except (ValueError, TypeError) as e:
+        # A malformed job fails the same way on every attempt
+        _LOGGER.error("❌ Job %s (%s) is invalid: %s", job.id, job.kind, e)
+        await asyncio.to_thread(store.fail, job.id, worker, str(e), False)
+        return
+
+    run = asyncio.create_task(_run_job(job, events))
+
+    async def keep_lease() -> None:
+        while True:
+            await asyncio.sleep(lease_seconds / 3)
+            if not await asyncio.to_thread(store.heartbeat, job.id, worker, lease_seconds):
+                _LOGGER.warning("⚠️  Lost the lease on job %s, abandoning it", job.id)
+                run.cancel()
+                return
+
+    heartbeats = asyncio.create_task(keep_lease())
+    start = time.perf_counter()
+    try:
+        result = await run
+    except asyncio.CancelledError:
+        if heartbeats.done():
+            return  # lease lost; whoever holds it now owns the job
+        raise
+    except BudgetExceeded as e:
+        # Retrying would spend the same budget again
+        _LOGGER.error("💸 Job %s (%s) ran out of budget: %s", job.id, job.kind, e)
+        await asyncio.to_thread(store.fail, job.id, worker, str(e), False)
+        return
+    except Exception as e:
+        _LOGGER.error("❌ Job %s (%s) attempt %d/%d failed: %s", job.id, job.kind, job.attempts, job.max_attempts, e)
+        await asyncio.to_thread(store.fail, job.id, worker, str(e))
+        return
+    finally:
+        heartbeats.cancel()
+
+    if result is None:
+        await asyncio.to_thread(store.fail, job.id, worker, "Run finished without a result")
+    elif await asyncio.to_thread(store.complete, job.id, worker, result):
+        _LOGGER.info("✅ Job %s (%s) finished in %.1fs", job.id, job.kind, time.perf_counter() - start)
+
+
+async def work(
+    store: JobStore,
+    worker: str,
+    concurrency: int = 1,
+    lease_seconds: float = JOB_LEASE_SECONDS,
+    kinds: list[str] | None = None,
+    exit_when_idle: bool = False,
+) -> None:
+    """Claim and run jobs forever, `concurrency` at a time."""
+    maybe_start_loop_monitor()
+    running: set[asyncio.Task] = set()
+    while True:
+        while len(running) < concurrency:
+            job = await asyncio.to_thread(store.claim, worker, lease_seconds, kinds)
+            if job is None:
+                break
+            _LOGGER.info("▶ %s claimed job %s (%s, attempt %d)", worker, job.id, job.kind, job.attempts)
+            task = asyncio.create_task(_process(store, job, worker, lease_seconds))
+            running.add(task)
+            task.add_done_callback(running.discard)
+
+        if exit_when_idle and not running:
+            return
+        if running and len(running) >= concurrency:
+            await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        else:
+            await asyncio.sleep(_POLL_INTERVAL)
+
+
+def _worker_main(path: str, worker: str, concurrency: int, lease_seconds: float, kinds: list[str] | None, exit_when_idle: bool) -> None:
+    logging.basicConfig(level=logging.INFO, format=f"%(levelname)s [{worker}]: %(message)s")
+    store = JobStore(Path(path))
+    try:
+        asyncio.run(work(store, worker, concurrency, lease_seconds, kinds, exit_when_idle))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.close()
+
+
+def start_workers(
+    workers: int,
+    path: Path = JOBS_DB,
+    concurrency: int = 1,
+    lease_seconds: float = JOB_LEASE_SECONDS,
+    kinds: list[str] | None = None,
+    exit_when_idle: bool = False,
+) -> list[multiprocessing.Process]:
+    """Start `workers` worker processes on this machine, each running `concurrency` jobs at a time."""
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    for number in range(workers):
+        worker = f"{socket.gethostname()}:{os.getpid()}:w{number}"
+        process = context.Process(
+            target=_worker_main,
+            args=(str(path), worker, concurrency, lease_seconds, kinds, exit_when_idle),
+            name=worker,
+        )
+        process.start()
+        processes.append(process)
+    return processes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Durable job queue for the report and LinkedIn agents")
+    parser.add_argument("--db", type=Path, default=JOBS_DB, help="Job database (AGENT_JOBS_DB)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Queue one job, or one per line of a JSONL file")
+    enqueue.add_argument("kind", choices=["reports", "linkedin"])
+    enqueue.add_argument("payload", help="JSON request body, or @file.jsonl")
+    enqueue.add_argument("--max-attempts", type=int, default=JOB_MAX_ATTEMPTS)
+
+    work_parser = commands.add_parser("work", help="Run a pool of worker processes")
+    work_parser.add_argument("--workers", type=int, default=2)
+    work_parser.add_argument("--concurrency", type=int, default=1, help="Jobs each worker runs at once")
+    work_parser.add_argument("--lease", type=float, default=JOB_LEASE_SECONDS, help="Lease length in seconds")
+    work_parser.add_argument("--kind", action="append", choices=["reports", "linkedin"], help="Only run these kinds")
+    work_parser.add_argument("--exit-when-idle", action="store_true", help="Stop once the queue is empty")
+
+    commands.add_parser("stats", help="Queue depth, throughput and latency percentiles")
+    show = commands.add_parser("show", help="Print a job and its result")
+    show.add_argument("job_id")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    store = JobStore(args.db)
+
+    if args.command == "enqueue":
+        if args.payload.startswith("@"):
+            with open(args.payload[1:], encoding="utf-8") as f:
+                payloads = [json.loads(line) for line in f if line.strip()]
+        else:
+            payloads = [json.loads(args.payload)]
+        for payload in payloads:
+            print(store.enqueue(args.kind, payload, args.max_attempts))
+    elif args.command == "work":
+        processes = start_workers(args.workers, args.db, args.concurrency, args.lease, args.kind, args.exit_when_idle)
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.join()
+    elif args.command == "stats":
+        print(json.dumps(store.stats(), indent=2))
+    else:
+        job = store.get(args.job_id)
+        if job is None:
+            sys.exit(f"No job {args.job_id}")
+        print(json.dumps(job, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
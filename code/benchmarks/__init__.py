@@ -0,0 +1 @@
+"""Benchmarks for the agents, run against a local OpenAI-compatible stand-in."""
@@ -0,0 +1,269 @@
+"""
+Local OpenAI-compatible stand-in for the NVIDIA endpoints.
+
+Serves /v1/models and /v1/chat/completions (plain and streaming) with canned
+replies shaped like the agents expect: critique JSON for critique prompts,
+JSON matching the requested schema for structured output, an industry name
+for the classifier and a short post otherwise. Benchmarks can pass their own
+reply function, which may also answer with tool calls. It also answers Tavily's
+/search with a few canned results. Every chat request body is recorded so
+benchmarks can inspect exactly what the agents sent.
+
+Point the agents at it with NVIDIA_BASE_URL=http://127.0.0.1:<port>/v1 (and
+TAVILY_BASE_URL=http://127.0.0.1:<port>) before importing them (ChatNVIDIA
+lists the available models when it is created):
+
+    python -m benchmarks.fake_openai --port 8765 --delay 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Callable
+
+from aiohttp import web
+
+# A reply is the message text, or an assistant message dict (e.g. with "tool_calls")
+ReplyFunction = Callable[[dict[str, Any]], str | dict[str, Any]]
+SearchFunction = Callable[[dict[str, Any]], dict[str, Any]]
+
+_POST = (
+    "I was told this would never work... 🚀\n\n"
+    "Three months later our team shipped it, and here is what I learned about persistence. 💡\n\n"
+    "Great work is rarely a straight line. It is a series of small, stubborn decisions. 🔥\n\n"
+    "What is the project that taught you the most? 👇\n\n"
+    "#AI #Tech #Growth #Leadership #Innovation #DevOps"
+)
+
+
+def example_from_schema(schema: dict[str, Any], root: dict[str, Any] | None = None) -> Any:
+    """Build a minimal instance of a JSON schema (resolving local $refs)."""
+    root = root or schema
+    if "$ref" in schema:
+        name = schema["$ref"].rsplit("/", 1)[-1]
+        return example_from_schema(root.get("$defs", root.get("definitions", {}))[name], root)
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [option for option in schema[key] if option.get("type") != "null"]
+            return example_from_schema(options[0] if options else schema[key][0], root)
+    if "enum" in schema:
+        return schema["enum"][0]
+
+    kind = schema.get("type", "object")
+    if kind == "object":
+        return {
+            name: example_from_schema(prop, root) for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [example_from_schema(schema.get("items", {"type": "string"}), root) for _ in range(3)]
+    if kind == "boolean":
+        return False
+    if kind in ("integer", "number"):
+        return 1
+    return "example"
+
+
+def default_reply(body: dict[str, Any]) -> str:
+    """Canned reply for a chat completion request."""
+    schema = ((body.get("response_format") or {}).get("json_schema") or {}).get("schema")
+    if schema:
+        return json.dumps(example_from_schema(schema))
+
+    text = json.dumps(body.get("messages", []))
+    if '\\"critiques\\"' in text:
+        count = text.count("--- DRAFT ")
+        return json.dumps({"critiques": [
+            {
+                "draft": number,
+                "scores": {"engagement_potential": 6 + number % 3, "slop_authenticity": 7, "algorithm_optimization": 7},
+                "overall_score": 6.5 + (number % 3) * 0.5,
+                "strengths": ["Strong hook"],
+                "weaknesses": ["Generic lesson"],
+                "improvements": ["Make the closing question more specific"],
+                "verdict": "CONTINUE",
+                "reasoning": "Solid but generic",
+            }
+            for number in range(1, count + 1)
+        ]})
+    if "RESPONSE FORMAT (JSON)" in text:
+        return json.dumps({
+            "scores": {"engagement_potential": 7, "slop_authenticity": 7, "algorithm_optimization": 8},
+            "overall_score": 7.3,
+            "strengths": ["Strong hook"],
+            "weaknesses": ["Generic lesson"],
+            "improvements": ["Make the closing question more specific"],
+            "verdict": "CONTINUE",
+            "reasoning": "Solid but generic",
+        })
+    if '\\"topics\\"' in text:
+        return json.dumps({"topics": ["AI agents", "GPU computing", "Developer productivity"]})
+    if text.rstrip('"]} ').endswith("INDUSTRY:"):
+        return "software"
+    return _POST
+
+
+def search_reply(body: dict[str, Any]) -> dict[str, Any]:
+    """Canned Tavily search response for a query."""
+    query = body.get("query", "")
+    return {
+        "query": query,
+        "response_time": 0.1,
+        "results": [
+            {
+                "title": f"{query} - result {number}",
+                "url": f"https://example.com/{number}/{abs(hash(query)) % 10_000}",
+                "content": f"Notes on {query}. Teams report faster delivery with #AI and #DevOps practices.",
+                "raw_content": None,
+                "score": 1 - number / 10,
+                "published_date": "Mon, 01 Sep 2025 09:00:00 GMT",
+            }
+            for number in range(1, min(int(body.get("max_results") or 3), 3) + 1)
+        ],
+    }
+
+
+class FakeOpenAIServer:
+    """In-process OpenAI-compatible server that records the requests it receives."""
+
+    def __init__(
+        self,
+        delay: float = 0.0,
+        reply: ReplyFunction = default_reply,
+        tokens_per_second: float = 0.0,
+        search: SearchFunction = search_reply,
+    ):
+        self.delay = delay
+        self.reply = reply
+        self.search = search
+        self.tokens_per_second = tokens_per_second
+        self.requests: list[dict[str, Any]] = []
+        self.base_url: str | None = None
+        self._lock = threading.Lock()
+        self._runner: web.AppRunner | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_get("/v1/models", self._models)
+        app.router.add_post("/v1/chat/completions", self._chat)
+        app.router.add_post("/search", self._search)
+        return app
+
+    async def _search(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        await asyncio.sleep(self.delay)
+        return web.json_response(self.search(body))
+
+    async def _models(self, request: web.Request) -> web.Response:
+        return web.json_response({"object": "list", "data": []})
+
+    async def _chat(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        with self._lock:
+            self.requests.append(body)
+        reply = self.reply(body)
+        message = {"role": "assistant", **reply} if isinstance(reply, dict) else {"role": "assistant", "content": reply}
+        content = message.get("content") or ""
+        prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+        completion_tokens = max(1, len(content or json.dumps(message.get("tool_calls", ""))) // 4)
+        await asyncio.sleep(self.delay)
+        if self.tokens_per_second:
+            await asyncio.sleep(completion_tokens / self.tokens_per_second)
+
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        base = {"id": "fake", "model": body.get("model", "fake"), "created": int(time.time())}
+
+        if not body.get("stream"):
+            return web.json_response({
+                **base,
+                "object": "chat.completion",
+                "choices": [{
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+                }],
+                "usage": usage,
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for start in range(0, len(content), 16):
+            chunk = {
+                **base,
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": {"role": "assistant", "content": content[start:start + 16]}, "finish_reason": None}],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        if message.get("tool_calls"):
+            delta = {"role": "assistant", "tool_calls": [
+                {"index": index, **tool_call} for index, tool_call in enumerate(message["tool_calls"])
+            ]}
+            chunk = {**base, "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        final = {
+            **base,
+            "object": "chat.completion.chunk",
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "tool_calls" if message.get("tool_calls") else "stop"}],
+            "usage": usage,
+        }
+        await response.write(f"data: {json.dumps(final)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving on the running loop and return the /v1 base URL."""
+        self._runner = web.AppRunner(self._app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # resolve port 0
+        self.base_url = f"http://{host}:{port}/v1"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def start_in_thread(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve from a background thread, so synchronous clients in this process can use it."""
+        started = threading.Event()
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start(host, port))
+            started.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=run, name="fake-openai", daemon=True).start()
+        started.wait()
+        assert self.base_url
+        return self.base_url
+
+    def take_requests(self) -> list[dict[str, Any]]:
+        """Return and clear the recorded requests."""
+        with self._lock:
+            requests, self.requests = self.requests, []
+        return requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in for the NVIDIA endpoints")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.05, help="Seconds of latency added to every response")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Simulated decode speed (0 = instant)")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(delay=args.delay, tokens_per_second=args.tokens_per_second)
+    web.run_app(server._app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Load test for the agent service (agent_runtime) against local stand-ins.
+
+By default it starts the OpenAI/Tavily stand-in (fake_openai.py) and the agent
+service in this process, then fires requests at the service from a pool of
+concurrent clients. Pass --url to target a service that is already running.
+Reports throughput, latency percentiles (time to first event when streaming),
+how many requests were turned away with 429 and the server's admission stats.
+
+    cd code && python -m benchmarks.load_test --requests 64 --clients 32 --max-active 8 --max-queue 8
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import tempfile
+import time
+import warnings
+from collections import Counter
+from typing import Any
+
+import aiohttp
+
+from .fake_openai import FakeOpenAIServer
+
+POSTS = [
+    {"prompt": "Write about shipping our first GPU-accelerated Python service", "emoji_level": 3},
+    {"prompt": "Share lessons from a failed fintech product launch", "ragebait_level": 4},
+    {"prompt": "Celebrate our nonprofit volunteers after the community event", "hashtag_level": 1},
+]
+REPORTS = [
+    {"topic": "NVIDIA NIM microservices", "report_structure": "Introduction, two body sections, conclusion"},
+    {"topic": "Vector databases for RAG", "report_structure": "Overview, architecture, summary"},
+]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    from linkedin_agent.metrics import percentile
+
+    return percentile(values, pct)
+
+
+async def _one_request(
+    session: aiohttp.ClientSession, url: str, agent: str, body: dict[str, Any], stream: bool
+) -> dict[str, Any]:
+    path = "/v1/linkedin/posts" if agent == "linkedin" else "/v1/reports"
+    start = time.perf_counter()
+    first_event = None
+    status: int | str = 0
+    async with session.post(url + path + ("?stream=1" if stream else ""), json=body) as response:
+        status = response.status
+        if response.status == 200 and stream:
+            async for line in response.content:
+                if first_event is None and line.startswith(b"data:"):
+                    first_event = time.perf_counter() - start
+                if line.startswith(b"event: error"):
+                    status = "error event"
+        else:
+            await response.read()
+        return {
+            "agent": agent,
+            "status": status,
+            "latency": time.perf_counter() - start,
+            "first_event": first_event,
+        }
+
+
+async def run_load(url: str, requests: int, clients: int, agents: list[str], stream: bool) -> list[dict[str, Any]]:
+    """Send `requests` requests from `clients` concurrent clients, cycling through the agents."""
+    work = asyncio.Queue()
+    bodies = {"linkedin": itertools.cycle(POSTS), "reports": itertools.cycle(REPORTS)}
+    for agent, _ in zip(itertools.cycle(agents), range(requests)):
+        work.put_nowait((agent, next(bodies[agent])))
+
+    results: list[dict[str, Any]] = []
+    timeout = aiohttp.ClientTimeout(total=None)
+
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+
+        async def client() -> None:
+            while not work.empty():
+                agent, body = work.get_nowait()
+                try:
+                    results.append(await _one_request(session, url, agent, body, stream))
+                except aiohttp.ClientError as e:
+                    results.append({"agent": agent, "status": type(e).__name__, "latency": 0.0, "first_event": None})
+
+        await asyncio.gather(*(client() for _ in range(clients)))
+    return results
+
+
+def report(results: list[dict[str, Any]], wall_time: float, server_stats: dict[str, Any] | None) -> None:
+    statuses = Counter(result["status"] for result in results)
+    ok = [result for result in results if result["status"] == 200]
+    print(f"Requests: {len(results)} in {wall_time:.1f}s  statuses: {dict(statuses)}")
+    print(f"Throughput: {len(ok) / wall_time:.2f} completed runs/s")
+    print(f"{'agent':<10}{'ok':>5}{'p50':>9}{'p95':>9}{'p99':>9}{'first event p50':>17}")
+    for agent in sorted({result["agent"] for result in ok}):
+        latencies = [result["latency"] for result in ok if result["agent"] == agent]
+        firsts = [result["first_event"] for result in ok if result["agent"] == agent and result["first_event"] is not None]
+        print(
+            f"{agent:<10}{len(latencies):>5}{_percentile(latencies, 50):>8.2f}s{_percentile(latencies, 95):>8.2f}s"
+            f"{_percentile(latencies, 99):>8.2f}s{(f'{_percentile(firsts, 50):.3f}s' if firsts else '-'):>17}"
+        )
+    rejected = [result["latency"] for result in results if result["status"] == 429]
+    if rejected:
+        print(f"429s answered in p50 {_percentile(rejected, 50) * 1000:.1f}ms")
+    if server_stats:
+        print("Server admission: " + json.dumps(server_stats["admission"]))
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    agents = ["linkedin", "reports"] if args.agent == "mix" else [args.agent]
+    runner = None
+    url = args.url
+
+    if not url:
+        from aiohttp import web
+
+        from agent_runtime.server import create_app
+        from linkedin_agent.limits import configure_limits
+
+        configure_limits(args.llm_concurrency, None)
+        runner = web.AppRunner(create_app(args.max_active, args.max_queue))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"  # resolve port 0
+
+    start = time.perf_counter()
+    results = await run_load(url, args.requests, args.clients, agents, args.stream)
+    wall_time = time.perf_counter() - start
+
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url + "/stats") as response:
+            server_stats = await response.json() if response.status == 200 else None
+    report(results, wall_time, server_stats)
+
+    if runner:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the agent service")
+    parser.add_argument("--url", default=None, help="Running service to target (default: start one in-process)")
+    parser.add_argument("--agent", choices=["linkedin", "reports", "mix"], default="linkedin")
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent client connections")
+    parser.add_argument("--stream", action="store_true", help="Request server-sent events")
+    parser.add_argument("--delay", type=float, default=0.05, help="Stand-in latency per model call/search")
+    parser.add_argument("--max-active", type=int, default=8)
+    parser.add_argument("--max-queue", type=int, default=16)
+    parser.add_argument("--llm-concurrency", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if not args.url:
+        fake = FakeOpenAIServer(delay=args.delay)
+        base_url = fake.start_in_thread()
+        os.environ["NVIDIA_BASE_URL"] = base_url
+        os.environ["TAVILY_BASE_URL"] = base_url.removesuffix("/v1")
+        os.environ.setdefault("NVIDIA_API_KEY", "fake")
+        os.environ.setdefault("TAVILY_API_KEY", "fake")
+        os.environ.setdefault("LINKEDIN_CACHE_DIR", tempfile.mkdtemp(prefix="linkedin_cache_"))
+        # Identical report requests would otherwise be answered from the response cache
+        os.environ.setdefault("LLM_CACHE", "0")
+        warnings.filterwarnings("ignore", message=".*structured output")
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
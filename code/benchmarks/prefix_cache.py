@@ -0,0 +1,188 @@
+"""
+Check that prompts start with a byte-identical static prefix across requests.
+
+Runs the prompt-building nodes of both agents with varied topics, sections,
+prompts and style levels against the local stand-in (fake_openai.py), then
+reports for each prompt family whether every request starts with the
+family's static instruction block and how much of the prompt the requests
+share. Server-side KV prefix caching can only reuse that shared part.
+
+    cd code && python -m benchmarks.prefix_cache
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import warnings
+from typing import Any, Awaitable, Callable
+
+from .fake_openai import FakeOpenAIServer
+
+TOPICS = [
+    ("NVIDIA NIM microservices", "Introduction, three body sections, conclusion"),
+    ("Vector databases for RAG", "Overview, architecture, benchmarks, summary"),
+    ("Kubernetes GPU scheduling", "Background, scheduler internals, case study, conclusion"),
+]
+SECTIONS = [
+    ("Introduction", "Why the topic matters and what the report covers", False),
+    ("Architecture", "Main components and how requests flow between them", True),
+]
+POSTS = [
+    ("Write about shipping our first GPU-accelerated Python service", (3, 3, 3, 2, 3, 3)),
+    ("Share lessons from a failed fintech product launch", (1, 5, 4, 4, 2, 5)),
+    ("Celebrate our nonprofit volunteers after the community event", (5, 1, 1, 1, 5, 1)),
+    ("Hot take: most marketing campaigns ignore storytelling", (2, 4, 5, 5, 4, 2)),
+]
+
+
+def _flatten(request: dict[str, Any]) -> str:
+    return "\n".join(str(message.get("content", "")) for message in request.get("messages", []))
+
+
+def _common_prefix(texts: list[str]) -> int:
+    if not texts:
+        return 0
+    shortest = min(texts, key=len)
+    for index, char in enumerate(shortest):
+        if any(text[index] != char for text in texts):
+            return index
+    return len(shortest)
+
+
+async def _run_all(calls: list[Callable[[], Awaitable[Any]]]) -> None:
+    for call in calls:
+        try:
+            await call()
+        except Exception as e:  # the stand-in's replies are not always what a node wants
+            logging.getLogger(__name__).debug("Call failed: %s", e)
+
+
+async def collect(server: FakeOpenAIServer) -> list[tuple[str, str, list[str]]]:
+    """Run every prompt family and return (family, expected static prefix, flattened requests)."""
+    from docgen_agent import agent, author, researcher
+    from docgen_agent.prompts import (
+        report_planner_instructions,
+        research_prompt,
+        section_research_prompt,
+        section_writing_prompt,
+        static_prefix,
+    )
+    from linkedin_agent.industry_analyzer import (
+        INDUSTRY_CLASSIFIER_INSTRUCTIONS,
+        INDUSTRY_CLASSIFIER_SYSTEM_PROMPT,
+        industry_analyzer_agent,
+    )
+    from linkedin_agent.linkedin_author import AUTHOR_INSTRUCTIONS, AUTHOR_SYSTEM_PROMPT, linkedin_author_agent
+    from linkedin_agent.linkedin_critiquer import CRITIQUE_INSTRUCTIONS, CRITIQUER_SYSTEM_PROMPT, linkedin_critiquer_agent
+    from linkedin_agent.linkedin_state import LinkedInAgentState
+
+    def section_state(topic: str, name: str, description: str, research: bool) -> Any:
+        section = author.Section(name=name, description=description, research=research, content="")
+        return author.SectionWriterState(section=section, topic=topic)
+
+    def post_state(prompt: str, levels: tuple[int, ...]) -> LinkedInAgentState:
+        grammar, emoji, hashtag, ragebait, inspirational, informational = levels
+        return LinkedInAgentState(
+            initial_prompt=prompt,
+            industry="software",
+            trending_topics=["AI agents", "GPU computing"],
+            trending_hashtags=["#AI", "#GPU"],
+            grammar_level=grammar,
+            emoji_level=emoji,
+            hashtag_level=hashtag,
+            ragebait_level=ragebait,
+            inspirational_level=inspirational,
+            informational_level=informational,
+        )
+
+    families: list[tuple[str, str, list[Callable[[], Awaitable[Any]]]]] = [
+        (
+            "docgen.report_planner",
+            static_prefix(report_planner_instructions),
+            [lambda t=t, s=s: agent.report_planner(agent.AgentState(topic=t, report_structure=s), {}) for t, s in TOPICS],
+        ),
+        (
+            "docgen.topic_research",
+            static_prefix(research_prompt),
+            [lambda t=t: researcher.call_model(researcher.ResearcherState(topic=t), {}) for t, _ in TOPICS],
+        ),
+        (
+            "docgen.section_research",
+            static_prefix(section_research_prompt),
+            [
+                lambda t=t, n=n, d=d: author.research_model(section_state(t, n, d, True), {})
+                for t, _ in TOPICS for n, d, _ in SECTIONS
+            ],
+        ),
+        (
+            "docgen.section_writing",
+            static_prefix(section_writing_prompt),
+            [
+                lambda t=t, n=n, d=d, r=r: author.writing_model(section_state(t, n, d, r), {})
+                for t, _ in TOPICS for n, d, r in SECTIONS
+            ],
+        ),
+        (
+            "linkedin.industry",
+            f"{INDUSTRY_CLASSIFIER_SYSTEM_PROMPT}\n{INDUSTRY_CLASSIFIER_INSTRUCTIONS}",
+            [lambda p=p, l=l: industry_analyzer_agent(post_state(p, l), {}) for p, l in POSTS],
+        ),
+        (
+            "linkedin.author",
+            f"{AUTHOR_SYSTEM_PROMPT}\n{AUTHOR_INSTRUCTIONS}",
+            [lambda p=p, l=l: linkedin_author_agent(post_state(p, l), {}) for p, l in POSTS],
+        ),
+        (
+            "linkedin.critique",
+            f"{CRITIQUER_SYSTEM_PROMPT}\n{CRITIQUE_INSTRUCTIONS}",
+            [
+                lambda p=p, l=l: linkedin_critiquer_agent(
+                    post_state(p, l).model_copy(update={"post_drafts": [f"Draft about {p}"]}), {}
+                )
+                for p, l in POSTS
+            ],
+        ),
+    ]
+
+    results = []
+    for name, prefix, calls in families:
+        server.take_requests()
+        await _run_all(calls)
+        requests = [_flatten(request) for request in server.take_requests()]
+        results.append((name, prefix, requests))
+    return results
+
+
+def report(results: list[tuple[str, str, list[str]]]) -> bool:
+    """Print one line per family; returns True if every family kept its static prefix."""
+    print(f"{'family':<26}{'requests':>9}{'static':>8}{'identical':>11}{'shared':>9}{'mean':>8}{'cacheable':>11}")
+    ok = True
+    for name, prefix, requests in results:
+        identical = bool(requests) and all(request.startswith(prefix) for request in requests)
+        shared = _common_prefix(requests)
+        mean = sum(len(request) for request in requests) / len(requests) if requests else 0
+        ok &= identical
+        print(
+            f"{name:<26}{len(requests):>9}{len(prefix):>8}{'yes' if identical else 'NO':>11}"
+            f"{shared:>9}{mean:>8.0f}{shared / mean if mean else 0:>11.0%}"
+        )
+    return ok
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.WARNING)
+    server = FakeOpenAIServer()
+    os.environ["NVIDIA_BASE_URL"] = server.start_in_thread()
+    os.environ.setdefault("NVIDIA_API_KEY", "fake")
+    os.environ.setdefault("TAVILY_API_KEY", "fake")  # no searches are made
+    os.environ.setdefault("LINKEDIN_CACHE_DIR", tempfile.mkdtemp(prefix="linkedin_cache_"))
+    warnings.filterwarnings("ignore", message=".*structured output")
+
+    ok = report(asyncio.run(collect(server)))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
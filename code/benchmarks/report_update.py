@@ -0,0 +1,135 @@
+"""
+Time to update a report after a small edit, against writing it again.
+
+Writes a report with many sections against the local stand-in (fake_openai.py,
+run in a child process), whose planner turns each "- Name: description" line
+of the report structure into a section. Then one line of the structure is
+edited and the report is written twice more: from scratch, and as an update
+of the first run (docgen_agent/incremental.py). For each run the benchmark
+reports the sections written, the prompt tokens sent and the wall time,
+with `--llm-concurrency` model calls in flight at once.
+
+    cd code && python -m benchmarks.report_update --sections 12 --edits 1 --llm-concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+import warnings
+from typing import Any
+
+from aiohttp import web
+
+from .fake_openai import FakeOpenAIServer, default_reply
+from .research_memory import _free_port, _wait_for
+
+_SECTION = "The section covers this part of the topic in depth. " * 40
+_ORGANIZATION = "The report should follow this organization:"
+
+
+def structure(sections: int, edited: int = 0) -> str:
+    """One line per section; the first `edited` lines reworded."""
+    lines = []
+    for number in range(1, sections + 1):
+        description = f"Aspect {number} of the topic, with examples and trade-offs"
+        if number <= edited:
+            description = f"Aspect {number} of the topic, rewritten around cost and operations"
+        lines.append(f"- Part {number}: {description}")
+    return "\n".join(lines)
+
+
+def reply(body: dict[str, Any]) -> str:
+    """A plan with a section per structure line; a long text for every section."""
+    schema = ((body.get("response_format") or {}).get("json_schema") or {}).get("schema") or {}
+    messages = body.get("messages", [])
+    if "sections" in schema.get("properties", {}):
+        prompt = str(messages[0].get("content", ""))
+        organization = prompt.split(_ORGANIZATION, 1)[-1].split("\n\nThis report was planned before", 1)[0]
+        sections = []
+        for line in organization.strip().splitlines():
+            name, _, description = line.removeprefix("- ").partition(": ")
+            sections.append({"name": name, "description": description, "research": False, "content": ""})
+        return json.dumps({"title": "Benchmark report", "sections": sections})
+    if "Section name:" in str(messages[0].get("content", "")):
+        return _SECTION
+    if body.get("tools"):
+        return "Research complete."
+    return default_reply(body)
+
+
+def _serve(port: int, delay: float, tokens_per_second: float) -> None:
+    server = FakeOpenAIServer(delay=delay, reply=reply, tokens_per_second=tokens_per_second)
+    web.run_app(server._app(), host="127.0.0.1", port=port, print=None)
+
+
+async def measure(report_structure: str, previous_plan: Any = None) -> dict[str, Any]:
+    """Write the report and return its plan, sections written, prompt tokens and wall time."""
+    from docgen_agent import async_write_report
+
+    start = time.perf_counter()
+    result = await async_write_report("GPU inference serving", report_structure, previous_plan=previous_plan)
+    wall = time.perf_counter() - start
+    writers = result["usage"]["by_node"].get("section_author_orchestrator/writer", {})
+    return {
+        "plan": result["report_plan"],
+        "written": writers.get("calls", 0),
+        "sections": len(result["report_plan"].sections),
+        "prompt_tokens": result["usage"]["prompt_tokens"],
+        "wall": wall,
+    }
+
+
+async def _measure_all(sections: int, edits: int) -> list[tuple[str, dict[str, Any]]]:
+    first = await measure(structure(sections))
+    edited = structure(sections, edits)
+    return [
+        ("first run", first),
+        ("rewrite", await measure(edited)),
+        ("update", await measure(edited, first["plan"])),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report update time against a full rewrite")
+    parser.add_argument("--sections", type=int, default=12)
+    parser.add_argument("--edits", type=int, default=1, help="Structure lines edited between runs")
+    parser.add_argument("--delay", type=float, default=0.05, help="Stand-in latency per call")
+    parser.add_argument("--tokens-per-second", type=float, default=500, help="Stand-in streaming speed")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Model calls in flight at once")
+    args = parser.parse_args()
+
+    port = _free_port()
+    server = multiprocessing.Process(target=_serve, args=(port, args.delay, args.tokens_per_second), daemon=True)
+    server.start()
+    _wait_for(port)
+
+    logging.basicConfig(level=logging.ERROR)
+    os.environ["NVIDIA_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    os.environ["TAVILY_BASE_URL"] = f"http://127.0.0.1:{port}"
+    os.environ.setdefault("NVIDIA_API_KEY", "fake")
+    os.environ.setdefault("TAVILY_API_KEY", "fake")
+    os.environ["LLM_CACHE"] = "0"
+    warnings.filterwarnings("ignore")
+
+    from agent_runtime.scheduler import get_scheduler
+
+    # With a bounded pool, section writers queue and the run time follows the sections written
+    get_scheduler().configure(args.llm_concurrency)
+    try:
+        results = asyncio.run(_measure_all(args.sections, args.edits))
+        print(f"{'run':<12}{'sections':>9}{'written':>9}{'prompt tokens':>15}{'wall':>9}")
+        for name, stats in results:
+            print(
+                f"{name:<12}{stats['sections']:>9}{stats['written']:>9}"
+                f"{stats['prompt_tokens']:>15}{stats['wall']:>8.2f}s"
+            )
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
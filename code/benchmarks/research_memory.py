@@ -0,0 +1,174 @@
+"""
+Peak memory of a report run with and without research compaction.
+
+Writes one report with many researched sections against the local stand-in
+(fake_openai.py, run in a child process so only the agent is measured). The
+stand-in answers the research prompts with search tool calls and the
+searches with long, partly overlapping results. The report is written once
+with the raw topic research copied into every section writer and once with
+the compacted digest (docgen_agent/digest.py). For each run the benchmark
+reports the tracemalloc peak, the prompt tokens sent and the wall time.
+
+    cd code && python -m benchmarks.research_memory --sections 20
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import time
+import tracemalloc
+import warnings
+import zlib
+from typing import Any
+
+from aiohttp import web
+
+from .fake_openai import FakeOpenAIServer, default_reply
+
+_TOPIC_ROUNDS = 2  # search rounds in the topic research
+_URL_POOL = 40  # distinct source URLs, so later searches repeat earlier sources
+_SECTION = "The section covers the topic in depth. " * 50
+
+
+def _sections(count: int) -> list[dict[str, Any]]:
+    return [
+        {"name": f"Section {number}", "description": f"Aspect {number} of the topic", "research": True, "content": ""}
+        for number in range(1, count + 1)
+    ]
+
+
+def reply(body: dict[str, Any], sections: int) -> str | dict[str, Any]:
+    """Plan with `sections` sections; research prompts search until their rounds are done."""
+    schema = ((body.get("response_format") or {}).get("json_schema") or {}).get("schema") or {}
+    if "sections" in schema.get("properties", {}):
+        return json.dumps({"title": "Benchmark report", "sections": _sections(sections)})
+
+    messages = body.get("messages", [])
+    if body.get("tools"):
+        section = "Section name:" in str(messages[0].get("content", ""))
+        subject = str(messages[0].get("content", ""))[-60:].strip()
+        # Call ids name the prompt, since writers also see the topic research's calls
+        prefix = f"call_{zlib.crc32(subject.encode())}_"
+        rounds = sum(
+            1 for message in messages for call in message.get("tool_calls") or [] if call["id"].startswith(prefix)
+        )
+        if rounds < (1 if section else _TOPIC_ROUNDS):
+            queries = [f"{subject} query {rounds}.{number}" for number in range(3 if section else 5)]
+            return {"content": "", "tool_calls": [{
+                "id": f"{prefix}{rounds}",
+                "type": "function",
+                "function": {"name": "search_tavily", "arguments": json.dumps({"queries": queries, "topic": "general"})},
+            }]}
+        return "Research complete."
+    if "Section name:" in str(messages[0].get("content", "")):
+        return _SECTION
+    return default_reply(body)
+
+
+def search(body: dict[str, Any]) -> dict[str, Any]:
+    """Five long results per query, drawn from a shared pool of URLs."""
+    query = body.get("query", "")
+    first = zlib.crc32(query.encode())
+    results = []
+    for number in range(int(body.get("max_results") or 5)):
+        source = (first + number * 7) % _URL_POOL
+        results.append({
+            "title": f"Source {source}",
+            "url": f"https://example.com/articles/{source}",
+            "content": f"Article {source}. " + "Findings, benchmarks and deployment notes. " * 20,
+            "raw_content": f"Full text of article {source}. " + "Long technical discussion. " * 400,
+            "score": 1 - number / 10,
+        })
+    return {"query": query, "response_time": 0.1, "results": results}
+
+
+def _serve(port: int, delay: float, sections: int) -> None:
+    server = FakeOpenAIServer(delay=delay, reply=lambda body: reply(body, sections), search=search)
+    web.run_app(server._app(), host="127.0.0.1", port=port, print=None)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Stand-in did not start on port {port}")
+
+
+async def measure(compaction: bool) -> dict[str, Any]:
+    """Write the report once and return its peak traced memory, prompt tokens and wall time."""
+    from docgen_agent import agent, async_write_report
+
+    agent.RESEARCH_COMPACTION = compaction
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = await async_write_report("GPU inference serving", "Introduction, body sections, conclusion")
+    wall = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    return {
+        "peak_mb": peak / 1024 / 1024,
+        "prompt_tokens": result["usage"]["prompt_tokens"],
+        "wall": wall,
+        "sections": len(result["report_plan"].sections),
+    }
+
+
+async def _measure_both() -> list[tuple[bool, dict[str, Any]]]:
+    return [(compaction, await measure(compaction)) for compaction in (False, True)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report memory with and without research compaction")
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.02, help="Stand-in latency per call")
+    parser.add_argument("--raw-content", action="store_true", help="Include the sources' full text in searches")
+    args = parser.parse_args()
+
+    port = _free_port()
+    server = multiprocessing.Process(target=_serve, args=(port, args.delay, args.sections), daemon=True)
+    server.start()
+    _wait_for(port)
+
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger("docgen_agent.digest").setLevel(logging.INFO)
+    os.environ["NVIDIA_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    os.environ["TAVILY_BASE_URL"] = f"http://127.0.0.1:{port}"
+    os.environ.setdefault("NVIDIA_API_KEY", "fake")
+    os.environ.setdefault("TAVILY_API_KEY", "fake")
+    os.environ["LLM_CACHE"] = "0"
+    warnings.filterwarnings("ignore", message=".*structured output")
+
+    from docgen_agent import tools
+
+    tools.INCLUDE_RAW_CONTENT = args.raw_content
+    tracemalloc.start()
+    try:
+        # One event loop for both runs: the search client keeps its connections on it
+        results = asyncio.run(_measure_both())
+        print(f"{'research':<12}{'sections':>9}{'peak memory':>14}{'prompt tokens':>15}{'wall':>9}")
+        for compaction, stats in results:
+            print(
+                f"{'digest' if compaction else 'raw':<12}{stats['sections']:>9}{stats['peak_mb']:>12.1f}MB"
+                f"{stats['prompt_tokens']:>15}{stats['wall']:>8.2f}s"
+            )
+    finally:
+        tracemalloc.stop()
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
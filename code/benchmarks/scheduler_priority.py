@@ -0,0 +1,72 @@
+"""
+Latency of an interactive post while a batch saturates the LLM budget.
+
+Starts a batch of posts under a small shared LLM budget against the local
+stand-in (fake_openai.py), submits one post shortly after, and reports that
+post's latency when it is scheduled as "interactive" versus as another
+"batch" flow, along with the scheduler's per-class queue waits.
+
+    cd code && python -m benchmarks.scheduler_priority --batch 16 --llm-concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+import warnings
+
+from .fake_openai import FakeOpenAIServer
+
+
+async def measure(batch_size: int, llm_concurrency: int, priority: str) -> tuple[float, float, dict]:
+    """Return (post latency, batch wall time, scheduler stats) for one scenario."""
+    from agent_runtime.scheduler import get_scheduler
+    from linkedin_agent import async_create_linkedin_post, async_create_linkedin_posts
+    from linkedin_agent.limits import configure_limits
+
+    get_scheduler().reset_stats()
+    configure_limits(llm_concurrency, None)
+    rows = [{"id": f"b{number}", "prompt": f"Batch post {number} about GPU clusters"} for number in range(batch_size)]
+
+    start = time.perf_counter()
+    batch = asyncio.create_task(async_create_linkedin_posts(rows, concurrency=batch_size))
+    await asyncio.sleep(0.5)  # let the batch fill the queue
+
+    post_start = time.perf_counter()
+    await async_create_linkedin_post("Quick post about our team offsite", priority=priority)
+    post_latency = time.perf_counter() - post_start
+
+    await batch
+    stats = get_scheduler().stats()
+    return post_latency, time.perf_counter() - start, stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Interactive post latency under batch load")
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.1, help="Stand-in latency per call")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    server = FakeOpenAIServer(delay=args.delay)
+    base_url = server.start_in_thread()
+    os.environ["NVIDIA_BASE_URL"] = base_url
+    os.environ["TAVILY_BASE_URL"] = base_url.removesuffix("/v1")
+    os.environ.setdefault("NVIDIA_API_KEY", "fake")
+    os.environ.setdefault("TAVILY_API_KEY", "fake")
+    os.environ.setdefault("LINKEDIN_CACHE_DIR", tempfile.mkdtemp(prefix="linkedin_cache_"))
+    warnings.filterwarnings("ignore", message=".*structured output")
+
+    print(f"{'post priority':<15}{'post latency':>14}{'batch wall':>12}  queue wait p95 by class")
+    for priority in ("batch", "interactive"):
+        latency, wall, stats = asyncio.run(measure(args.batch, args.llm_concurrency, priority))
+        waits = {cls: round(values["wait_p95"], 2) for cls, values in stats["classes"].items() if values["granted"]}
+        print(f"{priority:<15}{latency:>13.2f}s{wall:>11.2f}s  {json.dumps(waits)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Per-node overhead of the pydantic and slots state backends.
+
+Builds a chain of no-op nodes on each agent state (see
+agent_runtime/state_backend.py), starts it from a state holding a message
+history of the given size and reports the time LangGraph spends per node
+(building the state object, running the node and applying its update), and
+separately the cost of building the state object alone, which is the part the
+backend changes. No model or network is involved.
+
+    cd code && python -m benchmarks.state_backend --nodes 20 --messages 0 50 200
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import timeit
+import warnings
+from typing import Any, Callable
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.graph import END, START
+
+
+def _history(count: int) -> list[Any]:
+    """A research-like history: tool calls and their ~2 KB results."""
+    messages: list[Any] = [HumanMessage(content="Research the topic.", id="m0")]
+    for number in range(1, count):
+        if number % 2:
+            messages.append(AIMessage(
+                content="", id=f"m{number}",
+                tool_calls=[{"name": "search_tavily", "args": {"queries": [f"query {number}"]}, "id": f"call{number}"}],
+            ))
+        else:
+            messages.append(ToolMessage(content="Sources: " + "result text " * 170, tool_call_id=f"call{number - 1}", id=f"m{number}"))
+    return messages
+
+
+def _states() -> dict[str, tuple[type, Callable[[list[Any]], Any], dict[str, Any]]]:
+    """State model, initial state for a history, and the update each node writes."""
+    from docgen_agent.agent import AgentState
+    from docgen_agent.author import Section, SectionWriterState
+    from docgen_agent.researcher import ResearcherState
+    from linkedin_agent.linkedin_state import LinkedInAgentState
+
+    section = Section(name="Architecture", description="Main components", research=True, content="")
+    return {
+        "AgentState": (
+            AgentState, lambda messages: AgentState(topic="GPUs", report_structure="Intro, body", messages=messages),
+            {"report": "draft"},
+        ),
+        "SectionWriterState": (
+            SectionWriterState, lambda messages: SectionWriterState(section=section, topic="GPUs", messages=messages),
+            {"index": 1},
+        ),
+        "ResearcherState": (
+            ResearcherState, lambda messages: ResearcherState(topic="GPUs", messages=messages),
+            {"number_of_queries": 5},
+        ),
+        "LinkedInAgentState": (
+            LinkedInAgentState, lambda messages: LinkedInAgentState(initial_prompt="Teamwork", messages=messages),
+            {"final_post": "post"},
+        ),
+    }
+
+
+def build_chain(model: type, backend: str, nodes: int, update: dict[str, Any]):
+    """A graph of `nodes` nodes in a row, each reading its state and writing `update`."""
+    from agent_runtime.state_backend import state_graph
+
+    workflow = state_graph(model, backend)
+
+    async def node(state: Any) -> dict[str, Any]:
+        state.messages  # touch the state like a real node would
+        return update
+
+    previous = START
+    for number in range(nodes):
+        workflow.add_node(f"node{number}", node)
+        workflow.add_edge(previous, f"node{number}")
+        previous = f"node{number}"
+    workflow.add_edge(previous, END)
+    return workflow.compile()
+
+
+async def measure(graph: Any, state: Any, runs: int, nodes: int) -> float:
+    """Microseconds per node, best of `runs` runs."""
+    await graph.ainvoke(state)  # warm up
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        await graph.ainvoke(state)
+        best = min(best, time.perf_counter() - start)
+    return best / nodes * 1_000_000
+
+
+def build_cost(schema: type, values: dict[str, Any], number: int = 2000) -> float:
+    """Microseconds to build the state object the way LangGraph does before each node."""
+    return timeit.timeit(lambda: schema(**values), number=number) / number * 1_000_000
+
+
+async def run(nodes: int, message_counts: list[int], runs: int) -> None:
+    from agent_runtime.state_backend import state_schema
+
+    print(f"{'':<29}{'per node':^27}{'state build':^18}")
+    print(f"{'state':<20}{'messages':>9}{'pydantic':>10}{'slots':>9}{'saved':>8}{'pydantic':>10}{'slots':>8}")
+    for name, (model, make_state, update) in _states().items():
+        for count in message_counts:
+            state = make_state(_history(count))
+            values = {field: getattr(state, field) for field in model.model_fields}
+            per_node = {
+                backend: await measure(build_chain(model, backend, nodes, update), state, runs, nodes)
+                for backend in ("pydantic", "slots")
+            }
+            build = {backend: build_cost(state_schema(model, backend), values) for backend in ("pydantic", "slots")}
+            saved = 1 - per_node["slots"] / per_node["pydantic"]
+            print(
+                f"{name:<20}{count:>9}{per_node['pydantic']:>8.0f}us{per_node['slots']:>7.0f}us{saved:>8.0%}"
+                f"{build['pydantic']:>8.1f}us{build['slots']:>6.1f}us"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-node overhead of the graph state backends")
+    parser.add_argument("--nodes", type=int, default=20, help="Nodes in the chain")
+    parser.add_argument("--messages", type=int, nargs="+", default=[0, 50, 200], help="History sizes to try")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    # The agent modules create their model clients on import; nothing here calls them
+    os.environ.setdefault("NVIDIA_API_KEY", "fake")
+    os.environ.setdefault("TAVILY_API_KEY", "fake")
+    warnings.filterwarnings("ignore")
+    asyncio.run(run(args.nodes, args.messages, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,60 @@
 """Main entry point for the report generation workflow."""
 
 import asyncio
+from pathlib import Path
 from typing import Any
 
-from .agent import AgentState, graph
+from agent_runtime.ledger import Budget, UsageLedger, ledger_config
+from agent_runtime.scheduler import llm_priority, new_flow
+
+from .agent import AgentState, Report, graph
 
 
 async def async_write_report(
-    topic: str, report_structure: str
+    topic: str,
+    report_structure: str,
+    priority: str | None = None,
+    budget: Budget | None = None,
+    previous_plan: Report | None = None,
 ) -> Any | dict[str, Any] | None:
-    """Write a report."""
-    state = AgentState(topic=topic, report_structure=report_structure)
-    result = await graph.ainvoke(state)
+    """Write a report.
+
+    `priority` is the LLM scheduling class ("interactive", "batch" or
+    "background"); by default the caller's class is kept. `budget` limits the
+    run's tokens and cost (default: RUN_TOKEN_BUDGET / RUN_COST_BUDGET); the
+    result's "usage" entry has the run's token counts per node and model.
+    Raises BudgetExceeded if an "abort" budget runs out.
+
+    With `previous_plan` (a prior run's `report_plan`, see load_report_plan)
+    the report is updated instead: sections whose name and description did
+    not change keep their content, only new or changed sections are written,
+    and the result's "reused_sections" names the sections that were kept.
+    """
+    state = AgentState(topic=topic, report_structure=report_structure, previous_plan=previous_plan)
+    ledger = UsageLedger(budget)
+    with llm_priority(priority, flow=new_flow("report")):
+        result = await graph.ainvoke(state, ledger_config(ledger))
+    ledger.raise_if_aborted()
+    result["usage"] = ledger.summary()
     return result
 
 
-def write_report(topic: str, report_structure: str) -> Any | dict[str, Any] | None:
+def write_report(
+    topic: str,
+    report_structure: str,
+    priority: str | None = None,
+    budget: Budget | None = None,
+    previous_plan: Report | None = None,
+) -> Any | dict[str, Any] | None:
     """Write a report."""
-    return asyncio.run(async_write_report(topic, report_structure))
+    return asyncio.run(async_write_report(topic, report_structure, priority, budget, previous_plan))
+
+
+def save_report_plan(plan: Report, path: str | Path) -> None:
+    """Save a run's `report_plan`, section content included, for a later update."""
+    Path(path).write_text(plan.model_dump_json(indent=2))
+
+
+def load_report_plan(path: str | Path) -> Report:
+    """Load a plan saved by save_report_plan."""
+    return Report.model_validate_json(Path(path).read_text())
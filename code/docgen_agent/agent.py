@@ -9,19 +9,27 @@ from typing import Annotated, Any, Sequence, cast
 
 from langchain_core.runnables import RunnableConfig
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
-from langgraph.graph import END, START, StateGraph
+from langgraph.graph import END, START
 from langgraph.graph.message import add_messages
 from pydantic import BaseModel
 
+from agent_runtime.json_repair import extract_json
+from agent_runtime.response_cache import with_response_cache
+from agent_runtime.scheduler import llm_slot
+from agent_runtime.state_backend import state_backend, state_graph
+
 from . import author, researcher
-from .prompts import report_planner_instructions
+from .digest import compact_messages
+from .incremental import format_previous_sections, match_sections
+from .prompts import report_planner_instructions, report_planner_previous_plan
 
 _LOGGER = logging.getLogger(__name__)
 _MAX_LLM_RETRIES = 3
 _QUERIES_PER_SECTION = 5
 _THROTTLE_LLM_CALLS = os.getenv("THROTTLE_LLM_CALLS", "0")
+RESEARCH_COMPACTION = os.getenv("RESEARCH_COMPACTION", "1") == "1"
 
-llm = ChatNVIDIA(model="meta/llama-3.3-70b-instruct", temperature=0)
+llm = with_response_cache(ChatNVIDIA(model="meta/llama-3.3-70b-instruct", temperature=0))
 
 
 class Report(BaseModel):
@@ -33,6 +41,8 @@ class AgentState(BaseModel):
     topic: str
     report_structure: str
     report_plan: Report | None = None
+    previous_plan: Report | None = None  # a prior run's plan with content, to update instead of rewrite
+    reused_sections: list[str] = []
     report: str | None = None
     messages: Annotated[Sequence[Any], add_messages] = []
 
@@ -52,22 +62,41 @@ async def topic_research(state: AgentState, config: RunnableConfig):
     return {"messages": research.get("messages", [])}
 
 
+async def compact_research(state: AgentState):
+    """Replace the raw research results with a deduplicated digest before they are copied to every section."""
+    if not RESEARCH_COMPACTION:
+        return {}
+    return {"messages": compact_messages(state.messages)}
+
+
 async def report_planner(state: AgentState, config: RunnableConfig):
     """Call the model."""
     _LOGGER.info("Calling report planner.")
 
-    model = llm.with_structured_output(Report)  # type: ignore
+    # Ask for the schema but parse the reply ourselves: a plan with a stray
+    # comma or cut off mid-section is repaired instead of re-requested
+    model = llm.bind(
+        response_format={
+            "type": "json_schema",
+            "json_schema": {"name": "Report", "schema": Report.model_json_schema(), "strict": True},
+        }
+    )
 
     system_prompt = report_planner_instructions.format(
         topic=state.topic,
         report_structure=state.report_structure,
     )
+    if state.previous_plan:
+        system_prompt += report_planner_previous_plan.format(
+            previous_sections=format_previous_sections(state.previous_plan.sections),
+        )
     for count in range(_MAX_LLM_RETRIES):
         messages = [{"role": "system", "content": system_prompt}] + list(state.messages)
-        response = await model.ainvoke(messages, config)
-        if response:
-            response = cast(Report, response)
-            state.report_plan = response
+        async with llm_slot():
+            response = await model.ainvoke(messages, config)
+        report_plan = extract_json(str(response.content), Report, site="report_planner", retried=True)
+        if report_plan and report_plan.sections:
+            state.report_plan = report_plan
             return state
         _LOGGER.debug(
             "Retrying LLM call. Attempt %d of %d", count + 1, _MAX_LLM_RETRIES
@@ -83,8 +112,19 @@ async def section_author_orchestrator(state: AgentState, config: RunnableConfig)
 
     _LOGGER.info("Orchestrating the section authoring process.")
 
+    matches: list[int | None] = [None] * len(state.report_plan.sections)
+    previous = state.previous_plan.sections if state.previous_plan else []
+    if previous:
+        matches = match_sections(previous, state.report_plan.sections)
+
     writers = []
     for idx, section in enumerate(state.report_plan.sections):
+        if matches[idx] is not None:
+            # Unchanged since the previous run: keep its content verbatim
+            section.content = previous[matches[idx]].content
+            state.reused_sections.append(section.name)
+            _LOGGER.info("Reusing section: %s", section.name)
+            continue
         _LOGGER.info("Creating author agent for section: %s", section.name)
 
         section_writer_state = author.SectionWriterState(
@@ -132,17 +172,24 @@ async def report_author(state: AgentState, config: RunnableConfig):
     return state
 
 
-workflow = StateGraph(AgentState)
+def build_graph(backend: str | None = None):
+    """Compile the report workflow on a state backend (default: REPORT_STATE_BACKEND)."""
+    workflow = state_graph(AgentState, backend or state_backend("report"))
+
+    workflow.add_node("topic_research", topic_research)
+    workflow.add_node("compact_research", compact_research)
+    workflow.add_node("report_planner", report_planner)
+    workflow.add_node("section_author_orchestrator", section_author_orchestrator)
+    workflow.add_node("report_author", report_author)
+
+    workflow.add_edge(START, "topic_research")
+    workflow.add_edge("topic_research", "compact_research")
+    workflow.add_edge("compact_research", "report_planner")
+    workflow.add_edge("report_planner", "section_author_orchestrator")
+    workflow.add_edge("section_author_orchestrator", "report_author")
+    workflow.add_edge("report_author", END)
 
-workflow.add_node("topic_research", topic_research)
-workflow.add_node("report_planner", report_planner)
-workflow.add_node("section_author_orchestrator", section_author_orchestrator)
-workflow.add_node("report_author", report_author)
+    return workflow.compile()
 
-workflow.add_edge(START, "topic_research")
-workflow.add_edge("topic_research", "report_planner")
-workflow.add_edge("report_planner", "section_author_orchestrator")
-workflow.add_edge("section_author_orchestrator", "report_author")
-workflow.add_edge("report_author", END)
 
-graph = workflow.compile()
+graph = build_graph()
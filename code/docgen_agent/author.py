@@ -6,17 +6,22 @@ from typing import Annotated, Any, Sequence
 
 from langchain_core.runnables import RunnableConfig
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
-from langgraph.graph import END, START, StateGraph
+from langgraph.graph import END, START
 from langgraph.graph.message import add_messages
 from pydantic import BaseModel
 
+from agent_runtime.ledger import budget_exhausted
+from agent_runtime.response_cache import with_response_cache
+from agent_runtime.scheduler import llm_slot
+from agent_runtime.state_backend import state_backend, state_graph
+
 from . import tools
 from .prompts import section_research_prompt, section_writing_prompt
 
 _LOGGER = logging.getLogger(__name__)
 _MAX_LLM_RETRIES = 3
 
-llm = ChatNVIDIA(model="meta/llama-3.3-70b-instruct", temperature=0)
+llm = with_response_cache(ChatNVIDIA(model="meta/llama-3.3-70b-instruct", temperature=0))
 llm_with_tools = llm.bind_tools([tools.search_tavily])
 
 
@@ -67,7 +72,8 @@ async def research_model(
 
     for count in range(_MAX_LLM_RETRIES):
         messages = [{"role": "system", "content": system_prompt}] + list(state.messages)
-        response = await llm_with_tools.ainvoke(messages, config)
+        async with llm_slot():
+            response = await llm_with_tools.ainvoke(messages, config)
 
         if response:
             return {"messages": [response]}
@@ -93,7 +99,8 @@ async def writing_model(
 
     for count in range(_MAX_LLM_RETRIES):
         messages = [{"role": "system", "content": system_prompt}] + list(state.messages)
-        response = await llm.ainvoke(messages, config)
+        async with llm_slot():
+            response = await llm.ainvoke(messages, config)
 
         if response:
             # Update the section content with the written content
@@ -108,9 +115,11 @@ async def writing_model(
     raise RuntimeError("Failed to call model after %d attempts.", _MAX_LLM_RETRIES)
 
 
-def needs_research(state: SectionWriterState) -> str:
-    """Check if the section needs research."""
-    return "research" if state.section.research else "write"
+def needs_research(state: SectionWriterState, config: RunnableConfig) -> str:
+    """Check if the section needs research (and the run can still afford it)."""
+    if state.section.research and not budget_exhausted(config, "section research"):
+        return "research"
+    return "write"
 
 
 def has_tool_calls(state: SectionWriterState) -> bool:
@@ -122,29 +131,46 @@ def has_tool_calls(state: SectionWriterState) -> bool:
     return bool(hasattr(last_message, "tool_calls") and last_message.tool_calls)
 
 
-workflow = StateGraph(SectionWriterState)
-
-workflow.add_node("agent", research_model)
-workflow.add_node("tools", tool_node)
-workflow.add_node("writer", writing_model)
-
-workflow.add_conditional_edges(
-    START,
-    needs_research,
-    {
-        "research": "agent",
-        "write": "writer",
-    },
-)
-workflow.add_conditional_edges(
-    "agent",
-    has_tool_calls,
-    {
-        True: "tools",
-        False: "writer",
-    },
-)
-workflow.add_edge("tools", "agent")
-workflow.add_edge("writer", END)
-
-graph = workflow.compile()
+def can_continue_research(state: SectionWriterState, config: RunnableConfig) -> bool:
+    """Over budget, stop researching once the pending tool calls are answered."""
+    return not budget_exhausted(config, "section research")
+
+
+def build_graph(backend: str | None = None):
+    """Compile the section workflow on a state backend (default: SECTION_STATE_BACKEND)."""
+    workflow = state_graph(SectionWriterState, backend or state_backend("section"))
+
+    workflow.add_node("agent", research_model)
+    workflow.add_node("tools", tool_node)
+    workflow.add_node("writer", writing_model)
+
+    workflow.add_conditional_edges(
+        START,
+        needs_research,
+        {
+            "research": "agent",
+            "write": "writer",
+        },
+    )
+    workflow.add_conditional_edges(
+        "agent",
+        has_tool_calls,
+        {
+            True: "tools",
+            False: "writer",
+        },
+    )
+    workflow.add_conditional_edges(
+        "tools",
+        can_continue_research,
+        {
+            True: "agent",
+            False: "writer",
+        },
+    )
+    workflow.add_edge("writer", END)
+
+    return workflow.compile()
+
+
+graph = build_graph()
@@ -0,0 +1,117 @@
+"""
+Compaction of the topic research into a size-capped digest.
+
+Topic research leaves one tool message per search round, each a complete
+formatted dump of every source it found, and every section writer starts
+from a copy of that history. The digest keeps each source once (by URL, and
+by content for mirrored articles), caps every source's text and the digest's
+total size, and replaces the raw research in the report's messages.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Any, Sequence
+
+from langchain_core.messages import BaseMessage, HumanMessage, RemoveMessage, ToolMessage
+
+from .tools import parse_formatted_sources
+
+_LOGGER = logging.getLogger(__name__)
+
+RESEARCH_DIGEST_MAX_CHARS = int(os.getenv("RESEARCH_DIGEST_MAX_CHARS", "24000"))
+RESEARCH_DIGEST_SOURCE_CHARS = int(os.getenv("RESEARCH_DIGEST_SOURCE_CHARS", "1500"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _clip(text: str, limit: int) -> str:
+    text = _WHITESPACE.sub(" ", text).strip()
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + " ... [truncated]"
+
+
+def _tool_text(message: ToolMessage) -> str:
+    # The tool nodes store the search tool's string output JSON-encoded
+    try:
+        text = json.loads(message.content) if isinstance(message.content, str) else message.content
+    except json.JSONDecodeError:
+        text = message.content
+    return text if isinstance(text, str) else str(text)
+
+
+def _queries(messages: Sequence[BaseMessage]) -> list[str]:
+    queries: list[str] = []
+    for message in messages:
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            for query in tool_call.get("args", {}).get("queries", []):
+                if query not in queries:
+                    queries.append(query)
+    return queries
+
+
+def build_research_digest(
+    messages: Sequence[BaseMessage],
+    max_chars: int = RESEARCH_DIGEST_MAX_CHARS,
+    source_chars: int = RESEARCH_DIGEST_SOURCE_CHARS,
+) -> tuple[str, dict[str, int]] | None:
+    """The digest text and its statistics, or None if the messages hold no search results."""
+    tool_messages = [message for message in messages if isinstance(message, ToolMessage)]
+    if not tool_messages:
+        return None
+
+    queries = _queries(messages)
+    searched = "\nSearched for: " + "; ".join(queries) if queries else ""
+    seen_urls: set[str] = set()
+    seen_content: set[str] = set()
+    sources: list[str] = []
+    found = duplicates = dropped = 0
+    size = len(searched) + 80  # room for the header
+    for message in tool_messages:
+        for source in parse_formatted_sources(_tool_text(message)):
+            found += 1
+            text = _clip(source["raw_content"] or source["content"], source_chars)
+            fingerprint = hashlib.sha1(text.lower().encode()).hexdigest()
+            if source["url"] in seen_urls or fingerprint in seen_content:
+                duplicates += 1
+                continue
+            seen_urls.add(source["url"])
+            seen_content.add(fingerprint)
+            entry = f"Source {source['title']}:\nURL: {source['url']}\n{text}"
+            if size + len(entry) > max_chars:
+                dropped += 1
+                continue
+            sources.append(entry)
+            size += len(entry) + 2
+
+    header = f"Research notes for this report ({len(sources)} sources"
+    header += f", {dropped} more left out for length)" if dropped else ")"
+    digest = header + searched + "\n\n" + "\n\n".join(sources)
+    stats = {
+        "messages": len(messages),
+        "raw_chars": sum(len(str(message.content)) for message in messages),
+        "sources_found": found,
+        "duplicates": duplicates,
+        "dropped": dropped,
+        "sources": len(sources),
+        "digest_chars": len(digest),
+    }
+    return digest, stats
+
+
+def compact_messages(messages: Sequence[Any]) -> list[Any]:
+    """A message update that swaps the research messages for their digest (empty if there is nothing to compact)."""
+    built = build_research_digest(messages)
+    if built is None:
+        return []
+    digest, stats = built
+    _LOGGER.info(
+        "Compacted topic research: %d messages (%d chars, %d sources, %d duplicates) into %d sources (%d chars).",
+        stats["messages"], stats["raw_chars"], stats["sources_found"], stats["duplicates"],
+        stats["sources"], stats["digest_chars"],
+    )
+    removals: list[Any] = [RemoveMessage(id=message.id) for message in messages if message.id]
+    return removals + [HumanMessage(content=digest)]
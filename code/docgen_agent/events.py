@@ -0,0 +1,87 @@
+"""Progress events for a report run.
+
+Wraps the graph's event stream into plain, JSON-serializable events:
+stage_start / stage_end for each workflow node, plan once the report is
+outlined, section as each section writer finishes, and done with the report
+and its plan (and its token usage when the config carries a UsageLedger).
+"""
+
+import time
+from typing import Any, AsyncIterator
+
+from pydantic import BaseModel
+
+from agent_runtime.ledger import find_ledger
+
+from .agent import AgentState, graph
+
+_NODES = {name for name in graph.nodes if not name.startswith("__")}
+
+
+def _get(value: Any, key: str) -> Any:
+    return value.get(key) if isinstance(value, dict) else getattr(value, key, None)
+
+
+async def stream_report_events(
+    state: AgentState, config: dict[str, Any] | None = None
+) -> AsyncIterator[dict[str, Any]]:
+    """Run the workflow for one report, yielding progress events as they happen."""
+    start = time.perf_counter()
+    started: dict[str, float] = {}
+    timings: list[tuple[str, float]] = []
+    ledger = find_ledger(config)
+
+    async for event in graph.astream_events(state, config, version="v2"):
+        kind = event["event"]
+        name = event["name"]
+        node = event.get("metadata", {}).get("langgraph_node")
+        depth = len(event.get("parent_ids", []))
+        elapsed = round(time.perf_counter() - start, 3)
+        is_node = name in _NODES and node == name and depth == 1
+
+        if kind == "on_chain_start" and is_node:
+            started[event["run_id"]] = time.perf_counter()
+            yield {"type": "stage_start", "stage": name, "elapsed": elapsed}
+
+        elif kind == "on_chain_end" and is_node:
+            seconds = time.perf_counter() - started.pop(event["run_id"], time.perf_counter())
+            timings.append((name, seconds))
+            yield {"type": "stage_end", "stage": name, "seconds": round(seconds, 3), "elapsed": elapsed}
+
+            plan = _get(event["data"].get("output"), "report_plan")
+            if name == "report_planner" and plan:
+                yield {
+                    "type": "plan",
+                    "title": _get(plan, "title"),
+                    "sections": [_get(section, "name") for section in _get(plan, "sections")],
+                    "elapsed": elapsed,
+                }
+
+        elif kind == "on_chain_end" and node == "section_author_orchestrator" and depth == 2:
+            # A section writer subgraph finished
+            section = _get(event["data"].get("output"), "section")
+            if section is not None:
+                yield {
+                    "type": "section",
+                    "index": _get(event["data"]["output"], "index"),
+                    "name": _get(section, "name"),
+                    "elapsed": elapsed,
+                }
+
+        elif kind == "on_chain_end" and depth == 0:
+            result = event["data"].get("output") or {}
+            plan = _get(result, "report_plan")
+            done = {
+                "type": "done",
+                "title": _get(plan, "title") if plan else None,
+                "report": _get(result, "report"),
+                # Sent back as "previous_plan", the plan lets a later request update this report
+                "report_plan": plan.model_dump() if isinstance(plan, BaseModel) else plan,
+                "reused_sections": _get(result, "reused_sections") or [],
+                "stage_timings": [[stage, round(seconds, 3)] for stage, seconds in timings],
+                "elapsed": elapsed,
+            }
+            if ledger:
+                ledger.raise_if_aborted()
+                done["usage"] = ledger.summary()
+            yield done
@@ -0,0 +1,73 @@
+"""Matching a new report plan against a previous one, so unchanged sections are not rewritten.
+
+A report is updated by planning it again and comparing the new sections with
+the sections of the previous run. A new section whose name and description
+are close enough to a previous section with content (and that needs research
+the same way) takes that section's content verbatim; only the rest go to a
+section writer.
+"""
+
+import difflib
+import logging
+import os
+from typing import Sequence
+
+from .author import Section
+
+_LOGGER = logging.getLogger(__name__)
+
+# Name and description similarity (0-1) above which a section counts as unchanged
+SECTION_REUSE_SIMILARITY = float(os.getenv("SECTION_REUSE_SIMILARITY", "0.9"))
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _similarity(first: str, second: str) -> float:
+    first, second = _normalize(first), _normalize(second)
+    if first == second:
+        return 1.0
+    matcher = difflib.SequenceMatcher(None, first, second, autojunk=False)
+    # quick_ratio is an upper bound on ratio and much cheaper
+    return matcher.ratio() if matcher.quick_ratio() >= SECTION_REUSE_SIMILARITY else 0.0
+
+
+def match_sections(previous: Sequence[Section], sections: Sequence[Section]) -> list[int | None]:
+    """For each new section, the index of the previous section it can reuse, or None to write it.
+
+    Pairs are taken best match first, ties in plan order, and each previous section is
+    reused at most once.
+    """
+    candidates = []
+    for new_index, section in enumerate(sections):
+        for old_index, old in enumerate(previous):
+            if not old.content or old.research != section.research:
+                continue
+            name = _similarity(old.name, section.name)
+            if name < SECTION_REUSE_SIMILARITY:
+                continue
+            description = _similarity(old.description, section.description)
+            if description < SECTION_REUSE_SIMILARITY:
+                continue
+            candidates.append((name + description, new_index, old_index))
+
+    matches: list[int | None] = [None] * len(sections)
+    used: set[int] = set()
+    for _, new_index, old_index in sorted(candidates, key=lambda pair: (-pair[0], pair[1], pair[2])):
+        if matches[new_index] is None and old_index not in used:
+            matches[new_index] = old_index
+            used.add(old_index)
+    _LOGGER.info(
+        "%d of %d sections unchanged since the previous plan.",
+        len(used), len(sections),
+    )
+    return matches
+
+
+def format_previous_sections(previous: Sequence[Section]) -> str:
+    """The previous plan's outline, for the planner prompt."""
+    return "\n".join(
+        f"- {section.name}: {section.description} (research: {'yes' if section.research else 'no'})"
+        for section in previous
+    )
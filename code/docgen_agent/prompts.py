@@ -1,5 +1,9 @@
 """
 Prompts for the report generation agent.
+
+Each template is a static instruction block followed by the per-request
+values, so every call with the same template starts with byte-identical text
+that the model server can serve from its prefix (KV) cache.
 """
 
 from typing import Final
@@ -7,7 +11,16 @@ from typing import Final
 # fmt: off
 report_planner_instructions = """You are an expert technical writer, helping to plan a report.
 
-Your goal is to generate the outline of the sections of the report.
+Your goal is to generate the outline of the sections of the report, for the topic and organization given at the end.
+
+Generate the sections of the report. Each section should have the following fields:
+
+- Name - Name for this section of the report.
+- Description - Brief overview of the main topics and concepts to be covered in this section.
+- Research - Whether to perform web research for this section of the report.
+- Content - The content of the section, which you will leave blank for now.
+
+Consider which sections require web research. For example, introduction and conclusion will not require research because they will distill information from other parts of the report.
 
 The overall topic of the report is:
 
@@ -15,16 +28,14 @@ The overall topic of the report is:
 
 The report should follow this organization:
 
-{report_structure}
+{report_structure}"""
 
-Now, generate the sections of the report. Each section should have the following fields:
+# Appended to the planner instructions when a report is updated
+report_planner_previous_plan = """
 
-- Name - Name for this section of the report.
-- Description - Brief overview of the main topics and concepts to be covered in this section.
-- Research - Whether to perform web research for this section of the report.
-- Content - The content of the section, which you will leave blank for now.
+This report was planned before, with the sections below. Its organization may have changed since. Keep the name, description and research setting of every section that still fits the organization above exactly as written, so its content can be reused; add, change or drop sections only where the organization now asks for it.
 
-Consider which sections require web research. For example, introduction and conclusion will not require research because they will distill information from other parts of the report."""
+{previous_sections}"""
 
 ###############################################################################
 
@@ -32,10 +43,7 @@ research_prompt: Final[str] = """
 Your goal is to generate targeted web search queries that will gather comprehensive
 information for writing a technical report section.
 
-Topic for this section:
-{topic}
-
-When generating {number_of_queries} search queries, ensure they:
+When generating search queries, ensure they:
 1. Cover different aspects of the topic (e.g., core features, real-world applications, technical architecture)
 2. Include specific technical terms related to the topic
 3. Target recent information by including year markers where relevant (e.g., "2024")
@@ -46,17 +54,18 @@ Your queries should be:
 - Specific enough to avoid generic results
 - Technical enough to capture detailed implementation information
 - Diverse enough to cover all aspects of the section plan
-- Focused on authoritative sources (documentation, technical blogs, academic papers)"""
+- Focused on authoritative sources (documentation, technical blogs, academic papers)
+
+Number of queries to generate: {number_of_queries}
+
+Topic for this section:
+{topic}"""
 
 ###############################################################################
 
 section_research_prompt: Final[str] = """
 Your goal is to generate targeted web search queries that will gather comprehensive
-information for writing a specific section of a technical report.
-
-Overall report topic: {overall_topic}
-Section name: {section_name}
-Section description: {section_description}
+information for writing a specific section of a technical report, described at the end.
 
 Generate 3-5 search queries that will help gather information specifically for this section.
 Your queries should:
@@ -67,14 +76,14 @@ Your queries should:
 5. Cover different aspects of the section topic (implementation details, best practices, real-world examples)
 
 Make sure your queries are specific enough to avoid generic results but comprehensive enough to cover all aspects needed for this section.
-"""
-
-section_writing_prompt: Final[str] = """
-You are an expert technical writer. Your goal is to write a comprehensive section of a technical report.
 
 Overall report topic: {overall_topic}
 Section name: {section_name}
 Section description: {section_description}
+"""
+
+section_writing_prompt: Final[str] = """
+You are an expert technical writer. Your goal is to write a comprehensive section of a technical report, described at the end.
 
 If this section is an introduction or conclusion, keep the section brief. Only one or two paragraphs.
 
@@ -90,5 +99,14 @@ If this is a body section, Based on the research information provided in the con
 Structure your section with appropriate subsections if needed, and ensure it provides comprehensive coverage of the topic while remaining focused on the section's specific scope.
 
 Write the complete section content as your response - do not include any meta-commentary or explanations about the writing process.
+
+Overall report topic: {overall_topic}
+Section name: {section_name}
+Section description: {section_description}
 """
 # fmt: on
+
+
+def static_prefix(template: str) -> str:
+    """The part of a template before its first placeholder, identical for every request."""
+    return template.split("{", 1)[0]
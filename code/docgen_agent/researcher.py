@@ -4,17 +4,22 @@ from typing import Annotated, Any, Sequence
 
 from langchain_core.runnables import RunnableConfig
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
-from langgraph.graph import END, START, StateGraph
+from langgraph.graph import END, START
 from langgraph.graph.message import add_messages
 from pydantic import BaseModel
 
+from agent_runtime.ledger import budget_exhausted
+from agent_runtime.response_cache import with_response_cache
+from agent_runtime.scheduler import llm_slot
+from agent_runtime.state_backend import state_backend, state_graph
+
 from . import tools
 from .prompts import research_prompt
 
 _LOGGER = logging.getLogger(__name__)
 _MAX_LLM_RETRIES = 3
 
-llm = ChatNVIDIA(model="meta/llama-3.3-70b-instruct", temperature=0)
+llm = with_response_cache(ChatNVIDIA(model="meta/llama-3.3-70b-instruct", temperature=0))
 llm_with_tools = llm.bind_tools([tools.search_tavily])
 
 
@@ -56,7 +61,8 @@ async def call_model(
 
     for count in range(_MAX_LLM_RETRIES):
         messages = [{"role": "system", "content": system_prompt}] + list(state.messages)
-        response = await llm_with_tools.ainvoke(messages, config)
+        async with llm_slot():
+            response = await llm_with_tools.ainvoke(messages, config)
 
         if response:
             return {"messages": [response]}
@@ -75,19 +81,36 @@ def has_tool_calls(state: ResearcherState) -> bool:
     return bool(last_message.tool_calls)
 
 
-workflow = StateGraph(ResearcherState)
+def can_continue_research(state: ResearcherState, config: RunnableConfig) -> bool:
+    """Over budget, stop researching once the pending tool calls are answered."""
+    return not budget_exhausted(config, "topic research")
+
+
+def build_graph(backend: str | None = None):
+    """Compile the research workflow on a state backend (default: RESEARCH_STATE_BACKEND)."""
+    workflow = state_graph(ResearcherState, backend or state_backend("research"))
+
+    workflow.add_node("agent", call_model)
+    workflow.add_node("tools", tool_node)
+
+    workflow.add_edge(START, "agent")
+    workflow.add_conditional_edges(
+        "agent",
+        has_tool_calls,
+        {
+            True: "tools",
+            False: END,
+        },
+    )
+    workflow.add_conditional_edges(
+        "tools",
+        can_continue_research,
+        {
+            True: "agent",
+            False: END,
+        },
+    )
+    return workflow.compile()
 
-workflow.add_node("agent", call_model)
-workflow.add_node("tools", tool_node)
 
-workflow.add_edge(START, "agent")
-workflow.add_conditional_edges(
-    "agent",
-    has_tool_calls,
-    {
-        True: "tools",
-        False: END,
-    },
-)
-workflow.add_edge("tools", "agent")
-graph = workflow.compile()
+graph = build_graph()
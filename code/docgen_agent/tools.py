@@ -3,14 +3,19 @@
 import asyncio
 import logging
 import os
+import re
 from typing import Literal
 
 from langchain_core.tools import tool
 from tavily import AsyncTavilyClient
 
+from agent_runtime.source_index import indexed_search
+
 _LOGGER = logging.getLogger(__name__)
 
-tavily_client = AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+# TAVILY_BASE_URL points searches at another endpoint (e.g. a local stand-in)
+_TAVILY_BASE_URL = {"api_base_url": os.getenv("TAVILY_BASE_URL")} if os.getenv("TAVILY_BASE_URL") else {}
+tavily_client = AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"), **_TAVILY_BASE_URL)
 INCLUDE_RAW_CONTENT = False
 MAX_TOKENS_PER_SOURCE = 1000
 MAX_RESULTS = 5
@@ -77,6 +82,23 @@ def _deduplicate_and_format_sources(
     return formatted_text.strip()
 
 
+_SOURCE_PATTERN = re.compile(
+    r"Source (?P<title>.*?):\n===\nURL: (?P<url>.*?)\n===\n"
+    r"Most relevant content from source: (?P<content>.*?)\n===(?:\n|$)"
+    r"(?:Full source content limited to \d+ tokens: ?(?P<raw_content>.*?))?"
+    r"(?=\n*Source .*?:\n===\nURL: |\s*$)",
+    re.DOTALL,
+)
+
+
+def parse_formatted_sources(formatted_text: str) -> list[dict[str, str]]:
+    """Turn the output of `_deduplicate_and_format_sources` back into source dicts."""
+    return [
+        {key: (value or "").strip() for key, value in match.groupdict().items()}
+        for match in _SOURCE_PATTERN.finditer(formatted_text)
+    ]
+
+
 @tool(parse_docstring=True)
 async def search_tavily(
     queries: list[str],
@@ -105,7 +127,8 @@ async def search_tavily(
         _LOGGER.info("Searching for query: %s", query)
         search_jobs.append(
             asyncio.create_task(
-                tavily_client.search(
+                indexed_search(
+                    tavily_client.search,
                     query,
                     max_results=MAX_RESULTS,
                     include_raw_content=INCLUDE_RAW_CONTENT,
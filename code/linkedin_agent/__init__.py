@@ -1,10 +1,33 @@
-"""Main entry point for the LinkedIn Slop Bot workflow."""
+"""Main entry point for the LinkedIn Slop Bot workflow.
+
+The workflow and its model clients are imported on first use, so processes
+that only need the image helpers (the workers in offload.py) can import the
+package without creating them.
+"""
 
 import asyncio
+import importlib
 from typing import Any
 
+from agent_runtime.ledger import Budget, UsageLedger, ledger_config
+from agent_runtime.scheduler import llm_priority, new_flow
+
+from .blob_store import aingest_image, ingest_image
 from .linkedin_state import LinkedInAgentState
-from .linkedin_agent import graph
+
+_LAZY_EXPORTS = {
+    "async_create_linkedin_posts": ".batch",
+    "load_batch_rows": ".batch",
+    "graph": ".linkedin_agent",
+    "refinement_stats": ".linkedin_critiquer",
+    "speculation_stats": ".speculation",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 async def async_create_linkedin_post(
@@ -17,24 +40,46 @@ async def async_create_linkedin_post(
     hashtag_level: int = 3,
     ragebait_level: int = 2,
     inspirational_level: int = 3,
-    informational_level: int = 3
+    informational_level: int = 3,
+    speculative_research: bool | None = None,
+    refinement_mode: str | None = None,
+    priority: str | None = None,
+    budget: Budget | None = None
 ) -> Any | dict[str, Any] | None:
-    """Create a LinkedIn post from image and prompt with style preferences."""
+    """Create a LinkedIn post from image and prompt with style preferences.
+    
+    `priority` is the LLM scheduling class ("interactive", "batch" or
+    "background"); by default the caller's class is kept. `budget` limits the
+    run's tokens and cost (default: RUN_TOKEN_BUDGET / RUN_COST_BUDGET); the
+    result's "usage" entry has the run's token counts per node and model.
+    Raises BudgetExceeded if an "abort" budget runs out.
+    """
+    
+    # Ingest the image up front so the workflow state only carries a blob reference
+    image_ref = await aingest_image(image_path, image_base64)
     
     state = LinkedInAgentState(
         initial_prompt=initial_prompt,
         image_path=image_path,
-        image_base64=image_base64,
+        image_ref=image_ref,
         post_type=post_type,
         grammar_level=grammar_level,
         emoji_level=emoji_level,
         hashtag_level=hashtag_level,
         ragebait_level=ragebait_level,
         inspirational_level=inspirational_level,
-        informational_level=informational_level
+        informational_level=informational_level,
+        speculative_research=speculative_research,
+        refinement_mode=refinement_mode
     )
     
-    result = await graph.ainvoke(state)
+    from .linkedin_agent import graph
+
+    ledger = UsageLedger(budget)
+    with llm_priority(priority, flow=new_flow("post")):
+        result = await graph.ainvoke(state, ledger_config(ledger))
+    ledger.raise_if_aborted()
+    result["usage"] = ledger.summary()
     return result
 
 
@@ -48,12 +93,17 @@ def create_linkedin_post(
     hashtag_level: int = 3,
     ragebait_level: int = 2,
     inspirational_level: int = 3,
-    informational_level: int = 3
+    informational_level: int = 3,
+    speculative_research: bool | None = None,
+    refinement_mode: str | None = None,
+    priority: str | None = None,
+    budget: Budget | None = None
 ) -> Any | dict[str, Any] | None:
     """Create a LinkedIn post from image and prompt with style preferences."""
     
     return asyncio.run(async_create_linkedin_post(
         initial_prompt, image_path, image_base64, post_type,
         grammar_level, emoji_level, hashtag_level, ragebait_level,
-        inspirational_level, informational_level
+        inspirational_level, informational_level, speculative_research,
+        refinement_mode, priority, budget
     )) 
\ No newline at end of file
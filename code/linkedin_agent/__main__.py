@@ -4,6 +4,7 @@ Interactive CLI for LinkedIn Slop Bot with style questionnaire.
 
 import argparse
 import asyncio
+import json
 import logging
 import os
 import sys
@@ -13,7 +14,12 @@ from pathlib import Path
 # Add current directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from linkedin_agent import async_create_linkedin_post
+from linkedin_agent import async_create_linkedin_posts, load_batch_rows
+from agent_runtime.ledger import UsageLedger, ledger_config
+from agent_runtime.scheduler import llm_priority, new_flow
+from linkedin_agent.batch import abuild_state
+from linkedin_agent.loop_monitor import maybe_start_loop_monitor, start_loop_monitor
+from linkedin_agent.events import stream_post_events, stage_table
 
 # Set up logging
 logging.basicConfig(
@@ -221,16 +227,157 @@ def get_user_inputs():
     }
 
 
+def print_event(event):
+    """Write one JSON event line to stdout (--json-events)."""
+    print(json.dumps(event, ensure_ascii=False, default=str), flush=True)
+
+
+async def run_batch(args):
+    """Generate posts for every row of a JSONL/CSV file.
+    
+    With --json-events, stdout gets a "result" event per row and a final
+    "summary" event instead of the progress lines and summary table.
+    """
+    
+    rows = load_batch_rows(args.batch)
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    results_file = out_dir / "results.jsonl"
+    
+    if not args.json_events:
+        print(f"📦 Batch mode: {len(rows)} rows from {args.batch} -> {out_dir}/ (concurrency={args.concurrency})")
+    
+    def save_result(outcome):
+        if outcome["final_post"]:
+            with open(out_dir / f"{outcome['id']}.md", "w", encoding="utf-8") as f:
+                f.write(outcome["final_post"])
+        with open(results_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps({k: v for k, v in outcome.items() if k != "final_post"}) + "\n")
+    
+    async def write_result(outcome):
+        # Write each post as soon as it completes so partial batches are kept, without blocking other rows
+        await asyncio.to_thread(save_result, outcome)
+        if args.json_events:
+            print_event({"type": "result", **outcome})
+            return
+        status = "✅" if not outcome["error"] else f"❌ {outcome['error']}"
+        print(f"{status} {outcome['id']} ({outcome['elapsed']:.1f}s)")
+    
+    summary = await async_create_linkedin_posts(
+        rows,
+        concurrency=args.concurrency,
+        max_llm_calls=args.llm_concurrency,
+        max_searches=args.search_concurrency,
+        on_result=write_result,
+    )
+    
+    if args.json_events:
+        print_event({
+            "type": "summary",
+            "rows": len(summary.results),
+            "succeeded": summary.succeeded,
+            "wall_time": round(summary.wall_time, 3),
+            "posts_per_minute": round(summary.throughput, 3),
+            "stages": summary.stage_percentiles(),
+        })
+        return
+    
+    print("\n📊 BATCH SUMMARY")
+    print("=" * 50)
+    print(summary.format())
+
+
+async def generate_with_progress(inputs, json_events=False):
+    """Run one post, rendering the event stream live. Returns the final post or None."""
+    
+    state = await abuild_state({
+        "id": "cli",
+        "prompt": inputs["content_prompt"],
+        "image_path": inputs["image_path"],
+        "post_type": inputs["post_type"],
+        **{key: value for key, value in inputs.items() if key.endswith("_level")},
+    })
+    
+    final = None
+    streaming = False
+    # Someone is watching this post: its model calls go ahead of batch and background work
+    with llm_priority("interactive", flow=new_flow("cli")):
+        async for event in stream_post_events(state, ledger_config(UsageLedger())):
+            if json_events:
+                print_event(event)
+            elif event["type"] == "stage_start":
+                print(f"\n▶ {event['stage']} (t+{event['elapsed']:.1f}s)", flush=True)
+            elif event["type"] == "token":
+                if not streaming:
+                    print("-" * 50)
+                    streaming = True
+                print(event["text"], end="", flush=True)
+            elif event["type"] == "stage_end":
+                if streaming:
+                    print("\n" + "-" * 50)
+                    streaming = False
+                print(f"✓ {event['stage']} {event['seconds']:.2f}s", flush=True)
+            elif event["type"] == "critique":
+                scores = event["scores"]
+                print(
+                    f"📊 Draft #{event['draft']}: {event['overall_score']:.1f}/10 "
+                    f"(engagement {scores['engagement_potential']:g}, authenticity {scores['slop_authenticity']:g}, "
+                    f"optimization {scores['algorithm_optimization']:g}) → {event['verdict']}",
+                    flush=True,
+                )
+            elif event["type"] == "style_check":
+                print("📏 Style check sent the draft back: " + "; ".join(event["violations"]), flush=True)
+            
+            if event["type"] == "done":
+                final = event
+        
+    if final and not json_events:
+        print("\n⏱️  STAGE LATENCY")
+        print("=" * 50)
+        print(stage_table(final["stage_timings"]))
+        usage = final["usage"]
+        print(
+            f"🧮 Tokens: {usage['prompt_tokens']} prompt + {usage['completion_tokens']} completion "
+            f"in {usage['calls']} calls (${usage['cost']:.4f})"
+        )
+    return final["final_post"] if final else None
+
+
 async def main():
     """Main function to run the LinkedIn Slop Bot."""
     
     parser = argparse.ArgumentParser(description="LinkedIn Slop Bot")
     parser.add_argument("--quick", action="store_true", help="Quick test mode (no image)")
+    parser.add_argument("--batch", metavar="INPUT", help="Generate posts for every row of a .jsonl or .csv file")
+    parser.add_argument("--out", default="posts", help="Output directory for batch mode (default: posts)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Posts generated concurrently in batch mode")
+    parser.add_argument("--llm-concurrency", type=int, default=None, help="Shared limit on in-flight LLM calls")
+    parser.add_argument("--search-concurrency", type=int, default=None, help="Shared limit on in-flight searches")
+    parser.add_argument("--json-events", action="store_true", help="Print progress events as JSON lines on stdout")
+    parser.add_argument("--verbose", action="store_true", help="Keep INFO logging while streaming progress")
+    parser.add_argument("--monitor-loop", action="store_true", help="Report event-loop stalls (also LOOP_LAG_MONITOR=1)")
     args = parser.parse_args()
     
+    if args.monitor_loop:
+        start_loop_monitor()
+    else:
+        maybe_start_loop_monitor()
+    
+    if args.json_events or not args.verbose:
+        # Progress is shown by the event stream; logs would interleave with streamed tokens
+        logging.getLogger().setLevel(logging.WARNING)
+    
+    if args.batch:
+        await run_batch(args)
+        return
+    
+    if args.json_events and not args.quick:
+        parser.error("--json-events needs --quick or --batch (the questionnaire is interactive)")
+    
     if args.quick:
         # Quick test mode with default style preferences
-        print("⚡ Quick test mode - using defaults")
+        if not args.json_events:
+            print("⚡ Quick test mode - using defaults")
         inputs = {
             "content_prompt": "Write about the importance of teamwork in tech",
             "image_path": None,
@@ -248,52 +395,47 @@ async def main():
         if not inputs:
             return
     
-    # Create directories
-    Path("images").mkdir(exist_ok=True)
-    Path("posts").mkdir(exist_ok=True)
-    
-    print("\n🚀 Generating LinkedIn post...")
-    print(f"Prompt: {inputs['content_prompt']}")
-    print(f"Image: {inputs['image_path'] or 'None'}")
-    print(f"Type: {inputs['post_type']}")
-    print(f"Style: Grammar={inputs['grammar_level']}, Emojis={inputs['emoji_level']}, Hashtags={inputs['hashtag_level']}, Ragebait={inputs['ragebait_level']}, Inspirational={inputs['inspirational_level']}, Informational={inputs['informational_level']}")
-    print("-" * 50)
+    if not args.json_events:
+        # Create directories
+        Path("images").mkdir(exist_ok=True)
+        Path("posts").mkdir(exist_ok=True)
+        
+        print("\n🚀 Generating LinkedIn post...")
+        print(f"Prompt: {inputs['content_prompt']}")
+        print(f"Image: {inputs['image_path'] or 'None'}")
+        print(f"Type: {inputs['post_type']}")
+        print(f"Style: Grammar={inputs['grammar_level']}, Emojis={inputs['emoji_level']}, Hashtags={inputs['hashtag_level']}, Ragebait={inputs['ragebait_level']}, Inspirational={inputs['inspirational_level']}, Informational={inputs['informational_level']}")
+        print("-" * 50)
     
     try:
-        # Generate the post with style preferences
-        result = await async_create_linkedin_post(
-            initial_prompt=inputs["content_prompt"],
-            image_path=inputs["image_path"],
-            post_type=inputs["post_type"],
-            grammar_level=inputs["grammar_level"],
-            emoji_level=inputs["emoji_level"],
-            hashtag_level=inputs["hashtag_level"],
-            ragebait_level=inputs["ragebait_level"],
-            inspirational_level=inputs["inspirational_level"],
-            informational_level=inputs["informational_level"]
-        )
+        # Generate the post with style preferences, showing progress as it happens
+        final_post = await generate_with_progress(inputs, json_events=args.json_events)
         
-        if result and result.get("final_post"):
+        if final_post and args.json_events:
+            return
+        if final_post:
             print("\n🎯 GENERATED LINKEDIN POST:")
             print("=" * 50)
-            print(result["final_post"])
+            print(final_post)
             print("=" * 50)
             
             # Save to file with timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_file = Path("posts") / f"linkedin_post_{timestamp}.md"
             
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(result["final_post"])
+            await asyncio.to_thread(output_file.write_text, final_post, encoding="utf-8")
             
             print(f"✅ Saved to: {output_file}")
+        elif args.json_events:
+            print_event({"type": "error", "message": "Failed to generate post"})
         else:
             print("❌ Failed to generate post")
-            if result:
-                print(f"Available keys: {list(result.keys())}")
                 
     except Exception as e:
-        print(f"❌ Error: {e}")
+        if args.json_events:
+            print_event({"type": "error", "message": str(e)})
+        else:
+            print(f"❌ Error: {e}")
         import traceback
         traceback.print_exc()
 
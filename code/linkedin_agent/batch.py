@@ -0,0 +1,253 @@
+"""
+Batch LinkedIn post generation with bounded concurrency.
+
+Rows are read from JSONL or CSV, run through the workflow concurrently under a
+shared LLM and search budget (see limits.py), and handed to a callback as soon
+as each one completes.
+"""
+
+import asyncio
+import csv
+import inspect
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable
+
+from langchain_core.runnables import RunnableConfig
+
+from agent_runtime.ledger import UsageLedger, ledger_config
+from agent_runtime.scheduler import set_priority
+from agent_runtime.summary import summary_lines
+
+from . import metrics
+from .blob_store import aingest_image, ingest_image
+from .limits import concurrency_limits
+from .linkedin_agent import graph
+from .linkedin_state import ImageRef, LinkedInAgentState
+
+_LOGGER = logging.getLogger(__name__)
+
+STYLE_FIELDS = (
+    "grammar_level",
+    "emoji_level",
+    "hashtag_level",
+    "ragebait_level",
+    "inspirational_level",
+    "informational_level",
+)
+_PROMPT_FIELDS = ("initial_prompt", "prompt", "content_prompt")
+
+
+def load_batch_rows(path: str | Path) -> list[dict[str, Any]]:
+    """Load batch rows from a .jsonl or .csv file.
+
+    Each row needs a prompt (`initial_prompt`, `prompt` or `content_prompt`) and
+    may set `id`, `image_path`, `post_type`, `refinement_mode` and any of the
+    style levels.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = [dict(row) for row in csv.DictReader(f)]
+    else:
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    for number, row in enumerate(rows, 1):
+        row.setdefault("id", f"row{number:04d}")
+    return rows
+
+
+def row_prompt(row: dict[str, Any]) -> str:
+    """The row's prompt; raises ValueError if it has none."""
+    prompt = next((row[key] for key in _PROMPT_FIELDS if row.get(key)), None)
+    if not prompt:
+        raise ValueError(f"Row {row.get('id')} has no prompt")
+    return prompt
+
+
+def build_state(row: dict[str, Any], image_ref: ImageRef | None = None) -> LinkedInAgentState:
+    """Validate a batch row and turn it into the initial workflow state.
+
+    The row's image is ingested here unless an already ingested `image_ref` is given.
+    """
+    prompt = row_prompt(row)
+    styles = {key: int(row[key]) for key in STYLE_FIELDS if row.get(key) not in (None, "")}
+    image_path = row.get("image_path") or None
+
+    return LinkedInAgentState(
+        initial_prompt=prompt,
+        image_path=image_path,
+        image_ref=image_ref or ingest_image(image_path, row.get("image_base64") or None),
+        post_type=row.get("post_type") or "general",
+        refinement_mode=row.get("refinement_mode") or None,
+        **styles,
+    )
+
+
+async def abuild_state(row: dict[str, Any]) -> LinkedInAgentState:
+    """build_state, ingesting the row's image in the image process pool."""
+    row_prompt(row)
+    image_ref = await aingest_image(row.get("image_path") or None, row.get("image_base64") or None)
+    return build_state(row, image_ref)
+
+
+async def run_with_stage_timings(
+    state: LinkedInAgentState, config: RunnableConfig | None = None
+) -> tuple[dict[str, Any], list[tuple[str, float]]]:
+    """Run the workflow and return the final state with (node, seconds) timings.
+
+    The graph is sequential, so the time between consecutive node updates is
+    the duration of the node that produced the update.
+    """
+    result: dict[str, Any] = {}
+    timings: list[tuple[str, float]] = []
+    last = time.perf_counter()
+
+    async for mode, chunk in graph.astream(state, config, stream_mode=["updates", "values"]):
+        if mode == "updates":
+            now = time.perf_counter()
+            for node in chunk:
+                timings.append((node, now - last))
+                metrics.observe(f"stage.{node}", now - last)
+            last = now
+        else:
+            result = chunk
+
+    return result, timings
+
+
+@dataclass
+class BatchSummary:
+    """Results and timing statistics for a batch run."""
+
+    results: list[dict[str, Any]] = field(default_factory=list)
+    wall_time: float = 0.0
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for result in self.results if not result.get("error"))
+
+    @property
+    def throughput(self) -> float:
+        """Completed posts per minute."""
+        return self.succeeded / self.wall_time * 60 if self.wall_time else 0.0
+
+    def stage_percentiles(self) -> dict[str, dict[str, float]]:
+        """p50/p95/p99 latency per stage across all rows."""
+        samples: dict[str, list[float]] = {}
+        for result in self.results:
+            for stage, seconds in result.get("stage_timings", []):
+                samples.setdefault(stage, []).append(seconds)
+        samples["total"] = [result["elapsed"] for result in self.results if not result.get("error")]
+
+        return {
+            stage: {
+                "count": len(values),
+                "p50": metrics.percentile(values, 50),
+                "p95": metrics.percentile(values, 95),
+                "p99": metrics.percentile(values, 99),
+            }
+            for stage, values in samples.items()
+        }
+
+    def format(self) -> str:
+        """Human-readable throughput and latency table, then each subsystem's summary line."""
+        lines = [
+            f"Posts: {self.succeeded}/{len(self.results)} succeeded in {self.wall_time:.1f}s "
+            f"({self.throughput:.2f} posts/min)",
+            f"{'stage':<20}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}",
+        ]
+        for stage, stats in self.stage_percentiles().items():
+            lines.append(
+                f"{stage:<20}{stats['count']:>7}{stats['p50']:>8.2f}s{stats['p95']:>8.2f}s{stats['p99']:>8.2f}s"
+            )
+        usage = [result["usage"] for result in self.results if result.get("usage")]
+        if usage:
+            total_tokens = [row["total_tokens"] for row in usage]
+            lines.append(
+                f"Tokens: {sum(row['prompt_tokens'] for row in usage)} prompt + "
+                f"{sum(row['completion_tokens'] for row in usage)} completion "
+                f"(p50 {metrics.percentile(total_tokens, 50):.0f}/post, ${sum(row['cost'] for row in usage):.4f}); "
+                f"{sum(1 for row in usage if row['budget']['exceeded'])} posts over budget"
+            )
+        lines += summary_lines()
+        return "\n".join(lines)
+
+
+async def async_create_linkedin_posts(
+    rows: Iterable[dict[str, Any]],
+    concurrency: int = 4,
+    max_llm_calls: int | None = None,
+    max_searches: int | None = None,
+    on_result: Callable[[dict[str, Any]], Awaitable[None] | None] | None = None,
+    priority: str = "batch",
+) -> BatchSummary:
+    """Create many LinkedIn posts concurrently.
+
+    Args:
+        rows: Batch rows as produced by `load_batch_rows`.
+        concurrency: Maximum number of posts in flight at once.
+        max_llm_calls: Shared budget of in-flight model calls across all posts.
+        max_searches: Shared budget of in-flight Tavily searches across all posts.
+            A budget that is given replaces the process-wide limit for the duration of
+            the batch; the previous limit is restored afterwards.
+        on_result: Called with each row result as soon as it completes.
+            Results carry the row's token usage; each row gets its own run budget.
+        priority: LLM scheduling class for the rows; each row is queued as its own flow.
+
+    Returns:
+        A BatchSummary with one result dict per row, in completion order.
+    """
+    row_slots = asyncio.Semaphore(concurrency)
+    summary = BatchSummary()
+    start = time.perf_counter()
+
+    async def run_row(row: dict[str, Any]) -> dict[str, Any]:
+        async with row_slots:
+            # Each row runs in its own task, so this applies to that row's model calls only
+            set_priority(priority, flow=f"batch:{row['id']}")
+            row_start = time.perf_counter()
+            outcome: dict[str, Any] = {"id": row["id"], "final_post": None, "error": None, "stage_timings": []}
+            ledger = UsageLedger()
+            try:
+                state = await abuild_state(row)
+                result, timings = await run_with_stage_timings(state, ledger_config(ledger))
+                ledger.raise_if_aborted()
+                outcome["final_post"] = result.get("final_post")
+                outcome["stage_timings"] = timings
+                if not outcome["final_post"]:
+                    outcome["error"] = "No post generated"
+            except Exception as e:
+                _LOGGER.error("❌ Row %s failed: %s", row["id"], e)
+                outcome["error"] = str(e)
+            outcome["usage"] = ledger.summary()
+            outcome["elapsed"] = time.perf_counter() - row_start
+            return outcome
+
+    with concurrency_limits(max_llm_calls, max_searches):
+        tasks = [asyncio.create_task(run_row(row)) for row in rows]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                outcome = await finished
+                summary.results.append(outcome)
+                _LOGGER.info("✅ Row %s finished in %.2fs (%d/%d)", outcome["id"], outcome["elapsed"], len(summary.results), len(tasks))
+                if on_result:
+                    try:
+                        callback_result = on_result(outcome)
+                        if inspect.isawaitable(callback_result):
+                            await callback_result
+                    except Exception as e:
+                        # A failing callback loses that row's delivery, not the rest of the batch
+                        _LOGGER.error("❌ Result callback failed for row %s: %s", outcome["id"], e)
+        finally:
+            # If the batch itself is cancelled, do not leave its rows running unowned
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    summary.wall_time = time.perf_counter() - start
+    return summary
@@ -0,0 +1,257 @@
+"""
+Best-of-N drafting with a single batched critique.
+
+Instead of up to MAX_ITERATIONS serial author -> critiquer round trips, N drafts
+are written concurrently with different temperatures and angles, scored in one
+critique call, and the top draft is kept. At most one revision of the winner
+follows, so the refinement stage takes a roughly constant three model calls of
+wall-clock time however many drafts are requested.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+
+from agent_runtime.ledger import budget_exhausted
+
+from . import metrics
+from .limits import llm_slot
+from .linkedin_author import (
+    AUTHOR_SYSTEM_PROMPT,
+    build_author_context,
+    build_initial_prompt,
+    estimate_tokens,
+    linkedin_author_agent,
+)
+from .linkedin_author import text_model as author_model
+from .linkedin_critiquer import (
+    APPROVAL_SCORE,
+    CRITIQUER_SYSTEM_PROMPT,
+    EVALUATION_FRAMEWORK,
+    build_critique_context,
+    critique_record,
+    fallback_record,
+    format_critique_feedback,
+    parse_batch_critique_response,
+)
+from .linkedin_critiquer import text_model as critique_model
+from .linkedin_state import LinkedInAgentState
+from .style_check import score_drafts
+from .style_repair import STYLE_REPAIR_ENABLED, repair_draft
+
+_LOGGER = logging.getLogger(__name__)
+_MAX_LLM_RETRIES = 3
+
+REFINEMENT_MODE = os.getenv("REFINEMENT_MODE", "loop")  # "loop" or "best_of_n"
+BEST_OF_N_DRAFTS = int(os.getenv("BEST_OF_N_DRAFTS", "4"))
+BEST_OF_N_REVISE = os.getenv("BEST_OF_N_REVISE", "1") == "1"
+
+# Each concurrent draft gets a different opening angle so the candidates actually differ
+DRAFT_ANGLES = [
+    "Lead with a vulnerable personal story.",
+    "Open with a contrarian hot take.",
+    "Structure the lesson as a short numbered list.",
+    "Open with a surprising number or data point.",
+    "Tell it as a before/after transformation.",
+    "Open with a short dialogue or quote.",
+]
+_MIN_TEMPERATURE = 0.6
+_MAX_TEMPERATURE = 1.0
+
+
+def refinement_mode(state: LinkedInAgentState) -> str:
+    """Route to the sequential author/critic loop or to best-of-N drafting."""
+    mode = state.refinement_mode or REFINEMENT_MODE
+    return "best_of_n" if mode == "best_of_n" else "loop"
+
+
+def draft_temperatures(count: int) -> list[float]:
+    """Spread draft temperatures evenly between _MIN_TEMPERATURE and _MAX_TEMPERATURE."""
+    if count == 1:
+        return [author_model.temperature or _MIN_TEMPERATURE]
+    step = (_MAX_TEMPERATURE - _MIN_TEMPERATURE) / (count - 1)
+    return [round(_MIN_TEMPERATURE + step * i, 2) for i in range(count)]
+
+
+async def _write_draft(prompt: str, angle: str, temperature: float, config: RunnableConfig) -> str | None:
+    model = author_model.bind(temperature=temperature)
+    for attempt in range(_MAX_LLM_RETRIES):
+        try:
+            async with llm_slot():
+                response = await model.ainvoke([
+                    {"role": "system", "content": AUTHOR_SYSTEM_PROMPT},
+                    {"role": "user", "content": f"{prompt}\n    ANGLE FOR THIS DRAFT: {angle}\n"}
+                ], config)
+            if response and response.content:
+                return str(response.content).strip()
+        except Exception as e:
+            _LOGGER.warning(f"⚠️  Draft attempt {attempt + 1} at temperature {temperature} failed: {e}")
+    return None
+
+
+BATCH_CRITIQUE_INSTRUCTIONS = f"""Evaluate each of the candidate LinkedIn posts given at the end for maximum engagement potential.
+Judge every draft on its own merits, using the same framework for all of them.
+
+{EVALUATION_FRAMEWORK}
+RESPONSE FORMAT (JSON), with one entry per draft in the same order:
+{{
+    "critiques": [
+        {{
+            "draft": 1,
+            "scores": {{
+                "engagement_potential": X,
+                "slop_authenticity": X,
+                "algorithm_optimization": X
+            }},
+            "overall_score": X.X,
+            "strengths": ["strength1", "strength2"],
+            "weaknesses": ["weakness1", "weakness2"],
+            "improvements": ["Specific improvement 1", "Specific improvement 2", "Specific improvement 3"],
+            "verdict": "CONTINUE" or "APPROVED",
+            "reasoning": "Brief explanation of verdict"
+        }}
+    ]
+}}
+
+Be constructively critical - we want to pick the most engaging draft!
+"""
+
+
+def build_batch_critique_prompt(state: LinkedInAgentState, drafts: list[str]) -> str:
+    """Prompt asking for one critique per candidate draft in a single response."""
+    
+    candidates = "\n\n".join(f"--- DRAFT {number} ---\n{draft}" for number, draft in enumerate(drafts, 1))
+    
+    return f"""{BATCH_CRITIQUE_INSTRUCTIONS}
+{build_critique_context(state)}
+
+{len(drafts)} CANDIDATE DRAFTS:
+
+{candidates}
+"""
+
+
+async def critique_drafts(
+    state: LinkedInAgentState, drafts: list[str], config: RunnableConfig
+) -> tuple[list[dict[str, Any] | None], Any]:
+    """Score all drafts with one critique call. Returns (critiques, response)."""
+    
+    prompt = build_batch_critique_prompt(state, drafts)
+    for attempt in range(_MAX_LLM_RETRIES):
+        try:
+            async with llm_slot():
+                response = await critique_model.ainvoke([
+                    {"role": "system", "content": CRITIQUER_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ], config)
+            if response and response.content:
+                critiques = parse_batch_critique_response(str(response.content), len(drafts))
+                if any(critiques):
+                    return critiques, response
+                _LOGGER.warning(f"⚠️  Failed to parse batch critique on attempt {attempt + 1}")
+        except Exception as e:
+            _LOGGER.warning(f"⚠️  Batch critique attempt {attempt + 1} failed: {e}")
+    return [None] * len(drafts), None
+
+
+async def best_of_n_author_agent(state: LinkedInAgentState, config: RunnableConfig) -> dict[str, Any]:
+    """Write N drafts concurrently, critique them together and keep the best one."""
+    
+    start_time = time.time()
+    count = max(1, state.best_of_n or BEST_OF_N_DRAFTS)
+    temperatures = draft_temperatures(count)
+    _LOGGER.info(f"✍️  Writing {count} drafts concurrently (temperatures {temperatures})...")
+    
+    prompt = build_initial_prompt(build_author_context(state))
+    results = await asyncio.gather(*[
+        _write_draft(prompt, DRAFT_ANGLES[i % len(DRAFT_ANGLES)], temperature, config)
+        for i, temperature in enumerate(temperatures)
+    ])
+    drafts = [draft for draft in results if draft]
+    _LOGGER.info(f"✅ {len(drafts)}/{count} drafts written in {time.time() - start_time:.2f}s")
+    
+    if not drafts:
+        # Let the sequential author produce its fallback post, then go straight to formatting
+        _LOGGER.error("❌ All concurrent drafts failed")
+        return {"messages": []}
+    
+    if STYLE_REPAIR_ENABLED:
+        drafts = [
+            repair_draft(draft, state.emoji_level, state.hashtag_level, state.trending_hashtags)[0]
+            for draft in drafts
+        ]
+    
+    # Only spend critique tokens on drafts that meet the measurable style constraints, if any do
+    reports = score_drafts(drafts, state.emoji_level, state.hashtag_level)
+    passing = [draft for draft, report in zip(drafts, reports) if report.passed]
+    if passing and len(passing) < len(drafts):
+        _LOGGER.info(f"📏 Dropping {len(drafts) - len(passing)} draft(s) that break style constraints")
+        metrics.incr("precritic.rejections", len(drafts) - len(passing))
+        drafts = passing
+    
+    critiques, response = await critique_drafts(state, drafts, config)
+    scored = [
+        (critique.get("overall_score", 0) if critique else 0, index)
+        for index, critique in enumerate(critiques)
+    ]
+    # Ties, including no critique at all, go to the earliest draft
+    best_score, best_index = max(scored, key=lambda pair: (pair[0], -pair[1]))
+    best_critique = critiques[best_index]
+    
+    draft_number = len(state.post_drafts) + 1
+    if best_critique:
+        feedback = format_critique_feedback(best_critique, draft_number)
+        record = critique_record(best_critique, draft_number)
+    else:
+        feedback = "VERDICT: APPROVED (batch critique unavailable, keeping first draft)"
+        record = fallback_record(draft_number)
+    
+    _LOGGER.info(
+        f"🏆 Picked draft {best_index + 1}/{len(drafts)} with score {best_score}/10 "
+        f"in {time.time() - start_time:.2f}s total"
+    )
+    
+    return {
+        "post_drafts": state.post_drafts + [drafts[best_index]],
+        # Every candidate was written from the same prompt
+        "prompt_tokens": state.prompt_tokens + [estimate_tokens(AUTHOR_SYSTEM_PROMPT + prompt)],
+        "critique_feedback": state.critique_feedback + [feedback],
+        "critiques": state.critiques + [record],
+        "messages": [response] if response else [],
+    }
+
+
+def should_revise_best(state: LinkedInAgentState, config: RunnableConfig | None = None) -> str:
+    """Allow one revision of the winning draft unless it is already good enough."""
+    
+    if not state.post_drafts:
+        # Every concurrent draft failed: let the sequential author write (or fall back) once
+        return "revise"
+    if not BEST_OF_N_REVISE or not state.critiques or budget_exhausted(config, "revision"):
+        return "finish"
+    
+    record = state.critiques[-1]
+    if record.approved or record.overall_score >= APPROVAL_SCORE:
+        _LOGGER.info(f"🎯 Best draft scored {record.overall_score}/10 - no revision needed")
+        return "finish"
+    
+    _LOGGER.info("🔄 Revising the best draft once")
+    return "revise"
+
+
+async def best_of_n_reviser(state: LinkedInAgentState, config: RunnableConfig) -> dict[str, Any]:
+    """Revise the winning draft once, then apply the deterministic style repairs."""
+    
+    update = await linkedin_author_agent(state, config)
+    if STYLE_REPAIR_ENABLED and update.get("post_drafts"):
+        draft, notes = repair_draft(
+            update["post_drafts"][-1], state.emoji_level, state.hashtag_level, state.trending_hashtags
+        )
+        if notes:
+            _LOGGER.info(f"🔧 Repaired revised draft: {'; '.join(notes)}")
+            update["post_drafts"] = update["post_drafts"][:-1] + [draft]
+    return update
@@ -0,0 +1,110 @@
+"""
+Local content-addressed blob store for images.
+
+Images are ingested once: the file is memory-mapped and the same mapping is
+used to compute the content hash, read the image metadata and produce the
+base64 payload sent to the vision model. The payload is written under its
+hash, and the workflow state only carries the small ImageRef. The async
+variants run that work off the event loop (see offload.py).
+"""
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import mmap
+import os
+from pathlib import Path
+
+from PIL import Image
+
+from . import offload
+from .image_cache import CACHE_DIR, dhash
+from .linkedin_state import ImageRef
+
+_LOGGER = logging.getLogger(__name__)
+
+BLOB_DIR = Path(os.getenv("LINKEDIN_BLOB_DIR", str(CACHE_DIR / "blobs")))
+
+
+def _blob_path(sha256: str) -> Path:
+    return BLOB_DIR / sha256[:2] / f"{sha256}.b64"
+
+
+def _ingest_buffer(buffer: bytes | mmap.mmap) -> ImageRef:
+    """Hash, inspect and store an image held in a bytes-like buffer."""
+    sha256 = hashlib.sha256(buffer).hexdigest()
+
+    with Image.open(io.BytesIO(buffer) if isinstance(buffer, bytes) else buffer) as img:
+        ref = ImageRef(
+            sha256=sha256,
+            media_type=Image.MIME.get(img.format or "", "image/jpeg"),
+            width=img.width,
+            height=img.height,
+            format=img.format,
+            mode=img.mode,
+            size_bytes=len(buffer),
+            dhash=f"{dhash(img):016x}",
+        )
+
+    path = _blob_path(sha256)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(base64.b64encode(buffer))
+        os.replace(tmp_path, path)
+
+    return ref
+
+
+def ingest_image_file(image_path: str | Path) -> ImageRef:
+    """Ingest an image file in a single memory-mapped pass."""
+    with open(image_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"Image file is empty: {image_path}")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return _ingest_buffer(mapped)
+
+
+def ingest_image_base64(image_base64: str) -> ImageRef:
+    """Ingest an image given as a data URL or bare base64 string."""
+    if image_base64.startswith("data:"):
+        image_base64 = image_base64.split(",", 1)[1]
+    try:
+        data = base64.b64decode(image_base64, validate=True)
+    except binascii.Error as e:
+        raise ValueError(f"Invalid base64 image data: {e}") from e
+    return _ingest_buffer(data)
+
+
+def ingest_image(image_path: str | None = None, image_base64: str | None = None) -> ImageRef | None:
+    """Ingest whichever image input was provided."""
+    if image_path:
+        return ingest_image_file(image_path)
+    if image_base64:
+        return ingest_image_base64(image_base64)
+    return None
+
+
+async def aingest_image(image_path: str | None = None, image_base64: str | None = None) -> ImageRef | None:
+    """Ingest an image in the image process pool."""
+    if not image_path and not image_base64:
+        return None
+    return await offload.run_cpu_bound(ingest_image, image_path, image_base64)
+
+
+def load_image_base64(ref: ImageRef) -> str:
+    """Read the stored base64 payload for an image."""
+    return _blob_path(ref.sha256).read_text(encoding="ascii")
+
+
+def image_data_url(ref: ImageRef) -> str:
+    """Build a data URL for the image, suitable for vision model prompts."""
+    return f"data:{ref.media_type};base64,{load_image_base64(ref)}"
+
+
+async def aimage_data_url(ref: ImageRef) -> str:
+    """image_data_url, reading the blob in a worker thread."""
+    return await asyncio.to_thread(image_data_url, ref)
@@ -0,0 +1,108 @@
+"""
+Progress events for a single LinkedIn post run.
+
+Wraps the graph's event stream (`astream_events`) into a small set of plain,
+JSON-serializable events that a CLI, dashboard or server can render:
+
+- stage_start / stage_end: a workflow node started or finished (with seconds)
+- token: a chunk of author output as it is generated
+- critique: scores and verdict of a critiqued draft
+- style_check: hard style constraints a draft broke (see style_check.py)
+- done: the final state's post, drafts and per-stage timings (and token
+  usage when the config carries a UsageLedger)
+"""
+
+import time
+from typing import Any, AsyncIterator
+
+from agent_runtime.ledger import find_ledger
+
+from .linkedin_agent import graph
+from .linkedin_state import LinkedInAgentState
+
+# Nodes whose model output is the post itself and worth streaming token by token
+STREAMED_NODES = {"author", "reviser"}
+
+_NODES = {name for name in graph.nodes if not name.startswith("__")}
+
+
+def _critique_event(record: Any) -> dict[str, Any]:
+    data = record.model_dump() if hasattr(record, "model_dump") else dict(record)
+    return {
+        "type": "critique",
+        "draft": data["draft_number"],
+        "overall_score": data["overall_score"],
+        "scores": {
+            "engagement_potential": data["engagement_potential"],
+            "slop_authenticity": data["slop_authenticity"],
+            "algorithm_optimization": data["algorithm_optimization"],
+        },
+        "verdict": data["verdict"],
+        "improvements": data["improvements"],
+        "fallback": data["fallback"],
+    }
+
+
+async def stream_post_events(state: LinkedInAgentState, config: dict[str, Any] | None = None) -> AsyncIterator[dict[str, Any]]:
+    """Run the workflow for one post, yielding progress events as they happen."""
+    
+    start = time.perf_counter()
+    started: dict[str, float] = {}
+    timings: list[tuple[str, float]] = []
+    ledger = find_ledger(config)
+    
+    async for event in graph.astream_events(state, config, version="v2"):
+        kind = event["event"]
+        name = event["name"]
+        node = event.get("metadata", {}).get("langgraph_node")
+        elapsed = round(time.perf_counter() - start, 3)
+        is_node = name in _NODES and node == name and len(event.get("parent_ids", [])) == 1
+        
+        if kind == "on_chain_start" and is_node:
+            started[event["run_id"]] = time.perf_counter()
+            yield {"type": "stage_start", "stage": name, "elapsed": elapsed}
+        
+        elif kind == "on_chat_model_stream" and node in STREAMED_NODES:
+            text = event["data"]["chunk"].content
+            if text:
+                yield {"type": "token", "stage": node, "text": text, "elapsed": elapsed}
+        
+        elif kind == "on_chain_end" and is_node:
+            seconds = time.perf_counter() - started.pop(event["run_id"], time.perf_counter())
+            timings.append((name, seconds))
+            output = event["data"].get("output") or {}
+            yield {"type": "stage_end", "stage": name, "seconds": round(seconds, 3), "elapsed": elapsed}
+            
+            if isinstance(output, dict):
+                if name in ("critiquer", "best_of_n") and output.get("critiques"):
+                    yield {**_critique_event(output["critiques"][-1]), "elapsed": elapsed}
+                if name == "precritic" and output.get("style_violations"):
+                    yield {"type": "style_check", "violations": output["style_violations"], "elapsed": elapsed}
+        
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            result = event["data"].get("output") or {}
+            done = {
+                "type": "done",
+                "final_post": result.get("final_post"),
+                "drafts": len(result.get("post_drafts", [])),
+                "industry": result.get("industry"),
+                "stage_timings": [[stage, round(seconds, 3)] for stage, seconds in timings],
+                "elapsed": elapsed,
+            }
+            if ledger:
+                ledger.raise_if_aborted()
+                done["usage"] = ledger.summary()
+            yield done
+
+
+def stage_table(timings: list[tuple[str, float]] | list[list[Any]]) -> str:
+    """Per-stage call count, total and slowest latency, in order of first appearance."""
+    stats: dict[str, list[float]] = {}
+    for stage, seconds in timings:
+        stats.setdefault(stage, []).append(seconds)
+    
+    lines = [f"{'stage':<20}{'calls':>7}{'total':>10}{'max':>9}"]
+    for stage, values in stats.items():
+        lines.append(f"{stage:<20}{len(values):>7}{sum(values):>9.2f}s{max(values):>8.2f}s")
+    lines.append(f"{'total':<20}{sum(len(v) for v in stats.values()):>7}{sum(sum(v) for v in stats.values()):>9.2f}s")
+    return "\n".join(lines)
@@ -0,0 +1,169 @@
+"""
+Hashtag mining and ranking from search results.
+
+Hashtags are pulled out of search result text with a compiled regex and
+folded case-insensitively. Each industry keeps a rolling frequency table in
+which a tag scores once per source that mentions it, weighted by how recent
+the source is, and older observations decay with HASHTAG_HALF_LIFE_DAYS. Ranking
+is a sort over this table, so no LLM call is needed.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+from .image_cache import CACHE_DIR
+
+_LOGGER = logging.getLogger(__name__)
+
+HASHTAG_HALF_LIFE_DAYS = float(os.getenv("HASHTAG_HALF_LIFE_DAYS", "7"))
+MAX_TAGS_PER_INDUSTRY = 500
+_MIN_SCORE = 0.01
+
+# A '#' not preceded by a word character, '#', '&' or '/' (to skip C#, "##", HTML
+# entities and URL fragments), followed by a letter and up to 49 word characters.
+HASHTAG_PATTERN = re.compile(r"(?<![\w#&/])#([A-Za-z][A-Za-z0-9_]{1,49})\b")
+
+
+def extract_hashtags(text: str) -> list[str]:
+    """Return the hashtags in a text, in order of appearance, with their '#'."""
+    return [f"#{match}" for match in HASHTAG_PATTERN.findall(text or "")]
+
+
+def _published_at(source: dict[str, Any]) -> float | None:
+    """Parse a search result's publication date (RFC 2822 or ISO 8601) to a timestamp."""
+    value = source.get("published_date")
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _decay(age_seconds: float) -> float:
+    return 0.5 ** (max(age_seconds, 0.0) / (HASHTAG_HALF_LIFE_DAYS * 86400))
+
+
+class HashtagIndex:
+    """Rolling, recency-weighted hashtag frequency tables keyed by industry."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._tables: dict[str, dict[str, dict[str, Any]]] = self._load()
+
+    def _load(self) -> dict[str, dict[str, dict[str, Any]]]:
+        if not self.path:
+            return {}
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            _LOGGER.warning(f"⚠️  Ignoring unreadable hashtag index {self.path}: {e}")
+            return {}
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        payload = json.dumps(self._tables)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(payload, encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def observe(self, industry: str, sources: Iterable[dict[str, Any]], now: float | None = None) -> int:
+        """Fold the hashtags found in a batch of search results into an industry's table.
+
+        Returns the number of distinct hashtags seen in the batch.
+        """
+        now = now or time.time()
+        weights: dict[str, float] = {}
+        variants: dict[str, Counter] = {}
+
+        for source in sources:
+            text = " ".join(str(source.get(field) or "") for field in ("title", "content", "raw_content"))
+            tags = extract_hashtags(text)
+            if not tags:
+                continue
+            published = _published_at(source)
+            weight = _decay(now - published) if published else 1.0
+            for tag in tags:
+                key = tag.lower()
+                variants.setdefault(key, Counter())[tag] += 1
+            for key in {tag.lower() for tag in tags}:
+                # Count each source once per tag so one spammy page cannot dominate
+                weights[key] = weights.get(key, 0.0) + weight
+
+        if not weights:
+            return 0
+
+        with self._lock:
+            table = self._tables.setdefault(industry.lower(), {})
+            for entry in table.values():
+                entry["score"] *= _decay(now - entry["updated"])
+                entry["updated"] = now
+            for key, weight in weights.items():
+                entry = table.setdefault(key, {"score": 0.0, "updated": now, "variants": {}})
+                entry["score"] += weight
+                for variant, count in variants[key].items():
+                    entry["variants"][variant] = entry["variants"].get(variant, 0) + count
+
+            ranked = sorted(table.items(), key=lambda item: item[1]["score"], reverse=True)
+            self._tables[industry.lower()] = {
+                key: entry for key, entry in ranked[:MAX_TAGS_PER_INDUSTRY] if entry["score"] >= _MIN_SCORE
+            }
+            self._save()
+
+        return len(weights)
+
+    def top(self, industry: str, limit: int = 10, now: float | None = None) -> list[str]:
+        """Return an industry's highest-ranked hashtags in their most common spelling."""
+        now = now or time.time()
+        with self._lock:
+            table = self._tables.get(industry.lower(), {})
+            ranked = sorted(
+                table.values(),
+                key=lambda entry: entry["score"] * _decay(now - entry["updated"]),
+                reverse=True,
+            )
+            return [max(entry["variants"].items(), key=lambda item: item[1])[0] for entry in ranked[:limit]]
+
+
+def rank_hashtags(industry: str, limit: int, fallback: Iterable[str] = ()) -> list[str]:
+    """Top hashtags for an industry, padded from a fallback list without duplicates."""
+    ranked = get_index().top(industry, limit)
+    seen = {tag.lower() for tag in ranked}
+    for tag in fallback:
+        if len(ranked) >= limit:
+            break
+        if tag.lower() not in seen:
+            ranked.append(tag)
+            seen.add(tag.lower())
+    return ranked
+
+
+_INDEX: HashtagIndex | None = None
+
+
+def get_index() -> HashtagIndex:
+    """Return the process-wide hashtag index."""
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = HashtagIndex(CACHE_DIR / "hashtags.json")
+    return _INDEX
@@ -10,8 +10,9 @@ from typing import Any
 from langchain_core.runnables import RunnableConfig
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
 
+from . import blob_store, image_cache
+from .limits import llm_slot
 from .linkedin_state import LinkedInAgentState
-from .tools import encode_image_to_base64
 
 _LOGGER = logging.getLogger(__name__)
 _MAX_LLM_RETRIES = 3
@@ -67,13 +68,41 @@ async def image_context_analyzer(state: LinkedInAgentState, config: RunnableConf
     Format as structured analysis with clear categories.
     """
     
+    image_ref = state.image_ref
     try:
-        # Process image with base64 encoding for API
-        _LOGGER.info("⚙️  Converting image to base64...")
-        encode_start = time.time()
-        image_b64 = await encode_image_to_base64.ainvoke(state.image_path or state.image_base64)
-        encode_time = time.time() - encode_start
-        _LOGGER.info(f"✅ Image encoded in {encode_time:.2f}s")
+        # Ingest the image into the blob store once; the state only keeps the reference
+        if image_ref is None:
+            _LOGGER.info("⚙️  Ingesting image into blob store...")
+            ingest_start = time.time()
+            image_ref = await blob_store.aingest_image(state.image_path, state.image_base64)
+            if image_ref is None:
+                raise ValueError("No image provided")
+            _LOGGER.info(f"✅ Image ingested in {time.time() - ingest_start:.2f}s ({image_ref.size_bytes / 1024:.0f} KB)")
+        image_updates = {"image_ref": image_ref, "image_base64": None}
+        
+        # Reuse a stored analysis for this image (or a near-duplicate crop of it)
+        cache_key = None
+        if image_cache.IMAGE_CACHE_ENABLED:
+            try:
+                cache_key = (image_ref.sha256, int(image_ref.dhash, 16))
+                cached = await asyncio.to_thread(image_cache.get_cache().lookup, *cache_key)
+                if cached:
+                    total_time = time.time() - start_time
+                    _LOGGER.info(
+                        f"📦 Image analysis cache {cached.match} hit (distance {cached.distance}) in {total_time:.2f}s "
+                        f"- hit rate {image_cache.hit_rate():.0%}"
+                    )
+                    return {
+                        **image_updates,
+                        "image_description": cached.image_description,
+                        "visual_elements": cached.visual_elements,
+                        "messages": []
+                    }
+                _LOGGER.info(f"📦 Image analysis cache miss - hit rate {image_cache.hit_rate():.0%}")
+            except Exception as e:
+                _LOGGER.warning(f"⚠️  Image analysis cache unavailable: {e}")
+        
+        image_url = await blob_store.aimage_data_url(image_ref)
         
         _LOGGER.info("🚀 Calling Llama 3.2 Vision (11B) for image analysis...")
         api_start = time.time()
@@ -83,14 +112,15 @@ async def image_context_analyzer(state: LinkedInAgentState, config: RunnableConf
                 _LOGGER.info(f"📡 API call attempt {attempt + 1}/{_MAX_LLM_RETRIES}")
                 
                 # Use the simpler image format from NVIDIA sample
-                content_with_image = f'{analysis_prompt} <img src="data:image/jpeg;base64,{image_b64}" />'
+                content_with_image = f'{analysis_prompt} <img src="{image_url}" />'
                 
-                response = await vision_model.ainvoke([
-                    {
-                        "role": "user", 
-                        "content": content_with_image
-                    }
-                ], config)
+                async with llm_slot():
+                    response = await vision_model.ainvoke([
+                        {
+                            "role": "user", 
+                            "content": content_with_image
+                        }
+                    ], config)
                 
                 api_time = time.time() - api_start
                 _LOGGER.info(f"✅ Llama 11B Vision API responded in {api_time:.2f}s")
@@ -113,7 +143,14 @@ async def image_context_analyzer(state: LinkedInAgentState, config: RunnableConf
                     if "text" in content.lower():
                         visual_elements.append("text")
                     
+                    if cache_key:
+                        try:
+                            await asyncio.to_thread(image_cache.get_cache().store, *cache_key, content, visual_elements)
+                        except Exception as e:
+                            _LOGGER.warning(f"⚠️  Failed to cache image analysis: {e}")
+                    
                     return {
+                        **image_updates,
                         "image_description": content,
                         "visual_elements": visual_elements,
                         "messages": [response]
@@ -170,6 +207,8 @@ CONTENT DIRECTION: Create LinkedIn content that relates to the user's prompt but
 """
         
         return {
+            "image_ref": image_ref,
+            "image_base64": None,
             "image_description": fallback_description,
             "visual_elements": ["technical_issue"],
             "messages": []
@@ -0,0 +1,178 @@
+"""
+Persistent cache of image analyses with near-duplicate lookup.
+
+Analyses are keyed by the SHA-256 of the image bytes. Each entry also stores a
+64-bit difference hash (dHash) of the image so that re-crops, re-encodes and
+resized copies of the same photo can reuse a stored analysis when their
+Hamming distance is within the configured threshold.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from PIL import Image
+
+from . import metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+CACHE_DIR = Path(os.getenv("LINKEDIN_CACHE_DIR", str(Path.home() / ".cache" / "linkedin_agent")))
+IMAGE_CACHE_ENABLED = os.getenv("IMAGE_CACHE", "1") == "1"
+# Maximum number of differing dHash bits (out of 64) for two images to count as near-duplicates
+IMAGE_CACHE_MAX_DISTANCE = int(os.getenv("IMAGE_CACHE_MAX_DISTANCE", "10"))
+DHASH_SIZE = 8
+
+
+@dataclass(frozen=True)
+class CachedAnalysis:
+    """A stored analysis returned by a cache lookup."""
+
+    image_description: str
+    visual_elements: list[str]
+    match: str  # "exact" or "near"
+    distance: int
+
+
+def dhash(image: Image.Image, hash_size: int = DHASH_SIZE) -> int:
+    """Compute the difference hash of an image.
+
+    The image is reduced to a (hash_size + 1) x hash_size grayscale thumbnail and
+    each bit records whether a pixel is brighter than its right-hand neighbour.
+    """
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = small.tobytes()
+    width = hash_size + 1
+    value = 0
+    for row in range(hash_size):
+        offset = row * width
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+
+class ImageAnalysisCache:
+    """SQLite-backed store of image analyses with an in-memory dHash index."""
+
+    def __init__(self, path: Path, max_distance: int = IMAGE_CACHE_MAX_DISTANCE):
+        self.path = path
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        self._index: dict[str, int] | None = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS image_analysis (
+                    sha256 TEXT PRIMARY KEY,
+                    dhash TEXT NOT NULL,
+                    image_description TEXT NOT NULL,
+                    visual_elements TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )"""
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _load_index(self) -> dict[str, int]:
+        if self._index is None:
+            with self._connect() as conn:
+                rows = conn.execute("SELECT sha256, dhash FROM image_analysis").fetchall()
+            self._index = {sha: int(value, 16) for sha, value in rows}
+        return self._index
+
+    def lookup(self, sha256: str, image_dhash: int) -> CachedAnalysis | None:
+        """Find an exact or near-duplicate analysis, recording hit/miss metrics."""
+        with self._lock:
+            index = self._load_index()
+            match, distance = None, 0
+            if sha256 in index:
+                match = "exact"
+            else:
+                best_sha, best_distance = None, self.max_distance + 1
+                for candidate_sha, candidate_hash in index.items():
+                    candidate_distance = hamming_distance(image_dhash, candidate_hash)
+                    if candidate_distance < best_distance:
+                        best_sha, best_distance = candidate_sha, candidate_distance
+                if best_sha is not None:
+                    sha256, match, distance = best_sha, "near", best_distance
+
+        if match is None:
+            metrics.incr("image_cache.misses")
+            return None
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT image_description, visual_elements FROM image_analysis WHERE sha256 = ?",
+                (sha256,),
+            ).fetchone()
+            if row is None:
+                metrics.incr("image_cache.misses")
+                return None
+            conn.execute("UPDATE image_analysis SET hits = hits + 1 WHERE sha256 = ?", (sha256,))
+
+        metrics.incr(f"image_cache.{match}_hits")
+        return CachedAnalysis(
+            image_description=row[0],
+            visual_elements=json.loads(row[1]),
+            match=match,
+            distance=distance,
+        )
+
+    def store(self, sha256: str, image_dhash: int, image_description: str, visual_elements: list[str]) -> None:
+        """Persist an analysis for an image."""
+        with self._connect() as conn:
+            conn.execute(
+                """INSERT OR REPLACE INTO image_analysis
+                   (sha256, dhash, image_description, visual_elements, created_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (sha256, f"{image_dhash:016x}", image_description, json.dumps(visual_elements), time.time()),
+            )
+        with self._lock:
+            self._load_index()[sha256] = image_dhash
+
+
+def hit_rate() -> float:
+    """Fraction of lookups served from the cache (exact or near-duplicate)."""
+    lookups = ["image_cache.exact_hits", "image_cache.near_hits", "image_cache.misses"]
+    return metrics.ratio("image_cache.exact_hits", lookups) + metrics.ratio("image_cache.near_hits", lookups)
+
+
+def cache_stats() -> dict[str, float]:
+    """Hit/miss counters and the overall hit rate."""
+    return {
+        "exact_hits": metrics.counter("image_cache.exact_hits"),
+        "near_hits": metrics.counter("image_cache.near_hits"),
+        "misses": metrics.counter("image_cache.misses"),
+        "hit_rate": hit_rate(),
+    }
+
+
+_CACHE: ImageAnalysisCache | None = None
+
+
+def get_cache() -> ImageAnalysisCache:
+    """Return the process-wide image analysis cache."""
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = ImageAnalysisCache(CACHE_DIR / "image_analysis.sqlite")
+    return _CACHE
@@ -3,12 +3,14 @@ Industry Analyzer Agent for determining the correct industry context.
 """
 
 import logging
+import re
 import time
 from typing import Any
 
 from langchain_core.runnables import RunnableConfig
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
 
+from .limits import llm_slot
 from .linkedin_state import LinkedInAgentState
 
 _LOGGER = logging.getLogger(__name__)
@@ -17,26 +19,41 @@ _MAX_LLM_RETRIES = 3
 # Use Llama 3.3 70B for industry analysis
 text_model = ChatNVIDIA(model="meta/llama-3.3-70b-instruct", temperature=0.3)
 
+# Keyword hints per industry, mirroring the INDUSTRY DETECTION HINTS in the classifier prompt
+INDUSTRY_KEYWORDS = {
+    "software": ["nvidia", "software", "ai", "ml", "llm", "llms", "coding", "programming", "python", "github", "devops",
+                 "cloud", "kubernetes", "open-source", "open source", "tech", "gaming", "fortnite", "dev", "developer",
+                 "saas", "startup", "gpu", "gpus", "cybersecurity"],
+    "finance": ["finance", "banking", "bank", "investment", "investing", "trading", "money", "stocks", "vc",
+                "venture capital", "roi", "crypto", "fintech", "bloomberg", "robinhood", "accounting"],
+    "healthcare": ["doctor", "nurse", "patient", "patients", "clinic", "hospital", "medical", "crispr", "biotech",
+                   "pharma", "healthcare", "moderna"],
+    "marketing": ["marketing", "advertising", "brand", "branding", "campaign", "instagram", "influencer",
+                  "influencers", "seo", "meta ads", "storytelling"],
+    "consulting": ["consulting", "consultant", "mckinsey", "bain", "bcg", "swot", "strategy roadmap", "market analysis"],
+    "education": ["teacher", "teaching", "student", "students", "university", "canvas", "edtech", "mooc",
+                  "academia", "thesis", "classroom"],
+    "manufacturing": ["robotics", "manufacturing", "factory", "industrial automation", "boeing", "supply chain",
+                      "assembly line"],
+    "retail": ["amazon", "shopify", "dtc", "e-commerce", "ecommerce", "clothing brand", "fashion", "retail", "snack"],
+    "real_estate": ["zillow", "construction", "real estate", "home flipping", "smart cities", "revit", "property"],
+    "energy": ["solar", "wind farm", "ev charging", "net-zero", "net zero", "exxon", "green tech", "renewable",
+               "energy", "oil and gas"],
+    "media": ["hollywood", "youtube", "documentary", "podcast", "screenwriting", "broadcast", "journalism", "film"],
+    "nonprofit": ["red cross", "volunteering", "volunteer", "impact report", "ngo", "nonprofit", "charity",
+                  "community event"],
+}
+_INDUSTRY_PATTERNS = {
+    industry: re.compile(r"\b(?:" + "|".join(re.escape(keyword) for keyword in keywords) + r")\b", re.IGNORECASE)
+    for industry, keywords in INDUSTRY_KEYWORDS.items()
+}
 
-async def industry_analyzer_agent(state: LinkedInAgentState, config: RunnableConfig) -> dict[str, Any]:
-    """Analyze the image and prompt to determine the industry context."""
-    
-    start_time = time.time()
-    _LOGGER.info("🏭 Starting industry analysis...")
-    
-    industry_prompt = f"""
-    Based on the following information, determine the PRIMARY industry this LinkedIn post should target:
-    
-    IMAGE DESCRIPTION:
-    {state.image_description or "No image provided"}
-    
-    USER PROMPT:
-    {state.initial_prompt}
-    
-    POST TYPE:
-    {state.post_type}
-    
-    You are an industry classification agent. Based on user content (text, images, or metadata), you must categorize the content into a single most relevant industry.
+
+INDUSTRY_CLASSIFIER_SYSTEM_PROMPT = "You are an expert at categorizing business content by industry. Always respond with exactly one industry name from the provided list. Pay special attention to company names and technical keywords."
+
+INDUSTRY_CLASSIFIER_INSTRUCTIONS = """Determine the PRIMARY industry this LinkedIn post should target.
+
+You are an industry classification agent. Based on user content (text, images, or metadata) given at the end, you must categorize the content into a single most relevant industry.
 
 AVAILABLE INDUSTRY OPTIONS:
 - software: Software development, web/app development, DevOps, AI/ML, cybersecurity, tech startups, SaaS, open source, gaming tech, entertainment tech (e.g., NVIDIA, Google, Epic Games)
@@ -74,6 +91,40 @@ INSTRUCTIONS:
 4. If multiple industries seem relevant, select the **most dominant** one based on context.
 5. Use **"general_business" only as a last resort**, and only if **none** of the others clearly apply.
 6. Output only the **industry name** as listed (e.g., `software`, `finance`).
+"""
+
+
+def guess_industry(text: str) -> tuple[str, float]:
+    """Cheap keyword-based industry guess.
+    
+    Returns the industry with the most keyword matches and a confidence equal to
+    its share of all matches, or ("general_business", 0.0) when nothing matches.
+    """
+    hits = {industry: len(pattern.findall(text or "")) for industry, pattern in _INDUSTRY_PATTERNS.items()}
+    total = sum(hits.values())
+    if not total:
+        return "general_business", 0.0
+    industry = max(hits, key=hits.get)
+    return industry, hits[industry] / total
+
+
+async def industry_analyzer_agent(state: LinkedInAgentState, config: RunnableConfig) -> dict[str, Any]:
+    """Analyze the image and prompt to determine the industry context."""
+    
+    start_time = time.time()
+    _LOGGER.info("🏭 Starting industry analysis...")
+    
+    # Static instructions first so every classification request shares a cacheable prefix
+    industry_prompt = f"""{INDUSTRY_CLASSIFIER_INSTRUCTIONS}
+
+IMAGE DESCRIPTION:
+{state.image_description or "No image provided"}
+
+USER PROMPT:
+{state.initial_prompt}
+
+POST TYPE:
+{state.post_type}
 
 INDUSTRY:"""
     
@@ -82,10 +133,11 @@ INDUSTRY:"""
         
         for attempt in range(_MAX_LLM_RETRIES):
             try:
-                response = await text_model.ainvoke([
-                    {"role": "system", "content": "You are an expert at categorizing business content by industry. Always respond with exactly one industry name from the provided list. Pay special attention to company names and technical keywords."},
-                    {"role": "user", "content": industry_prompt}
-                ], config)
+                async with llm_slot():
+                    response = await text_model.ainvoke([
+                        {"role": "system", "content": INDUSTRY_CLASSIFIER_SYSTEM_PROMPT},
+                        {"role": "user", "content": industry_prompt}
+                    ], config)
                 
                 if response and response.content:
                     industry = str(response.content).strip().lower()
@@ -123,22 +175,8 @@ INDUSTRY:"""
         total_time = time.time() - start_time
         _LOGGER.error(f"❌ Error in industry analysis after {total_time:.2f}s: {e}")
         
-        # Smart fallback based on keywords in the prompt
-        prompt_lower = state.initial_prompt.lower()
-        image_desc_lower = (state.image_description or "").lower()
-        
-        # Check for obvious industry indicators
-        if any(keyword in prompt_lower or keyword in image_desc_lower for keyword in 
-               ["nvidia", "software", "ai", "ml", "coding", "programming", "tech", "gaming", "fortnite", "dev", "cloud"]):
-            fallback_industry = "software"
-        elif any(keyword in prompt_lower for keyword in 
-                ["finance", "banking", "investment", "trading", "money"]):
-            fallback_industry = "finance"
-        elif any(keyword in prompt_lower for keyword in 
-                ["marketing", "advertising", "brand", "campaign"]):
-            fallback_industry = "marketing"
-        else:
-            fallback_industry = "general_business"
+        # Smart fallback based on keywords in the prompt and image description
+        fallback_industry, _ = guess_industry(f"{state.initial_prompt}\n{state.image_description or ''}")
         
         _LOGGER.info(f"🔄 Using keyword-based fallback: '{fallback_industry}'")
         
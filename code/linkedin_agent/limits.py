@@ -0,0 +1,69 @@
+"""Shared concurrency budgets for model calls and web searches.
+
+Model calls go through the process-wide LLM scheduler (agent_runtime.scheduler),
+which the report agent shares, so a budget set here also covers report runs
+and queued calls are granted by priority class and fair share.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator
+
+from agent_runtime.scheduler import get_scheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+_search_limit: int | None = None
+_search_semaphore: asyncio.Semaphore | None = None
+
+
+def _set_limits(max_llm_calls: int | None, max_searches: int | None) -> None:
+    global _search_limit, _search_semaphore
+    get_scheduler().configure(max_llm_calls or None)
+    _search_limit = max_searches or None
+    _search_semaphore = asyncio.Semaphore(max_searches) if max_searches else None
+    _LOGGER.info("Concurrency limits: llm=%s, search=%s", max_llm_calls or "unlimited", max_searches or "unlimited")
+
+
+def configure_limits(max_llm_calls: int | None = None, max_searches: int | None = None) -> tuple[int | None, int | None]:
+    """Set the maximum number of in-flight LLM calls and/or Tavily searches.
+
+    A limit that is not given keeps its current value (unlimited unless set
+    before). The budgets are shared by every post (and report) generated in
+    the process, so a batch of concurrent posts cannot exceed them. Returns the
+    previous (llm, search) limits, with None meaning unlimited.
+    """
+    previous = (get_scheduler().max_concurrent, _search_limit)
+    _set_limits(max_llm_calls or previous[0], max_searches or previous[1])
+    return previous
+
+
+@contextmanager
+def concurrency_limits(max_llm_calls: int | None = None, max_searches: int | None = None) -> Iterator[None]:
+    """Apply the given limits for the duration of a block, then restore the previous ones."""
+    if not (max_llm_calls or max_searches):
+        yield
+        return
+    previous = configure_limits(max_llm_calls, max_searches)
+    try:
+        yield
+    finally:
+        _set_limits(*previous)
+
+
+@asynccontextmanager
+async def llm_slot() -> AsyncIterator[None]:
+    """Hold one slot of the shared LLM budget for the duration of a call."""
+    async with get_scheduler().slot():
+        yield
+
+
+@asynccontextmanager
+async def search_slot() -> AsyncIterator[None]:
+    """Hold one slot of the shared search budget for the duration of a search."""
+    if _search_semaphore is None:
+        yield
+        return
+    async with _search_semaphore:
+        yield
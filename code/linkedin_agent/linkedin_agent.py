@@ -3,13 +3,17 @@ Main LinkedIn Agent orchestrator using LangGraph with refinement loop.
 """
 
 import logging
-from langgraph.graph import END, START, StateGraph
+from langgraph.graph import END, START
+
+from agent_runtime.state_backend import state_backend, state_graph
 
 from .linkedin_state import LinkedInAgentState
 from .questionnaire_agent import questionnaire_agent
-from .image_analyzer import image_context_analyzer
 from .industry_analyzer import industry_analyzer_agent
-from .linkedin_researcher import linkedin_research_agent
+from .best_of_n import best_of_n_author_agent, best_of_n_reviser, refinement_mode, should_revise_best
+from .style_check import should_precritic_reject, style_precritic
+from .style_repair import style_repair
+from .speculation import speculative_image_analyzer, speculative_research_agent
 from .linkedin_author import linkedin_author_agent, simple_markdown_formatter
 from .linkedin_critiquer import linkedin_critiquer_agent, should_continue_refining
 
@@ -18,55 +22,94 @@ _LOGGER = logging.getLogger(__name__)
 
 def should_skip_image_analysis(state: LinkedInAgentState) -> str:
     """Determine if we should skip image analysis after questionnaire."""
-    if state.image_path or state.image_base64:
+    if state.image_ref or state.image_path or state.image_base64:
         return "analyze_image"
     else:
         return "analyze_industry"
 
 
-# Create the workflow with refinement loop and questionnaire
-workflow = StateGraph(LinkedInAgentState)
-
-# Add nodes for complete workflow with questionnaire first
-workflow.add_node("questionnaire", questionnaire_agent)
-workflow.add_node("image_analyzer", image_context_analyzer)
-workflow.add_node("industry_analyzer", industry_analyzer_agent)
-workflow.add_node("researcher", linkedin_research_agent)
-workflow.add_node("author", linkedin_author_agent)
-workflow.add_node("critiquer", linkedin_critiquer_agent)
-workflow.add_node("formatter", simple_markdown_formatter)
-
-# Set up the workflow edges starting with questionnaire
-workflow.add_edge(START, "questionnaire")
-
-workflow.add_conditional_edges(
-    "questionnaire",
-    should_skip_image_analysis,
-    {
-        "analyze_image": "image_analyzer",
-        "analyze_industry": "industry_analyzer"
-    }
-)
-
-# Main workflow: Questionnaire → Image → Industry → Research → Author → Critiquer → (Loop) → Formatter
-workflow.add_edge("image_analyzer", "industry_analyzer")
-workflow.add_edge("industry_analyzer", "researcher")
-workflow.add_edge("researcher", "author")
-workflow.add_edge("author", "critiquer")
-
-# REFINEMENT LOOP: Critiquer decides whether to continue refining or finish
-workflow.add_conditional_edges(
-    "critiquer",
-    should_continue_refining,
-    {
-        "continue": "author",  # Loop back to author for another iteration
-        "finish": "formatter"  # Move to final formatting
-    }
-)
-
-workflow.add_edge("formatter", END)
+def build_graph(backend: str | None = None):
+    """Compile the LinkedIn workflow on a state backend (default: LINKEDIN_STATE_BACKEND)."""
+    # Create the workflow with refinement loop and questionnaire
+    workflow = state_graph(LinkedInAgentState, backend or state_backend("linkedin"))
+
+    # Add nodes for complete workflow with questionnaire first
+    workflow.add_node("questionnaire", questionnaire_agent)
+    workflow.add_node("image_analyzer", speculative_image_analyzer)
+    workflow.add_node("industry_analyzer", industry_analyzer_agent)
+    workflow.add_node("researcher", speculative_research_agent)
+    workflow.add_node("author", linkedin_author_agent)
+    workflow.add_node("repair", style_repair)
+    workflow.add_node("precritic", style_precritic)
+    workflow.add_node("critiquer", linkedin_critiquer_agent)
+    workflow.add_node("best_of_n", best_of_n_author_agent)
+    workflow.add_node("reviser", best_of_n_reviser)
+    workflow.add_node("formatter", simple_markdown_formatter)
+
+    # Set up the workflow edges starting with questionnaire
+    workflow.add_edge(START, "questionnaire")
+
+    workflow.add_conditional_edges(
+        "questionnaire",
+        should_skip_image_analysis,
+        {
+            "analyze_image": "image_analyzer",
+            "analyze_industry": "industry_analyzer"
+        }
+    )
+
+    # Main workflow: Questionnaire → Image → Industry → Research → Author → Repair → Pre-critic → Critiquer → (Loop) → Formatter
+    workflow.add_edge("image_analyzer", "industry_analyzer")
+    workflow.add_edge("industry_analyzer", "researcher")
+    workflow.add_conditional_edges(
+        "researcher",
+        refinement_mode,
+        {
+            "loop": "author",
+            "best_of_n": "best_of_n"
+        }
+    )
+    workflow.add_edge("author", "repair")
+    workflow.add_edge("repair", "precritic")
+
+    # Drafts that clearly break measurable style constraints skip the LLM critique
+    workflow.add_conditional_edges(
+        "precritic",
+        should_precritic_reject,
+        {
+            "revise": "author",
+            "critique": "critiquer",
+            "finish": "formatter"  # Over budget
+        }
+    )
+
+    # REFINEMENT LOOP: Critiquer decides whether to continue refining or finish
+    workflow.add_conditional_edges(
+        "critiquer",
+        should_continue_refining,
+        {
+            "continue": "author",  # Loop back to author for another iteration
+            "finish": "formatter"  # Move to final formatting
+        }
+    )
+
+    # BEST-OF-N: N concurrent drafts, one batched critique, at most one revision
+    workflow.add_conditional_edges(
+        "best_of_n",
+        should_revise_best,
+        {
+            "revise": "reviser",
+            "finish": "formatter"
+        }
+    )
+    workflow.add_edge("reviser", "formatter")
+
+    workflow.add_edge("formatter", END)
+
+    return workflow.compile()
+
 
 # Compile the graph
-graph = workflow.compile()
+graph = build_graph()
 
 _LOGGER.info("LinkedIn Slop Bot workflow compiled successfully with questionnaire and critique refinement loop") 
\ No newline at end of file
@@ -3,12 +3,18 @@ LinkedIn Author Agent for generating "slop" content.
 """
 
 import logging
+import os
 import time
 from typing import Any
 
 from langchain_core.runnables import RunnableConfig
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
 
+from agent_runtime.summary import summary_line
+
+from . import metrics
+from .limits import llm_slot
+from .linkedin_critiquer import best_draft
 from .linkedin_state import LinkedInAgentState
 from .prompts import linkedin_author_prompt, SLOP_CHARACTERISTICS
 from .questionnaire_agent import get_style_description, get_style_examples
@@ -19,6 +25,66 @@ _MAX_LLM_RETRIES = 3
 # Primary model: Llama 3.3 70B for text generation
 text_model = ChatNVIDIA(model="meta/llama-3.3-70b-instruct", temperature=0.7)
 
+COMPACT_REVISIONS = os.getenv("COMPACT_REVISIONS", "1") == "1"
+
+AUTHOR_SYSTEM_PROMPT = "You are an expert LinkedIn content creator specializing in engaging 'slop' content that maximizes engagement while feeling authentic. You MUST always reference the provided image content in your posts, even if it seems unrelated to the topic. Find creative ways to connect images to business lessons. Follow the specific style preferences provided by the user exactly."
+
+
+# Static instruction blocks come first in the author prompts, so every request
+# shares a byte-identical prefix the model server can cache; per-request values follow.
+AUTHOR_INSTRUCTIONS = """Create a LinkedIn post from the image content, user request, industry, trending information and style preferences given at the end.
+
+CRITICAL INSTRUCTION: You MUST mention or reference the image content in your LinkedIn post. Even if the image seems unrelated to the topic, find a creative way to connect it to your message. This is mandatory - do not ignore the image!
+
+Post Structure:
+1. Hook (controversial or relatable opening that somehow connects to the image)
+2. Personal story/anecdote that references what you see in the image
+3. Business lesson/insight (incorporate trending topics naturally + image connection)
+4. Call to action/engagement question
+5. Hashtags (use the number specified by hashtag_level: 1-2=few(3-5), 3=moderate(6-10), 4-5=many(12-20))
+
+EXAMPLES OF IMAGE INTEGRATION:
+- If image shows people/characters: "Saw this image of [describe briefly] and it reminded me of..."
+- If image shows objects/scenes: "Looking at [describe image element], it got me thinking about..."
+- If image is unrelated: "I know this might seem random, but [describe image] actually taught me something about [topic]..."
+
+STYLE REQUIREMENTS:
+- Grammar: Follow the grammar_level setting exactly
+- Emojis: Use the exact number range specified by emoji_level
+- Hashtags: Use the exact number range specified by hashtag_level
+- Ragebait: Match the egotistical/self-absorbed level specified
+- Inspirational: Match the motivational content level specified
+- Informational: Match the educational/data content level specified
+
+IMPORTANT:
+- ALWAYS start by acknowledging what you see in the image
+- Naturally weave in 1-2 trending topics from the list provided
+- Use primarily the trending hashtags provided (they're current and popular)
+- Make it authentic LinkedIn "slop" but customized to the user's style preferences
+- Match the industry context given below
+- The image reference should feel natural, not forced
+"""
+
+REVISION_INSTRUCTIONS = """REVISE the LinkedIn post given at the end based on the expert critique feedback that follows it.
+
+REVISION INSTRUCTIONS:
+1. Address the specific improvements mentioned in the critique
+2. Fix any weaknesses identified in the feedback
+3. Enhance the strengths that were praised
+4. STILL MAINTAIN the image reference requirement
+5. STILL FOLLOW the user's style preferences exactly
+6. Keep the authentic LinkedIn "slop" style
+7. Improve engagement potential, authenticity, and algorithm optimization
+
+CRITICAL:
+- You are IMPROVING the previous draft, not starting over
+- Incorporate the specific suggestions from the critique
+- Make it more engaging while staying authentic
+- Image mention is still MANDATORY
+- Style preferences are still MANDATORY and must not change (grammar, emoji, hashtag, ragebait, inspirational and informational levels below)
+- Aim for higher scores in: engagement, authenticity, optimization
+"""
+
 
 async def linkedin_author_agent(state: LinkedInAgentState, config: RunnableConfig) -> dict[str, Any]:
     """Generate LinkedIn post content with intentional 'slop' characteristics."""
@@ -32,33 +98,12 @@ async def linkedin_author_agent(state: LinkedInAgentState, config: RunnableConfi
     else:
         _LOGGER.info("✍️  Starting LinkedIn content generation...")
     
-    # Format trending topics and hashtags for inclusion
-    trending_info = ""
-    if state.trending_topics:
-        trending_info += f"\nTRENDING TOPICS: {', '.join(state.trending_topics)}"
-    if state.trending_hashtags:
-        trending_info += f"\nTRENDING HASHTAGS: {', '.join(state.trending_hashtags)}"
-    
-    # Get personalized style preferences
-    style_description = get_style_description(state)
-    style_examples = get_style_examples(state)
-    
-    # Prepare context for the author prompt
-    context = {
-        "image_description": state.image_description or "No image provided",
-        "initial_prompt": state.initial_prompt,
-        "industry": state.industry or "general_business",
-        "trending_info": trending_info,
-        "research_results": state.research_results or "No research conducted",
-        "user_responses": str(state.user_responses) if state.user_responses else "No user preferences specified",
-        "slop_characteristics": SLOP_CHARACTERISTICS,
-        "style_description": style_description,
-        "style_examples": style_examples,
-        "style_scores": f"Grammar={state.grammar_level}/5, Emojis={state.emoji_level}/5, Hashtags={state.hashtag_level}/5, Ragebait={state.ragebait_level}/5, Inspirational={state.inspirational_level}/5, Informational={state.informational_level}/5"
-    }
+    context = build_author_context(state)
     
     # Build prompt based on whether this is a revision or initial draft
-    if is_revision:
+    if is_revision and COMPACT_REVISIONS:
+        enhanced_prompt = build_compact_revision_prompt(state, draft_number)
+    elif is_revision:
         enhanced_prompt = build_revision_prompt(context, state, draft_number)
     else:
         enhanced_prompt = build_initial_prompt(context)
@@ -78,15 +123,16 @@ async def linkedin_author_agent(state: LinkedInAgentState, config: RunnableConfi
             try:
                 _LOGGER.info(f"📡 API call attempt {attempt + 1}/{_MAX_LLM_RETRIES}")
                 
-                system_prompt = "You are an expert LinkedIn content creator specializing in engaging 'slop' content that maximizes engagement while feeling authentic. You MUST always reference the provided image content in your posts, even if it seems unrelated to the topic. Find creative ways to connect images to business lessons. Follow the specific style preferences provided by the user exactly."
+                system_prompt = AUTHOR_SYSTEM_PROMPT
                 
                 if is_revision:
                     system_prompt += " You are revising content based on expert feedback. Incorporate the specific improvements while maintaining the authentic LinkedIn 'slop' style and user's style preferences."
                 
-                response = await text_model.ainvoke([
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": formatted_prompt}
-                ], config)
+                async with llm_slot():
+                    response = await text_model.ainvoke([
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": formatted_prompt}
+                    ], config)
                 
                 api_time = time.time() - api_start
                 _LOGGER.info(f"✅ Llama API responded in {api_time:.2f}s")
@@ -96,11 +142,18 @@ async def linkedin_author_agent(state: LinkedInAgentState, config: RunnableConfi
                     total_time = time.time() - start_time
                     _LOGGER.info(f"🎯 Content generation completed in {total_time:.2f}s total (Draft #{draft_number})")
                     
+                    # Prefer the server's token count, fall back to a chars/4 estimate
+                    usage = getattr(response, "usage_metadata", None) or {}
+                    prompt_tokens = usage.get("input_tokens") or estimate_tokens(system_prompt + formatted_prompt)
+                    metrics.observe(f"author.prompt_tokens.draft{draft_number}", prompt_tokens)
+                    _LOGGER.info(f"🧮 Draft #{draft_number} prompt: {prompt_tokens} tokens")
+                    
                     # Add to post drafts
                     updated_drafts = state.post_drafts + [post_content]
                     
                     return {
                         "post_drafts": updated_drafts,
+                        "prompt_tokens": state.prompt_tokens + [prompt_tokens],
                         "messages": [response]
                     }
                     
@@ -138,61 +191,59 @@ What's your biggest tech fail that turned into a win? Share below! 👇
         
         return {
             "post_drafts": state.post_drafts + [fallback_post],
+            # No prompt reached the model; keep one entry per draft
+            "prompt_tokens": state.prompt_tokens + [0],
             "messages": []
         }
 
 
-def build_initial_prompt(context: dict) -> str:
-    """Build the prompt for the initial draft with style preferences."""
-    
-    return f"""
-    Create a LinkedIn post with these elements:
-    
-    MANDATORY REQUIREMENTS:
-    🖼️ IMAGE CONTENT (MUST REFERENCE): {context['image_description']}
-    📝 USER REQUEST: {context['initial_prompt']}
-    🏭 INDUSTRY CONTEXT: {context['industry']}
-    
-    TRENDING INFORMATION TO INCORPORATE:
-    {context['trending_info']}
-    
-    PERSONALIZED STYLE PREFERENCES (FOLLOW EXACTLY):
-    📊 Style Scores: {context['style_scores']}
-    📝 Style Guidelines: {context['style_description']}
-    💡 Style Examples: {context['style_examples']}
-    
-    CRITICAL INSTRUCTION: You MUST mention or reference the image content in your LinkedIn post. Even if the image seems unrelated to the topic, find a creative way to connect it to your message. This is mandatory - do not ignore the image!
+def build_author_context(state: LinkedInAgentState) -> dict[str, str]:
+    """Collect the research, image and style context the author prompts are built from."""
     
-    Post Structure:
-    1. Hook (controversial or relatable opening that somehow connects to the image)
-    2. Personal story/anecdote that references what you see in the image
-    3. Business lesson/insight (incorporate trending topics naturally + image connection)
-    4. Call to action/engagement question
-    5. Hashtags (use the number specified by hashtag_level: 1-2=few(3-5), 3=moderate(6-10), 4-5=many(12-20))
-    
-    EXAMPLES OF IMAGE INTEGRATION:
-    - If image shows people/characters: "Saw this image of [describe briefly] and it reminded me of..."
-    - If image shows objects/scenes: "Looking at [describe image element], it got me thinking about..."
-    - If image is unrelated: "I know this might seem random, but [describe image] actually taught me something about [topic]..."
+    # Format trending topics and hashtags for inclusion
+    trending_info = ""
+    if state.trending_topics:
+        trending_info += f"\nTRENDING TOPICS: {', '.join(state.trending_topics)}"
+    if state.trending_hashtags:
+        trending_info += f"\nTRENDING HASHTAGS: {', '.join(state.trending_hashtags)}"
     
-    STYLE REQUIREMENTS:
-    - Grammar: Follow the grammar_level setting exactly
-    - Emojis: Use the exact number range specified by emoji_level
-    - Hashtags: Use the exact number range specified by hashtag_level
-    - Ragebait: Match the egotistical/self-absorbed level specified
-    - Inspirational: Match the motivational content level specified
-    - Informational: Match the educational/data content level specified
+    # Get personalized style preferences
+    style_description = get_style_description(state)
+    style_examples = get_style_examples(state)
     
-    IMPORTANT:
-    - ALWAYS start by acknowledging what you see in the image
-    - Naturally weave in 1-2 trending topics from the list provided
-    - Use primarily the trending hashtags provided (they're current and popular)
-    - Make it authentic LinkedIn "slop" but customized to the user's style preferences
-    - Match the industry context ({context['industry']})
-    - The image reference should feel natural, not forced
+    return {
+        "image_description": state.image_description or "No image provided",
+        "initial_prompt": state.initial_prompt,
+        "industry": state.industry or "general_business",
+        "trending_info": trending_info,
+        "research_results": state.research_results or "No research conducted",
+        "user_responses": str(state.user_responses) if state.user_responses else "No user preferences specified",
+        "slop_characteristics": SLOP_CHARACTERISTICS,
+        "style_description": style_description,
+        "style_examples": style_examples,
+        "style_scores": f"Grammar={state.grammar_level}/5, Emojis={state.emoji_level}/5, Hashtags={state.hashtag_level}/5, Ragebait={state.ragebait_level}/5, Inspirational={state.inspirational_level}/5, Informational={state.informational_level}/5"
+    }
+
+
+def build_initial_prompt(context: dict) -> str:
+    """Build the prompt for the initial draft with style preferences."""
     
-    Write the complete LinkedIn post as your response. Remember: IMAGE MENTION IS MANDATORY and STYLE PREFERENCES MUST BE FOLLOWED EXACTLY!
-    """
+    return f"""{AUTHOR_INSTRUCTIONS}
+MANDATORY REQUIREMENTS:
+🖼️ IMAGE CONTENT (MUST REFERENCE): {context['image_description']}
+📝 USER REQUEST: {context['initial_prompt']}
+🏭 INDUSTRY CONTEXT: {context['industry']}
+
+TRENDING INFORMATION TO INCORPORATE:
+{context['trending_info']}
+
+PERSONALIZED STYLE PREFERENCES (FOLLOW EXACTLY):
+📊 Style Scores: {context['style_scores']}
+📝 Style Guidelines: {context['style_description']}
+💡 Style Examples: {context['style_examples']}
+
+Write the complete LinkedIn post as your response. Remember: IMAGE MENTION IS MANDATORY and STYLE PREFERENCES MUST BE FOLLOWED EXACTLY!
+"""
 
 
 def build_revision_prompt(context: dict, state: LinkedInAgentState, draft_number: int) -> str:
@@ -201,55 +252,102 @@ def build_revision_prompt(context: dict, state: LinkedInAgentState, draft_number
     previous_draft = state.post_drafts[-1] if state.post_drafts else "No previous draft"
     latest_critique = state.critique_feedback[-1] if state.critique_feedback else "No feedback available"
     
-    return f"""
-    REVISE this LinkedIn post based on expert critique feedback:
-    
-    PREVIOUS DRAFT #{len(state.post_drafts)}:
-    {previous_draft}
-    
-    EXPERT CRITIQUE FEEDBACK:
-    {latest_critique}
-    
-    CONTEXT (MAINTAIN):
-    🖼️ IMAGE CONTENT (MUST STILL REFERENCE): {context['image_description']}
-    📝 USER REQUEST: {context['initial_prompt']}
-    🏭 INDUSTRY CONTEXT: {context['industry']}
-    
-    TRENDING INFORMATION TO INCORPORATE:
-    {context['trending_info']}
-    
-    PERSONALIZED STYLE PREFERENCES (FOLLOW EXACTLY):
-    📊 Style Scores: {context['style_scores']}
-    📝 Style Guidelines: {context['style_description']}
-    💡 Style Examples: {context['style_examples']}
+    return f"""{REVISION_INSTRUCTIONS}
+STYLE LEVELS (DO NOT CHANGE): {context['style_scores']}
+📝 Style Guidelines: {context['style_description']}
+💡 Style Examples: {context['style_examples']}
+
+CONTEXT (MAINTAIN):
+🖼️ IMAGE CONTENT (MUST STILL REFERENCE): {context['image_description']}
+📝 USER REQUEST: {context['initial_prompt']}
+🏭 INDUSTRY CONTEXT: {context['industry']}
+
+TRENDING INFORMATION TO INCORPORATE:
+{context['trending_info']}
+
+PREVIOUS DRAFT #{len(state.post_drafts)}:
+{previous_draft}
+
+EXPERT CRITIQUE FEEDBACK:
+{latest_critique}
+
+Write the IMPROVED LinkedIn post as your response (Draft #{draft_number}):
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)."""
+    return max(1, len(text) // 4)
+
+
+def required_changes(state: LinkedInAgentState) -> list[str]:
+    """The changes the latest feedback asks for, as short imperative items."""
+    
+    # Style violations are only set while the pre-critic's rejection is the newest feedback
+    if state.style_violations:
+        return list(state.style_violations)
+    if state.critiques:
+        record = state.critiques[-1]
+        changes = list(record.improvements)
+        changes += [f"Fix: {weakness}" for weakness in record.weaknesses if weakness not in changes]
+        return changes or ["Make the hook and the closing question more engaging"]
+    return ["Make the hook and the closing question more engaging"]
+
+
+def referenced_research(draft: str, state: LinkedInAgentState) -> tuple[list[str], list[str]]:
+    """Trending topics and hashtags the draft already uses."""
+    lowered = draft.lower()
+    topics = [topic for topic in state.trending_topics if topic.lower() in lowered]
+    hashtags = [tag for tag in state.trending_hashtags if tag.lower() in lowered]
+    return topics, hashtags
+
+
+def build_compact_revision_prompt(state: LinkedInAgentState, draft_number: int) -> str:
+    """Revision prompt carrying only the latest draft, the required changes and the research it uses.
     
-    REVISION INSTRUCTIONS:
-    1. Address the specific improvements mentioned in the critique
-    2. Fix any weaknesses identified in the feedback
-    3. Enhance the strengths that were praised
-    4. STILL MAINTAIN the image reference requirement
-    5. STILL FOLLOW the user's style preferences exactly
-    6. Keep the authentic LinkedIn "slop" style
-    7. Improve engagement potential, authenticity, and algorithm optimization
+    Its size depends on the draft and the feedback, not on how many rounds
+    came before, so prompts stay flat across iterations.
+    """
     
-    STYLE REQUIREMENTS (DO NOT CHANGE):
-    - Grammar: Maintain grammar_level={state.grammar_level}/5
-    - Emojis: Maintain emoji_level={state.emoji_level}/5
-    - Hashtags: Maintain hashtag_level={state.hashtag_level}/5
-    - Ragebait: Maintain ragebait_level={state.ragebait_level}/5
-    - Inspirational: Maintain inspirational_level={state.inspirational_level}/5
-    - Informational: Maintain informational_level={state.informational_level}/5
+    previous_draft = state.post_drafts[-1] if state.post_drafts else ""
+    changes = "\n".join(f"{number}. {change}" for number, change in enumerate(required_changes(state), 1))
+    topics, hashtags = referenced_research(previous_draft, state)
     
-    CRITICAL: 
-    - You are IMPROVING the previous draft, not starting over
-    - Incorporate the specific suggestions from the critique
-    - Make it more engaging while staying authentic
-    - Image mention is still MANDATORY
-    - Style preferences are still MANDATORY and must not change
-    - Aim for higher scores in: engagement, authenticity, optimization
+    research_lines = []
+    if topics:
+        research_lines.append(f"Topics in use: {', '.join(topics)}")
+    if hashtags:
+        research_lines.append(f"Trending hashtags in use: {', '.join(hashtags)}")
+    research = "\n".join(research_lines) or "None"
+    image = (state.image_description or "No image provided")[:300]
     
-    Write the IMPROVED LinkedIn post as your response (Draft #{draft_number}):
-    """
+    return f"""REVISE this LinkedIn post. Keep what works; change only what is listed under REQUIRED CHANGES. Write only the revised post.
+
+DRAFT #{draft_number - 1}:
+{previous_draft}
+
+REQUIRED CHANGES:
+{changes}
+
+KEEP:
+- Image reference: {image}
+- Request: {state.initial_prompt}
+- Industry: {state.industry or 'general_business'}
+- Research already used: {research}
+- Style: Grammar={state.grammar_level}/5, Emojis={state.emoji_level}/5, Hashtags={state.hashtag_level}/5, Ragebait={state.ragebait_level}/5, Inspirational={state.inspirational_level}/5, Informational={state.informational_level}/5 ({get_style_description(state)})"""
+
+
+
+@summary_line
+def prompt_tokens_summary() -> str | None:
+    """Median author prompt size for each draft number, to show revisions staying compact."""
+    series = metrics.snapshot("author.prompt_tokens.draft")["series"]
+    if not series:
+        return None
+    by_draft = sorted(series.items(), key=lambda item: int(item[0].rsplit("draft", 1)[1]))
+    return "Author prompt tokens (p50) by draft: " + ", ".join(
+        f"#{name.rsplit('draft', 1)[1]} {stats['p50']:.0f}" for name, stats in by_draft
+    )
 
 
 async def simple_markdown_formatter(state: LinkedInAgentState, config: RunnableConfig) -> dict[str, Any]:
@@ -261,8 +359,8 @@ async def simple_markdown_formatter(state: LinkedInAgentState, config: RunnableC
     if not state.post_drafts:
         final_post = "No content generated."
     else:
-        # Use the latest draft
-        latest_draft = state.post_drafts[-1]
+        # Use the best-scoring draft, which is the latest one unless a revision made it worse
+        latest_draft, final_critique = best_draft(state)
         total_drafts = len(state.post_drafts)
         
         # Include metadata about the research and refinement process
@@ -294,15 +392,10 @@ async def simple_markdown_formatter(state: LinkedInAgentState, config: RunnableC
         if total_drafts > 1:
             refinement_summary += f"**Refinement Process**: {total_drafts} drafts created through critique feedback\n"
             
-            # Extract final scores if available
-            if state.critique_feedback:
-                latest_critique = state.critique_feedback[-1]
-                if "Overall Score:" in latest_critique:
-                    import re
-                    score_match = re.search(r"Overall Score: (\d+\.?\d*)/10", latest_critique)
-                    if score_match:
-                        final_score = score_match.group(1)
-                        refinement_summary += f"**Final Quality Score**: {final_score}/10\n"
+            if final_critique and not final_critique.fallback:
+                refinement_summary += f"**Final Quality Score**: {final_critique.overall_score:.1f}/10\n"
+            if state.prompt_tokens:
+                refinement_summary += f"**Prompt Tokens per Draft**: {' → '.join(str(tokens) for tokens in state.prompt_tokens)}\n"
         else:
             refinement_summary += f"**Refinement Process**: Single draft (no critique loop)\n"
         
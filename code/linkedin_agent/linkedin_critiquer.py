@@ -2,23 +2,124 @@
 LinkedIn Critiquer Agent for evaluating and improving content quality.
 """
 
-import json
 import logging
-import re
+import os
 import time
 from typing import Any, Dict
 
 from langchain_core.runnables import RunnableConfig
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
 
-from .linkedin_state import LinkedInAgentState
+from agent_runtime.json_repair import extract_json
+from agent_runtime.ledger import budget_exhausted
+from agent_runtime.summary import summary_line
+
+from . import metrics
+from .limits import llm_slot
+from .linkedin_state import CritiqueRecord, LinkedInAgentState
 
 _LOGGER = logging.getLogger(__name__)
 _MAX_LLM_RETRIES = 3
 
+MAX_ITERATIONS = 5
+APPROVAL_SCORE = float(os.getenv("REFINEMENT_APPROVAL_SCORE", "7.5"))
+# Stop once a revision improves the overall score by less than this
+MIN_IMPROVEMENT = float(os.getenv("REFINEMENT_MIN_IMPROVEMENT", "0.3"))
+
 # Use Llama 3.3 70B for content critique
 text_model = ChatNVIDIA(model="meta/llama-3.3-70b-instruct", temperature=0.3)
 
+CRITIQUER_SYSTEM_PROMPT = "You are an expert LinkedIn content strategist who evaluates posts for maximum engagement. You understand the LinkedIn algorithm and what makes content go viral. Always respond with valid JSON and be constructively critical to help improve content quality."
+
+EVALUATION_FRAMEWORK = """EVALUATION FRAMEWORK:
+Rate each category from 1-10 and provide specific feedback:
+
+📊 ENGAGEMENT POTENTIAL (1-10):
+- Hook strength: Does the opening grab attention within 2 seconds?
+- Curiosity gap: Does it make people want to read more?
+- Emotional resonance: Will people feel something (inspired, angry, nostalgic)?
+- Comment-bait effectiveness: Does it naturally encourage responses?
+- Share-worthiness: Would people share this with their network?
+
+🎭 SLOP AUTHENTICITY (1-10):
+- Humble bragging level: Right balance of achievement + modesty?
+- Vulnerability authenticity: Genuine vs performative sharing?
+- Buzzword usage: Professional enough but not too corporate?
+- Emoji/formatting: Authentic LinkedIn "sloppiness"?
+- Relatability factor: Can average person connect with this?
+
+🎯 ALGORITHM OPTIMIZATION (1-10):
+- Post length: Optimal for LinkedIn algorithm (150-300 words)?
+- Question placement: Strategic questions to drive comments?
+- Hashtag strategy: Right mix and quantity (8-15 hashtags)?
+- Time-sensitive relevance: Current trends incorporated?
+- Image integration: Does it reference the visual content effectively?
+
+📈 IMPROVEMENT SUGGESTIONS:
+Provide 3-5 specific, actionable improvements for the next draft:
+"""
+
+CRITIQUE_INSTRUCTIONS = f"""Evaluate the LinkedIn post given at the end for maximum engagement potential.
+
+{EVALUATION_FRAMEWORK}
+RESPONSE FORMAT (JSON):
+{{
+    "scores": {{
+        "engagement_potential": X,
+        "slop_authenticity": X,
+        "algorithm_optimization": X
+    }},
+    "overall_score": X.X,
+    "strengths": ["strength1", "strength2", "strength3"],
+    "weaknesses": ["weakness1", "weakness2", "weakness3"],
+    "improvements": [
+        "Specific improvement 1",
+        "Specific improvement 2",
+        "Specific improvement 3"
+    ],
+    "verdict": "CONTINUE" or "APPROVED",
+    "reasoning": "Brief explanation of verdict"
+}}
+
+Be constructively critical - we want to create highly engaging content!
+"""
+
+# The reply format above, for extract_json to repair replies against. A verdict
+# lost to a truncated reply reads as CONTINUE.
+CRITIQUE_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "scores": {
+            "type": "object",
+            "properties": {
+                name: {"type": "number"}
+                for name in ("engagement_potential", "slop_authenticity", "algorithm_optimization")
+            },
+        },
+        "overall_score": {"type": "number"},
+        "strengths": {"type": "array", "items": {"type": "string"}},
+        "weaknesses": {"type": "array", "items": {"type": "string"}},
+        "improvements": {"type": "array", "items": {"type": "string"}},
+        "verdict": {"type": "string", "default": "CONTINUE"},
+        "reasoning": {"type": "string"},
+    },
+    "required": ["scores", "verdict"],
+}
+
+BATCH_CRITIQUE_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "critiques": {
+            "type": "array",
+            "items": {
+                **CRITIQUE_SCHEMA,
+                "properties": {"draft": {"type": "integer"}, **CRITIQUE_SCHEMA["properties"]},
+            },
+        },
+    },
+    "required": ["critiques"],
+}
+
 
 async def linkedin_critiquer_agent(state: LinkedInAgentState, config: RunnableConfig) -> dict[str, Any]:
     """Critique LinkedIn post and provide specific improvement suggestions."""
@@ -34,76 +135,24 @@ async def linkedin_critiquer_agent(state: LinkedInAgentState, config: RunnableCo
     latest_draft = state.post_drafts[-1]
     draft_number = len(state.post_drafts)
     
-    critique_prompt = f"""
-    Evaluate this LinkedIn post for maximum engagement potential:
-    
-    POST TO CRITIQUE (Draft #{draft_number}):
-    {latest_draft}
-    
-    CONTEXT:
-    - Industry: {state.industry or 'general_business'}
-    - Image content: {state.image_description or 'No image'}
-    - User intent: {state.initial_prompt}
-    - Available trending topics: {', '.join(state.trending_topics[:3]) if state.trending_topics else 'None'}
-    
-    EVALUATION FRAMEWORK:
-    Rate each category from 1-10 and provide specific feedback:
-    
-    📊 ENGAGEMENT POTENTIAL (1-10):
-    - Hook strength: Does the opening grab attention within 2 seconds?
-    - Curiosity gap: Does it make people want to read more?
-    - Emotional resonance: Will people feel something (inspired, angry, nostalgic)?
-    - Comment-bait effectiveness: Does it naturally encourage responses?
-    - Share-worthiness: Would people share this with their network?
-    
-    🎭 SLOP AUTHENTICITY (1-10):
-    - Humble bragging level: Right balance of achievement + modesty?
-    - Vulnerability authenticity: Genuine vs performative sharing?
-    - Buzzword usage: Professional enough but not too corporate?
-    - Emoji/formatting: Authentic LinkedIn "sloppiness"?
-    - Relatability factor: Can average person connect with this?
-    
-    🎯 ALGORITHM OPTIMIZATION (1-10):
-    - Post length: Optimal for LinkedIn algorithm (150-300 words)?
-    - Question placement: Strategic questions to drive comments?
-    - Hashtag strategy: Right mix and quantity (8-15 hashtags)?
-    - Time-sensitive relevance: Current trends incorporated?
-    - Image integration: Does it reference the visual content effectively?
-    
-    📈 IMPROVEMENT SUGGESTIONS:
-    Provide 3-5 specific, actionable improvements for the next draft:
-    
-    RESPONSE FORMAT (JSON):
-    {{
-        "scores": {{
-            "engagement_potential": X,
-            "slop_authenticity": X,
-            "algorithm_optimization": X
-        }},
-        "overall_score": X.X,
-        "strengths": ["strength1", "strength2", "strength3"],
-        "weaknesses": ["weakness1", "weakness2", "weakness3"],
-        "improvements": [
-            "Specific improvement 1",
-            "Specific improvement 2", 
-            "Specific improvement 3"
-        ],
-        "verdict": "CONTINUE" or "APPROVED",
-        "reasoning": "Brief explanation of verdict"
-    }}
-    
-    Be constructively critical - we want to create highly engaging content!
-    """
+    # Static instructions first so every critique request shares a cacheable prefix
+    critique_prompt = f"""{CRITIQUE_INSTRUCTIONS}
+{build_critique_context(state)}
+
+POST TO CRITIQUE (Draft #{draft_number}):
+{latest_draft}
+"""
     
     try:
         _LOGGER.info(f"🤖 Calling Llama 3.3 70B for critique of draft #{draft_number}...")
         
         for attempt in range(_MAX_LLM_RETRIES):
             try:
-                response = await text_model.ainvoke([
-                    {"role": "system", "content": "You are an expert LinkedIn content strategist who evaluates posts for maximum engagement. You understand the LinkedIn algorithm and what makes content go viral. Always respond with valid JSON and be constructively critical to help improve content quality."},
-                    {"role": "user", "content": critique_prompt}
-                ], config)
+                async with llm_slot():
+                    response = await text_model.ainvoke([
+                        {"role": "system", "content": CRITIQUER_SYSTEM_PROMPT},
+                        {"role": "user", "content": critique_prompt}
+                    ], config)
                 
                 if response and response.content:
                     critique_text = str(response.content).strip()
@@ -124,6 +173,7 @@ async def linkedin_critiquer_agent(state: LinkedInAgentState, config: RunnableCo
                         
                         return {
                             "critique_feedback": state.critique_feedback + [formatted_critique],
+                            "critiques": state.critiques + [critique_record(critique_data, draft_number)],
                             "messages": [response]
                         }
                     else:
@@ -159,39 +209,113 @@ VERDICT: APPROVED (Fallback)
         
         return {
             "critique_feedback": state.critique_feedback + [fallback_critique],
+            "critiques": state.critiques + [fallback_record(draft_number)],
             "messages": []
         }
 
 
+def build_critique_context(state: LinkedInAgentState) -> str:
+    """Describe what the post is for, so the critic can judge fit as well as quality."""
+    
+    return f"""CONTEXT:
+- Industry: {state.industry or 'general_business'}
+- Image content: {state.image_description or 'No image'}
+- User intent: {state.initial_prompt}
+- Available trending topics: {', '.join(state.trending_topics[:3]) if state.trending_topics else 'None'}"""
+
+
+def _validated_critique(critique_data: Any) -> Dict[str, Any] | None:
+    """A critique with scores and a verdict, its overall score filled in; None otherwise."""
+    
+    if not isinstance(critique_data, dict) or "verdict" not in critique_data:
+        return None
+    scores = critique_data.get("scores")
+    if not isinstance(scores, dict) or not scores:
+        return None
+    if "overall_score" not in critique_data:
+        # Calculate overall score if not provided
+        critique_data["overall_score"] = sum(_score(value) for value in scores.values()) / len(scores)
+    return critique_data
+
+
 def parse_critique_response(critique_text: str) -> Dict[str, Any] | None:
-    """Parse the JSON critique response from the LLM."""
+    """Parse the JSON critique response from the LLM, repairing it where needed."""
     
+    return _validated_critique(extract_json(critique_text, CRITIQUE_SCHEMA, site="critique"))
+
+
+def parse_batch_critique_response(critique_text: str, draft_count: int) -> list[Dict[str, Any] | None]:
+    """Parse a batched critique into one critique per draft, in draft order.
+    
+    Expects {"critiques": [{"draft": n, ...single critique fields...}, ...]};
+    drafts the model skipped or garbled come back as None.
+    """
+    
+    critiques: list[Dict[str, Any] | None] = [None] * draft_count
+    parsed = extract_json(critique_text, BATCH_CRITIQUE_SCHEMA, site="batch_critique")
+    if parsed is None:
+        _LOGGER.warning("⚠️  No usable JSON in batch critique")
+        return critiques
+    
+    for position, entry in enumerate(parsed["critiques"] or []):
+        if not isinstance(entry, dict):
+            continue
+        try:
+            index = int(entry.get("draft", position + 1)) - 1
+        except (TypeError, ValueError):
+            index = position
+        if not 0 <= index < draft_count:
+            continue
+        critique = _validated_critique(entry)
+        if critique:
+            critiques[index] = critique
+    
+    return critiques
+
+
+def _score(value: Any) -> float:
     try:
-        # Clean up common JSON formatting issues
-        if critique_text.startswith("```json"):
-            critique_text = critique_text.replace("```json", "").replace("```", "").strip()
-        elif critique_text.startswith("```"):
-            critique_text = critique_text.replace("```", "").strip()
-        
-        # Try to extract JSON from the response
-        json_match = re.search(r'\{.*\}', critique_text, re.DOTALL)
-        if json_match:
-            json_str = json_match.group()
-            critique_data = json.loads(json_str)
-            
-            # Validate required fields
-            if "scores" in critique_data and "verdict" in critique_data:
-                # Calculate overall score if not provided
-                if "overall_score" not in critique_data:
-                    scores = critique_data["scores"]
-                    critique_data["overall_score"] = sum(scores.values()) / len(scores)
-                
-                return critique_data
-                
-    except (json.JSONDecodeError, KeyError, TypeError) as e:
-        _LOGGER.warning(f"⚠️  JSON parsing error: {e}")
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _strings(value: Any) -> list[str]:
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    return [str(value)] if value else []
+
+
+def critique_record(critique_data: Dict[str, Any], draft_number: int) -> CritiqueRecord:
+    """Turn a parsed critique into a typed record, tolerating loosely typed fields."""
     
-    return None
+    scores = critique_data.get("scores") or {}
+    return CritiqueRecord(
+        draft_number=draft_number,
+        engagement_potential=_score(scores.get("engagement_potential")),
+        slop_authenticity=_score(scores.get("slop_authenticity")),
+        algorithm_optimization=_score(scores.get("algorithm_optimization")),
+        overall_score=_score(critique_data.get("overall_score")),
+        verdict=str(critique_data.get("verdict") or "CONTINUE"),
+        strengths=_strings(critique_data.get("strengths")),
+        weaknesses=_strings(critique_data.get("weaknesses")),
+        improvements=_strings(critique_data.get("improvements")),
+        reasoning=str(critique_data.get("reasoning") or ""),
+    )
+
+
+def fallback_record(draft_number: int) -> CritiqueRecord:
+    """Estimated scores used when the critique call fails, approving the draft."""
+    return CritiqueRecord(
+        draft_number=draft_number,
+        engagement_potential=7.0,
+        slop_authenticity=7.0,
+        algorithm_optimization=7.0,
+        overall_score=7.0,
+        verdict="APPROVED",
+        reasoning="Critique system error",
+        fallback=True,
+    )
 
 
 def format_critique_feedback(critique_data: Dict[str, Any], draft_number: int) -> str:
@@ -233,41 +357,90 @@ def format_list(items: list) -> str:
     return "\n".join(f"- {item}" for item in items)
 
 
-def should_continue_refining(state: LinkedInAgentState) -> str:
-    """Determine if the post needs more refinement based on critique feedback."""
+def should_continue_refining(state: LinkedInAgentState, config: RunnableConfig | None = None) -> str:
+    """Determine if the post needs more refinement based on the critique records."""
+    
+    decision, reason = refinement_decision(state)
+    if decision == "continue" and budget_exhausted(config, "refinement"):
+        decision, reason = "finish", "budget"
+    metrics.incr(f"refinement.stop.{reason}" if decision == "finish" else "refinement.continued")
+    if decision == "finish":
+        metrics.observe("refinement.rounds", len(state.post_drafts))
+        metrics.incr("refinement.rounds_saved", MAX_ITERATIONS - len(state.post_drafts))
+    return decision
+
+
+def refinement_decision(state: LinkedInAgentState) -> tuple[str, str]:
+    """Return ("continue" | "finish", reason) for the latest critique."""
     
     # Safety: Max iterations to prevent infinite loops
-    MAX_ITERATIONS = 5
     if len(state.post_drafts) >= MAX_ITERATIONS:
         _LOGGER.info(f"🛑 Max iterations ({MAX_ITERATIONS}) reached - moving to formatter")
-        return "finish"
+        return "finish", "max_iterations"
     
-    # If no critique feedback, continue (shouldn't happen but safety check)
-    if not state.critique_feedback:
-        _LOGGER.info("⚠️  No critique feedback - continuing to avoid infinite loop")
-        return "continue"
+    # If no critique, continue (shouldn't happen but safety check)
+    if not state.critiques:
+        _LOGGER.info("⚠️  No critique record - continuing")
+        return "continue", "no_critique"
     
-    # Parse the latest critique to get scores and verdict
-    latest_critique = state.critique_feedback[-1]
+    latest = state.critiques[-1]
     
-    # Look for verdict in the critique
-    if "VERDICT: APPROVED" in latest_critique:
+    if latest.approved:
         _LOGGER.info("✅ Critique approved the content - moving to formatter")
-        return "finish"
+        return "finish", "approved"
+    
+    if latest.overall_score >= APPROVAL_SCORE:
+        _LOGGER.info(f"🎯 High overall score ({latest.overall_score}/10) - moving to formatter")
+        return "finish", "score"
+    
+    if len(state.critiques) >= 2:
+        improvement = latest.overall_score - state.critiques[-2].overall_score
+        if improvement < MIN_IMPROVEMENT:
+            _LOGGER.info(
+                f"📉 Score plateaued ({improvement:+.1f} < {MIN_IMPROVEMENT}) at {latest.overall_score}/10 - moving to formatter"
+            )
+            return "finish", "plateau"
+    
+    _LOGGER.info(f"📈 Score needs improvement ({latest.overall_score}/10) - continuing refinement")
+    return "continue", "improving"
+
+
+def best_draft(state: LinkedInAgentState) -> tuple[str | None, CritiqueRecord | None]:
+    """The highest-scoring critiqued draft (latest on ties), or the latest draft if none were critiqued.
     
-    # Look for high scores (7+ on all categories means good enough)
-    score_pattern = r"Overall Score: (\d+\.?\d*)/10"
-    score_match = re.search(score_pattern, latest_critique)
+    A revision that scored worse than its predecessor is what triggers a plateau
+    stop, so the earlier draft is the one worth keeping.
+    """
+    if not state.post_drafts:
+        return None, None
     
-    if score_match:
-        overall_score = float(score_match.group(1))
-        if overall_score >= 7.5:
-            _LOGGER.info(f"🎯 High overall score ({overall_score}/10) - moving to formatter")
-            return "finish"
-        else:
-            _LOGGER.info(f"📈 Score needs improvement ({overall_score}/10) - continuing refinement")
-            return "continue"
+    critiqued = [record for record in state.critiques if 0 < record.draft_number <= len(state.post_drafts)]
+    latest_draft = len(state.post_drafts)
+    if not critiqued or latest_draft not in {record.draft_number for record in critiqued}:
+        # The latest draft has not been critiqued (e.g. a best-of-N revision), so trust the revision
+        return state.post_drafts[-1], critiqued[-1] if critiqued else None
     
-    # Default: continue refining if we can't determine quality
-    _LOGGER.info("🔄 Continuing refinement - score unclear")
-    return "continue" 
\ No newline at end of file
+    best = max(critiqued, key=lambda record: (record.overall_score, record.draft_number))
+    return state.post_drafts[best.draft_number - 1], best
+
+
+def refinement_stats() -> dict[str, float]:
+    """Why refinement loops stopped, and how many of the MAX_ITERATIONS rounds were skipped."""
+    counters = metrics.snapshot("refinement.")["counters"]
+    rounds = metrics.snapshot("refinement.rounds")["series"].get("refinement.rounds", {})
+    return {
+        **{name.removeprefix("refinement."): value for name, value in counters.items()},
+        "rounds_p50": rounds.get("p50", 0.0),
+    }
+
+
+@summary_line
+def refinement_summary() -> str | None:
+    refinement = refinement_stats()
+    stops = {name.removeprefix("stop."): int(value) for name, value in refinement.items() if name.startswith("stop.")}
+    if not stops:
+        return None
+    return (
+        f"Refinement stops: {', '.join(f'{reason}={count}' for reason, count in sorted(stops.items()))}; "
+        f"{refinement.get('rounds_saved', 0):.0f} of {sum(stops.values()) * MAX_ITERATIONS} rounds skipped"
+    )
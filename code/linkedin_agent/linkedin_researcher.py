@@ -2,7 +2,7 @@
 LinkedIn Research Agent for trending topics and hashtags.
 """
 
-import json
+import asyncio
 import logging
 import time
 from typing import Any
@@ -10,8 +10,12 @@ from typing import Any
 from langchain_core.runnables import RunnableConfig
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
 
+from agent_runtime.json_repair import extract_json
+
+from . import hashtags, research_cache
+from .limits import llm_slot
 from .linkedin_state import LinkedInAgentState
-from .tools import search_linkedin_content
+from .tools import fetch_linkedin_search_results, format_search_results
 
 _LOGGER = logging.getLogger(__name__)
 _MAX_LLM_RETRIES = 3
@@ -19,6 +23,29 @@ _MAX_LLM_RETRIES = 3
 # Use Llama 3.3 70B for processing research results
 text_model = ChatNVIDIA(model="meta/llama-3.3-70b-instruct", temperature=0.3)
 
+# Static instructions first so every processing request shares a cacheable prefix
+RESEARCH_PROCESSING_INSTRUCTIONS = """Analyze the LinkedIn research results given at the end for the industry named there and extract:
+
+Extract and return ONLY:
+TRENDING TOPICS: 5-8 current trending topics/themes in that industry
+
+Focus on:
+- Recent trends (2024-2025)
+- High engagement topics
+- Industry-specific themes
+
+Format your response as JSON:
+{
+    "topics": ["topic1", "topic2", "topic3", ...]
+}
+"""
+
+TOPICS_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {"topics": {"type": "array", "items": {"type": "string"}}},
+    "required": ["topics"],
+}
+
 
 async def linkedin_research_agent(state: LinkedInAgentState, config: RunnableConfig) -> dict[str, Any]:
     """Research trending topics and hashtags for the determined industry."""
@@ -28,35 +55,19 @@ async def linkedin_research_agent(state: LinkedInAgentState, config: RunnableCon
     _LOGGER.info(f"🔍 Starting LinkedIn research for '{industry}' industry...")
     
     try:
-        # Create targeted search queries
-        search_queries = [
-            f"{industry} LinkedIn trending topics 2025",
-            f"popular {industry} hashtags LinkedIn",
-            f"viral {industry} content LinkedIn"
-        ]
-        
-        _LOGGER.info(f"🌐 Searching with queries: {search_queries}")
-        
-        # Search using existing Tavily integration - fix the tool call
-        search_results = await search_linkedin_content.ainvoke({
-            "queries": search_queries,
-            "content_type": "trends"
-        })
-        
-        search_time = time.time() - start_time
-        _LOGGER.info(f"✅ Search completed in {search_time:.2f}s")
+        if research_cache.RESEARCH_CACHE_ENABLED:
+            research = await research_cache.get_cache().get(industry, fetch_industry_research, config)
+        else:
+            research = await fetch_industry_research(industry, config)
         
-        # Process the search results to extract topics and hashtags
-        if search_results:
-            processed_results = await process_search_results(search_results, industry, config)
-            
+        if research:
             total_time = time.time() - start_time
             _LOGGER.info(f"🎯 Research completed in {total_time:.2f}s total")
             
             return {
-                "trending_topics": processed_results.get("topics", []),
-                "trending_hashtags": processed_results.get("hashtags", []),
-                "research_results": search_results,
+                "trending_topics": research["trending_topics"],
+                "trending_hashtags": research["trending_hashtags"],
+                "research_results": research["research_results"],
                 "messages": []
             }
         else:
@@ -86,73 +97,93 @@ async def linkedin_research_agent(state: LinkedInAgentState, config: RunnableCon
         }
 
 
-async def process_search_results(search_results: str, industry: str, config: RunnableConfig) -> dict[str, list]:
-    """Extract trending topics and hashtags from search results."""
+async def fetch_industry_research(industry: str, config: RunnableConfig | None) -> dict[str, Any] | None:
+    """Search for an industry's LinkedIn trends and extract topics and hashtags.
     
-    _LOGGER.info("⚙️  Processing search results...")
+    Returns None when the search produced nothing. The result is flagged as a
+    fallback when extraction failed, so it is used but never cached.
+    """
+    
+    start_time = time.time()
+    
+    # Create targeted search queries
+    search_queries = [
+        f"{industry} LinkedIn trending topics 2025",
+        f"popular {industry} hashtags LinkedIn",
+        f"viral {industry} content LinkedIn"
+    ]
+    
+    _LOGGER.info(f"🌐 Searching with queries: {search_queries}")
+    
+    # Search using existing Tavily integration
+    search_docs = await fetch_linkedin_search_results(search_queries, "trends")
+    search_results = format_search_results(search_docs)
     
-    processing_prompt = f"""
-    Analyze these LinkedIn research results for the {industry} industry and extract:
+    search_time = time.time() - start_time
+    _LOGGER.info(f"✅ Search completed in {search_time:.2f}s")
     
-    SEARCH RESULTS:
-    {search_results}
+    if not any(doc.get("results") for doc in search_docs):
+        return None
     
-    Extract and return ONLY:
-    1. TRENDING TOPICS: 5-8 current trending topics/themes in {industry}
-    2. TRENDING HASHTAGS: 8-12 popular hashtags (include the # symbol)
+    # Mine hashtags locally into the industry's rolling frequency table - no LLM needed.
+    # Sources served from the source index were already counted when they were fetched.
+    results = [result for doc in search_docs if not doc.get("source_index") for result in doc.get("results", [])]
+    await asyncio.to_thread(hashtags.get_index().observe, industry, results)
+    trending_hashtags = hashtags.rank_hashtags(industry, 12, get_fallback_trends(industry)["hashtags"])
+    _LOGGER.info(f"#️⃣  Ranked hashtags: {', '.join(trending_hashtags)}")
     
-    Focus on:
-    - Recent trends (2024-2025)
-    - High engagement topics
-    - Industry-specific themes
-    - Professional but engaging hashtags
+    # Process the search results to extract topics
+    processed_results = await process_search_results(search_results, industry, config, trending_hashtags)
+    
+    return {
+        "trending_topics": processed_results.get("topics", []),
+        "trending_hashtags": processed_results.get("hashtags", []),
+        "research_results": search_results,
+        "fallback": processed_results.get("fallback", False)
+    }
+
+
+async def process_search_results(
+    search_results: str, industry: str, config: RunnableConfig | None, trending_hashtags: list[str]
+) -> dict[str, Any]:
+    """Extract trending topics from search results.
     
-    Format your response as JSON:
-    {{
-        "topics": ["topic1", "topic2", "topic3", ...],
-        "hashtags": ["#hashtag1", "#hashtag2", "#hashtag3", ...]
-    }}
+    Hashtags are mined and ranked locally (see hashtags.py), so the model is
+    only asked for topics and the ranked hashtags are passed through.
     """
     
+    _LOGGER.info("⚙️  Processing search results...")
+    
+    processing_prompt = f"""{RESEARCH_PROCESSING_INSTRUCTIONS}
+INDUSTRY: {industry}
+
+SEARCH RESULTS:
+{search_results}
+"""
+    
     try:
-        response = await text_model.ainvoke([
-            {"role": "system", "content": "You are an expert at analyzing LinkedIn trends. Always respond with valid JSON only."},
-            {"role": "user", "content": processing_prompt}
-        ], config)
+        async with llm_slot():
+            response = await text_model.ainvoke([
+                {"role": "system", "content": "You are an expert at analyzing LinkedIn trends. Always respond with valid JSON only."},
+                {"role": "user", "content": processing_prompt}
+            ], config)
         
         if response and response.content:
-            # Try to parse JSON response
-            content = str(response.content).strip()
-            
-            # Clean up common JSON formatting issues
-            if content.startswith("```json"):
-                content = content.replace("```json", "").replace("```", "").strip()
+            # Fences, prose and truncated lists are repaired rather than dropped
+            parsed = extract_json(str(response.content), TOPICS_SCHEMA, site="research_topics")
             
-            try:
-                parsed = json.loads(content)
-                
-                # Validate structure
-                if "topics" in parsed and "hashtags" in parsed:
-                    # Ensure hashtags have # symbol
-                    hashtags = []
-                    for tag in parsed["hashtags"]:
-                        if not tag.startswith("#"):
-                            tag = "#" + tag
-                        hashtags.append(tag)
-                    
-                    return {
-                        "topics": parsed["topics"][:8],  # Limit to 8 topics
-                        "hashtags": hashtags[:12]  # Limit to 12 hashtags
-                    }
-                    
-            except json.JSONDecodeError:
-                _LOGGER.warning("⚠️  Failed to parse JSON response, using fallback")
+            if parsed and parsed["topics"]:
+                return {
+                    "topics": parsed["topics"][:8],  # Limit to 8 topics
+                    "hashtags": trending_hashtags[:12]  # Limit to 12 hashtags
+                }
+            _LOGGER.warning("⚠️  No topics in research response, using fallback")
                 
     except Exception as e:
         _LOGGER.warning(f"⚠️  Error processing search results: {e}")
     
     # Fallback if processing fails
-    return get_fallback_trends(industry)
+    return {"topics": get_fallback_trends(industry)["topics"], "hashtags": trending_hashtags[:12], "fallback": True}
 
 
 def get_fallback_trends(industry: str) -> dict[str, list]:
@@ -5,12 +5,46 @@ from langgraph.graph.message import add_messages
 from pydantic import BaseModel
 
 
+class ImageRef(BaseModel):
+    """Reference to an image held in the local blob store (see blob_store.py)."""
+    
+    sha256: str       # content hash of the raw image bytes, also the blob key
+    media_type: str   # e.g. image/jpeg
+    width: int
+    height: int
+    format: str | None = None
+    mode: str | None = None
+    size_bytes: int
+    dhash: str        # 64-bit difference hash as hex, for near-duplicate lookup
+
+
+class CritiqueRecord(BaseModel):
+    """Parsed critique of one draft (see linkedin_critiquer.py)."""
+    
+    draft_number: int
+    engagement_potential: float = 0.0
+    slop_authenticity: float = 0.0
+    algorithm_optimization: float = 0.0
+    overall_score: float = 0.0
+    verdict: str = "CONTINUE"  # CONTINUE or APPROVED
+    strengths: list[str] = []
+    weaknesses: list[str] = []
+    improvements: list[str] = []
+    reasoning: str = ""
+    fallback: bool = False     # critique failed and scores are estimates
+    
+    @property
+    def approved(self) -> bool:
+        return self.verdict.strip().upper().startswith("APPROVED")
+
+
 class LinkedInAgentState(BaseModel):
     """State model for the LinkedIn Slop Bot agent workflow."""
     
     # Input
     image_path: str | None = None
-    image_base64: str | None = None
+    image_base64: str | None = None  # only accepted as input, moved into the blob store on ingest
+    image_ref: ImageRef | None = None
     initial_prompt: str
     
     # Style Questionnaire (1-5 scales)
@@ -37,10 +71,21 @@ class LinkedInAgentState(BaseModel):
     trending_hashtags: list[str] = []
     research_results: str | None = None
     
+    # Speculative research started alongside image analysis (see speculation.py)
+    speculative_research: bool | None = None  # None = SPECULATIVE_RESEARCH env default
+    speculative_industry: str | None = None
+    speculative_results: dict[str, Any] | None = None
+    
     # Content Creation
     post_drafts: list[str] = []
-    critique_feedback: list[str] = []
+    prompt_tokens: list[int] = []      # author prompt size per draft
+    critique_feedback: list[str] = []  # formatted critiques, fed to the author's revision prompt
+    critiques: list[CritiqueRecord] = []
+    style_violations: list[str] = []   # hard style constraints the latest draft breaks (see style_check.py)
+    precritic_rejections: int = 0
     final_post: str | None = None
+    refinement_mode: str | None = None  # "loop" or "best_of_n"; None = REFINEMENT_MODE env default
+    best_of_n: int | None = None        # drafts per best-of-N round; None = BEST_OF_N_DRAFTS env default
     
     # Metadata
     target_engagement_style: str = "relatable_slop"
@@ -0,0 +1,144 @@
+"""
+Opt-in watchdog for event-loop stalls.
+
+A heartbeat coroutine ticks on the loop every few milliseconds while a
+watchdog thread checks that it keeps ticking. When a tick is late by more
+than LOOP_LAG_THRESHOLD_MS the watchdog captures the loop thread's stack
+(the code that is blocking it) and the running task. The stall is logged
+with that stack and recorded in the `loop.lag` metric once the loop
+recovers. Enable with LOOP_LAG_MONITOR=1 or start_loop_monitor().
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+from agent_runtime.summary import summary_line
+
+from . import metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+LOOP_LAG_MONITOR = os.getenv("LOOP_LAG_MONITOR", "0") == "1"
+LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100"))
+_MAX_STALLS = 100
+
+
+@dataclass
+class Stall:
+    """One event-loop stall: how long it lasted and what was running."""
+
+    seconds: float
+    task: str | None
+    stack: str
+
+
+class LoopMonitor:
+    """Heartbeat coroutine plus watchdog thread for one event loop."""
+
+    def __init__(self, threshold_ms: float = LOOP_LAG_THRESHOLD_MS):
+        self.threshold = threshold_ms / 1000
+        self.interval = min(self.threshold / 4, 0.05)
+        self.stalls: deque[Stall] = deque(maxlen=_MAX_STALLS)
+        self._last_tick = time.monotonic()
+        self._pending: tuple[str | None, str] | None = None
+        self._stop = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+        self._heartbeat: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._heartbeat = self._loop.create_task(self._beat(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+        _LOGGER.info("Loop lag monitor on (threshold %.0f ms)", self.threshold * 1000)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._heartbeat:
+            self._heartbeat.cancel()
+
+    async def _beat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_tick = now
+            lag = now - expected
+            metrics.observe("loop.lag", lag)
+            if lag >= self.threshold:
+                self._record(lag)
+            else:
+                self._pending = None
+
+    def _record(self, lag: float) -> None:
+        task, stack = self._pending or (None, "(stack not captured)")
+        self._pending = None
+        stall = Stall(lag, task, stack)
+        self.stalls.append(stall)
+        metrics.incr("loop.stalls")
+        _LOGGER.warning(f"🐢 Event loop blocked for {lag * 1000:.0f} ms in task {task or '?'}:\n{stack}")
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            if self._pending is None and time.monotonic() - self._last_tick > self.interval + self.threshold:
+                self._pending = self._capture()
+
+    def _capture(self) -> tuple[str | None, str]:
+        frame = sys._current_frames().get(self._loop_thread)
+        stack = "".join(traceback.format_stack(frame)) if frame else "(no frame)"
+        # The loop is blocked, so the task it is running cannot change while we look
+        current = asyncio.current_task(self._loop) if self._loop else None
+        return (current.get_name() if current else None), stack
+
+
+_MONITOR: LoopMonitor | None = None
+
+
+def start_loop_monitor(threshold_ms: float | None = None) -> LoopMonitor:
+    """Start monitoring the running loop (once per process)."""
+    global _MONITOR
+    if _MONITOR is None or _MONITOR._stop.is_set():
+        _MONITOR = LoopMonitor(threshold_ms if threshold_ms is not None else LOOP_LAG_THRESHOLD_MS)
+        _MONITOR.start()
+    return _MONITOR
+
+
+def maybe_start_loop_monitor() -> LoopMonitor | None:
+    """Start the monitor if LOOP_LAG_MONITOR=1."""
+    return start_loop_monitor() if LOOP_LAG_MONITOR else None
+
+
+def loop_lag_stats() -> dict[str, Any]:
+    """Stall count, lag percentiles and the slowest recorded stalls."""
+    lag = metrics.snapshot("loop.lag")["series"].get("loop.lag", {})
+    stalls = sorted(_MONITOR.stalls, key=lambda stall: stall.seconds, reverse=True) if _MONITOR else []
+    return {
+        "stalls": metrics.counter("loop.stalls"),
+        "lag_p50": lag.get("p50", 0.0),
+        "lag_p95": lag.get("p95", 0.0),
+        "lag_max": lag.get("max", 0.0),
+        "worst": [{"seconds": stall.seconds, "task": stall.task, "stack": stall.stack} for stall in stalls[:5]],
+    }
+
+
+@summary_line
+def loop_lag_summary() -> str | None:
+    lag = loop_lag_stats()
+    if not lag["stalls"]:
+        return None
+    return (
+        f"Event loop stalls: {lag['stalls']:.0f} (worst {lag['lag_max'] * 1000:.0f} ms, "
+        f"in {lag['worst'][0]['task'] if lag['worst'] else '?'})"
+    )
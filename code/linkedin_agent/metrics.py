@@ -0,0 +1,72 @@
+"""In-process counters and timings for the LinkedIn Slop Bot workflow."""
+
+import threading
+from collections import defaultdict
+from typing import Any
+
+_LOCK = threading.Lock()
+_COUNTERS: dict[str, float] = defaultdict(float)
+_SAMPLES: dict[str, list[float]] = defaultdict(list)
+_MAX_SAMPLES = 10_000
+
+
+def incr(name: str, amount: float = 1) -> None:
+    """Increment a named counter."""
+    with _LOCK:
+        _COUNTERS[name] += amount
+
+
+def observe(name: str, value: float) -> None:
+    """Record a sample (latency, size, score...) for a named series."""
+    with _LOCK:
+        samples = _SAMPLES[name]
+        samples.append(value)
+        if len(samples) > _MAX_SAMPLES:
+            del samples[: len(samples) - _MAX_SAMPLES]
+
+
+def counter(name: str) -> float:
+    """Return the current value of a counter."""
+    with _LOCK:
+        return _COUNTERS.get(name, 0)
+
+
+def ratio(hits: str, total: list[str]) -> float:
+    """Return counter(hits) / sum(counters in total), or 0.0 when nothing was counted."""
+    with _LOCK:
+        denominator = sum(_COUNTERS.get(name, 0) for name in total)
+        return _COUNTERS.get(hits, 0) / denominator if denominator else 0.0
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[rank]
+
+
+def snapshot(prefix: str = "") -> dict[str, Any]:
+    """Return counters and p50/p95 summaries for every series matching a prefix."""
+    with _LOCK:
+        counters = {k: v for k, v in _COUNTERS.items() if k.startswith(prefix)}
+        series = {k: list(v) for k, v in _SAMPLES.items() if k.startswith(prefix)}
+
+    summaries = {
+        name: {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "max": max(values) if values else 0.0,
+        }
+        for name, values in series.items()
+    }
+    return {"counters": counters, "series": summaries}
+
+
+def reset() -> None:
+    """Clear all counters and samples."""
+    with _LOCK:
+        _COUNTERS.clear()
+        _SAMPLES.clear()
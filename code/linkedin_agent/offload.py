@@ -0,0 +1,53 @@
+"""
+Keep blocking work off the event loop.
+
+CPU-bound image work (decoding, hashing, base64) runs in a small process
+pool so it cannot hold the GIL while model streams are being read. Plain
+blocking I/O (file and SQLite access) runs in the default thread pool via
+asyncio.to_thread. IMAGE_WORKERS=0 runs image work in threads instead.
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Not fork: the parent has threads running (to_thread, SQLite, HTTP clients), and a
+            # forked child can inherit their locks held. Workers import only the image helpers,
+            # which do not load the workflow or its model clients (see __init__.py).
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS, mp_context=context)
+        return _pool
+
+
+async def run_cpu_bound(func: Callable[..., T], *args: Any) -> T:
+    """Run a picklable CPU-bound function in the image process pool."""
+    if IMAGE_WORKERS <= 0:
+        return await asyncio.to_thread(func, *args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), functools.partial(func, *args))
+
+
+def shutdown() -> None:
+    """Stop the process pool (it is restarted on next use)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
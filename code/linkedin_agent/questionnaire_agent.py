@@ -4,6 +4,8 @@ Questionnaire Agent for collecting LinkedIn style preferences.
 
 import logging
 import time
+from functools import lru_cache
+from itertools import product
 from typing import Any
 
 from langchain_core.runnables import RunnableConfig
@@ -12,6 +14,8 @@ from .linkedin_state import LinkedInAgentState
 
 _LOGGER = logging.getLogger(__name__)
 
+STYLE_LEVELS = range(1, 6)
+
 
 async def questionnaire_agent(state: LinkedInAgentState, config: RunnableConfig) -> dict[str, Any]:
     """Collect style preferences for LinkedIn post generation."""
@@ -60,53 +64,73 @@ async def questionnaire_agent(state: LinkedInAgentState, config: RunnableConfig)
 
 def get_style_description(state: LinkedInAgentState) -> str:
     """Generate a description of the style preferences for use in prompts."""
+    return style_description(
+        state.grammar_level,
+        state.emoji_level,
+        state.hashtag_level,
+        state.ragebait_level,
+        state.inspirational_level,
+        state.informational_level,
+    )
+
+
+@lru_cache(maxsize=None)
+def style_description(
+    grammar_level: int,
+    emoji_level: int,
+    hashtag_level: int,
+    ragebait_level: int,
+    inspirational_level: int,
+    informational_level: int,
+) -> str:
+    """Style description for one combination of levels (memoized, see precompute_style_fragments)."""
     
     style_descriptions = []
     
     # Grammar level
-    if state.grammar_level <= 2:
+    if grammar_level <= 2:
         style_descriptions.append("Use casual, imperfect grammar with typos and informal language")
-    elif state.grammar_level >= 4:
+    elif grammar_level >= 4:
         style_descriptions.append("Use proper grammar, punctuation, and professional language")
     else:
         style_descriptions.append("Use mostly correct grammar with some casual informality")
     
     # Emoji level  
-    if state.emoji_level <= 2:
+    if emoji_level <= 2:
         style_descriptions.append("Minimal emojis (0-2 per post)")
-    elif state.emoji_level >= 4:
+    elif emoji_level >= 4:
         style_descriptions.append("Heavy emoji usage (8-15 emojis throughout)")
     else:
         style_descriptions.append("Moderate emoji usage (3-6 emojis)")
     
     # Hashtag level
-    if state.hashtag_level <= 2:
+    if hashtag_level <= 2:
         style_descriptions.append("Few hashtags (3-5)")
-    elif state.hashtag_level >= 4:
+    elif hashtag_level >= 4:
         style_descriptions.append("Many hashtags (12-20)")
     else:
         style_descriptions.append("Moderate hashtags (6-10)")
     
     # Ragebait level
-    if state.ragebait_level <= 2:
+    if ragebait_level <= 2:
         style_descriptions.append("Humble and modest tone, focus on others")
-    elif state.ragebait_level >= 4:
+    elif ragebait_level >= 4:
         style_descriptions.append("Highly egotistical, self-promotional, controversial takes")
     else:
         style_descriptions.append("Balanced self-promotion with some humility")
     
     # Inspirational level
-    if state.inspirational_level <= 2:
+    if inspirational_level <= 2:
         style_descriptions.append("Minimal motivational content, more practical/realistic")
-    elif state.inspirational_level >= 4:
+    elif inspirational_level >= 4:
         style_descriptions.append("Highly motivational, uplifting, dream-big messaging")
     else:
         style_descriptions.append("Moderately inspirational with practical advice")
     
     # Informational level
-    if state.informational_level <= 2:
+    if informational_level <= 2:
         style_descriptions.append("Light on facts/data, more opinion and story-based")
-    elif state.informational_level >= 4:
+    elif informational_level >= 4:
         style_descriptions.append("Rich in industry insights, data, and educational content")
     else:
         style_descriptions.append("Balanced mix of information and personal perspective")
@@ -116,25 +140,47 @@ def get_style_description(state: LinkedInAgentState) -> str:
 
 def get_style_examples(state: LinkedInAgentState) -> str:
     """Get style examples based on the parameters."""
+    return style_examples(state.grammar_level, state.emoji_level, state.ragebait_level)
+
+
+@lru_cache(maxsize=None)
+def style_examples(grammar_level: int, emoji_level: int, ragebait_level: int) -> str:
+    """Style examples for one combination of the levels that have examples (memoized)."""
     
     examples = []
     
     # Grammar examples
-    if state.grammar_level <= 2:
+    if grammar_level <= 2:
         examples.append("Grammar: 'ur right, its crazy how ai is changing everything lol'")
-    elif state.grammar_level >= 4:
+    elif grammar_level >= 4:
         examples.append("Grammar: 'You are absolutely correct. It is remarkable how artificial intelligence is transforming every industry.'")
     
     # Emoji examples
-    if state.emoji_level <= 2:
+    if emoji_level <= 2:
         examples.append("Emojis: 'Just shipped our new feature 🚀'")
-    elif state.emoji_level >= 4:
+    elif emoji_level >= 4:
         examples.append("Emojis: 'Just shipped our new feature! 🚀💻✨ So excited! 🎉🔥💯 Team work! 👥💪🌟'")
     
     # Ragebait examples
-    if state.ragebait_level <= 2:
+    if ragebait_level <= 2:
         examples.append("Tone: 'I was lucky to learn from amazing mentors...'")
-    elif state.ragebait_level >= 4:
+    elif ragebait_level >= 4:
         examples.append("Tone: 'I'm probably one of the few people who truly understands this industry...'")
     
-    return " | ".join(examples) 
\ No newline at end of file
+    return " | ".join(examples) 
+
+
+def precompute_style_fragments() -> int:
+    """Build the style fragments for every combination of 1-5 levels up front.
+    
+    Prompts then embed byte-identical fragments for identical settings without
+    recomputing them. Returns the number of memoized descriptions.
+    """
+    for levels in product(STYLE_LEVELS, repeat=6):
+        style_description(*levels)
+    for grammar_level, emoji_level, ragebait_level in product(STYLE_LEVELS, repeat=3):
+        style_examples(grammar_level, emoji_level, ragebait_level)
+    return style_description.cache_info().currsize
+
+
+precompute_style_fragments()
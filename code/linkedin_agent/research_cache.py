@@ -0,0 +1,152 @@
+"""
+Per-industry cache of processed LinkedIn research.
+
+Trending topics and hashtags change daily at most, so the processed research
+for an industry is kept for RESEARCH_CACHE_TTL seconds and served straight from
+the cache. Between the TTL and RESEARCH_CACHE_MAX_AGE the stale entry is still
+served, while a single background task refreshes it (stale-while-revalidate).
+Entries older than RESEARCH_CACHE_MAX_AGE are never served.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from langchain_core.runnables import RunnableConfig
+
+from agent_runtime.scheduler import llm_priority
+
+from . import metrics
+from .image_cache import CACHE_DIR
+
+_LOGGER = logging.getLogger(__name__)
+
+RESEARCH_CACHE_ENABLED = os.getenv("RESEARCH_CACHE", "1") == "1"
+RESEARCH_CACHE_TTL = float(os.getenv("RESEARCH_CACHE_TTL", str(6 * 3600)))
+RESEARCH_CACHE_MAX_AGE = float(os.getenv("RESEARCH_CACHE_MAX_AGE", str(24 * 3600)))
+
+ResearchFetcher = Callable[[str, RunnableConfig | None], Awaitable[dict[str, Any] | None]]
+
+
+class ResearchCache:
+    """JSON-file backed research cache with background refresh."""
+
+    def __init__(self, path: Path, ttl: float = RESEARCH_CACHE_TTL, max_age: float = RESEARCH_CACHE_MAX_AGE):
+        self.path = path
+        self.ttl = ttl
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] = self._load()
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._background: set[asyncio.Task] = set()
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            _LOGGER.warning(f"⚠️  Ignoring unreadable research cache {self.path}: {e}")
+            return {}
+
+    def _write(self, payload: str) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(payload, encoding="utf-8")
+            os.replace(tmp_path, self.path)
+
+    async def get(self, industry: str, fetch: ResearchFetcher, config: RunnableConfig | None = None) -> dict[str, Any] | None:
+        """Return research for an industry, fetching or refreshing it as needed."""
+        key = industry.lower()
+        entry = self._entries.get(key)
+        age = time.time() - entry["fetched_at"] if entry else None
+
+        if entry and age < self.ttl:
+            metrics.incr("research_cache.fresh_hits")
+            _LOGGER.info(f"📦 Research cache hit for '{key}' ({age / 60:.0f} min old)")
+            return entry
+
+        if entry and age < self.max_age:
+            metrics.incr("research_cache.stale_hits")
+            _LOGGER.info(f"📦 Serving stale research for '{key}' ({age / 3600:.1f}h old), refreshing in background")
+            if key not in self._in_flight:
+                # Run in an empty context so the refresh does not report into the current run's callbacks
+                task = asyncio.create_task(
+                    self._refresh(key, fetch, None, background=True), context=contextvars.Context()
+                )
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+            return entry
+
+        metrics.incr("research_cache.misses")
+        return await self._refresh(key, fetch, config)
+
+    async def _refresh(
+        self, key: str, fetch: ResearchFetcher, config: RunnableConfig | None, background: bool = False
+    ) -> dict[str, Any] | None:
+        # Concurrent requests for the same industry share one fetch
+        if key in self._in_flight:
+            return await asyncio.shield(self._in_flight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            if background:
+                # Refreshes yield to interactive and batch model calls
+                with llm_priority("background", flow=f"research-refresh:{key}"):
+                    result = await fetch(key, config)
+            else:
+                result = await fetch(key, config)
+            if result and not result.get("fallback"):
+                entry = {**result, "fetched_at": time.time()}
+                self._entries[key] = entry
+                # Serialize on the loop (which owns the entries), write from a thread
+                await asyncio.to_thread(self._write, json.dumps(self._entries))
+                metrics.incr("research_cache.refreshes")
+                result = entry
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            if background:
+                _LOGGER.warning(f"⚠️  Background research refresh for '{key}' failed: {e}")
+                return None
+            raise
+        finally:
+            del self._in_flight[key]
+            # Avoid "exception was never retrieved" warnings when nobody shared the fetch
+            if future.done() and not future.cancelled():
+                future.exception()
+
+
+def cache_stats() -> dict[str, float]:
+    """Hit/miss counters and the share of lookups served from the cache."""
+    lookups = ["research_cache.fresh_hits", "research_cache.stale_hits", "research_cache.misses"]
+    return {
+        "fresh_hits": metrics.counter("research_cache.fresh_hits"),
+        "stale_hits": metrics.counter("research_cache.stale_hits"),
+        "misses": metrics.counter("research_cache.misses"),
+        "refreshes": metrics.counter("research_cache.refreshes"),
+        "hit_rate": metrics.ratio("research_cache.fresh_hits", lookups) + metrics.ratio("research_cache.stale_hits", lookups),
+    }
+
+
+_CACHE: ResearchCache | None = None
+
+
+def get_cache() -> ResearchCache:
+    """Return the process-wide research cache."""
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = ResearchCache(CACHE_DIR / "research_cache.json")
+    return _CACHE
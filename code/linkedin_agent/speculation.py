@@ -0,0 +1,128 @@
+"""
+Speculative research that overlaps with image analysis.
+
+With an image, research normally waits for the vision call and the industry
+classifier. When the prompt alone points clearly to an industry, research for
+that guess is started alongside image analysis. The researcher keeps the
+speculative result if the classifier agrees and only re-runs research on a
+mismatch.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+
+from agent_runtime.state_backend import copy_state
+from agent_runtime.summary import summary_line
+
+from . import metrics
+from .image_analyzer import image_context_analyzer
+from .industry_analyzer import guess_industry
+from .linkedin_researcher import linkedin_research_agent
+from .linkedin_state import LinkedInAgentState
+
+_LOGGER = logging.getLogger(__name__)
+
+SPECULATIVE_RESEARCH = os.getenv("SPECULATIVE_RESEARCH", "0") == "1"
+SPECULATION_MIN_CONFIDENCE = float(os.getenv("SPECULATION_MIN_CONFIDENCE", "0.6"))
+
+_RESEARCH_FIELDS = ("trending_topics", "trending_hashtags", "research_results")
+
+
+def speculation_enabled(state: LinkedInAgentState) -> bool:
+    """Per-run setting, falling back to the SPECULATIVE_RESEARCH environment default."""
+    if state.speculative_research is None:
+        return SPECULATIVE_RESEARCH
+    return state.speculative_research
+
+
+async def _timed(node: Any, state: LinkedInAgentState, config: RunnableConfig) -> tuple[dict[str, Any], float]:
+    start = time.perf_counter()
+    update = await node(state, config)
+    return update, time.perf_counter() - start
+
+
+async def speculative_image_analyzer(state: LinkedInAgentState, config: RunnableConfig) -> dict[str, Any]:
+    """Analyze the image, researching the guessed industry at the same time."""
+    
+    if not speculation_enabled(state):
+        return await image_context_analyzer(state, config)
+    
+    guess, confidence = guess_industry(state.initial_prompt)
+    if confidence < SPECULATION_MIN_CONFIDENCE:
+        metrics.incr("speculation.skipped")
+        _LOGGER.info(f"🎲 No confident industry guess (best '{guess}' at {confidence:.2f}), not speculating")
+        return await image_context_analyzer(state, config)
+    
+    _LOGGER.info(f"🎲 Speculatively researching '{guess}' ({confidence:.2f}) during image analysis")
+    metrics.incr("speculation.attempts")
+    speculative_state = copy_state(state, industry=guess)
+    (image_update, image_time), (research_update, research_time) = await asyncio.gather(
+        _timed(image_context_analyzer, state, config),
+        _timed(linkedin_research_agent, speculative_state, config),
+    )
+    
+    return {
+        **image_update,
+        "speculative_industry": guess,
+        "speculative_results": {
+            **{field: research_update[field] for field in _RESEARCH_FIELDS},
+            "elapsed": research_time,
+            # Research hidden behind image analysis: what a hit takes off the run time
+            "overlap": min(image_time, research_time),
+        },
+    }
+
+
+async def speculative_research_agent(state: LinkedInAgentState, config: RunnableConfig) -> dict[str, Any]:
+    """Reuse speculative research when the industry guess was right, research otherwise."""
+    
+    if not state.speculative_results:
+        return await linkedin_research_agent(state, config)
+    
+    industry = state.industry or "general_business"
+    if industry == state.speculative_industry:
+        saved = state.speculative_results["overlap"]
+        metrics.incr("speculation.hits")
+        metrics.incr("speculation.saved_seconds", saved)
+        _LOGGER.info(f"🎯 Speculative research for '{industry}' kept, saved {saved:.2f}s")
+        return {
+            **{field: state.speculative_results[field] for field in _RESEARCH_FIELDS},
+            "speculative_results": None,
+            "messages": [],
+        }
+    
+    metrics.incr("speculation.misses")
+    metrics.incr("speculation.wasted_seconds", state.speculative_results["elapsed"])
+    _LOGGER.info(f"🔁 Speculated '{state.speculative_industry}' but industry is '{industry}', re-running research")
+    return {**await linkedin_research_agent(state, config), "speculative_results": None}
+
+
+def speculation_stats() -> dict[str, float]:
+    """Speculation hit rate, research latency hidden behind image analysis on hits, and
+    research time spent on wrong guesses."""
+    return {
+        "attempts": metrics.counter("speculation.attempts"),
+        "hits": metrics.counter("speculation.hits"),
+        "misses": metrics.counter("speculation.misses"),
+        "skipped": metrics.counter("speculation.skipped"),
+        "hit_rate": metrics.ratio("speculation.hits", ["speculation.hits", "speculation.misses"]),
+        "saved_seconds": metrics.counter("speculation.saved_seconds"),
+        "wasted_seconds": metrics.counter("speculation.wasted_seconds"),
+    }
+
+
+@summary_line
+def speculation_summary() -> str | None:
+    speculation = speculation_stats()
+    if not speculation["attempts"]:
+        return None
+    return (
+        f"Speculative research: {speculation['hits']:.0f}/{speculation['attempts']:.0f} kept "
+        f"({speculation['hit_rate']:.0%} hit rate), {speculation['saved_seconds']:.1f}s saved, "
+        f"{speculation['wasted_seconds']:.1f}s spent on wrong guesses"
+    )
@@ -0,0 +1,194 @@
+"""
+Deterministic style checks that run before the LLM critique.
+
+Word count, emoji count, hashtag count and paragraph structure can be measured
+locally, so drafts that clearly miss the requested bands are sent back to the
+author with exact numbers instead of spending a 70B critique call on them.
+"""
+
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from langchain_core.runnables import RunnableConfig
+
+from agent_runtime.ledger import budget_exhausted
+
+from . import metrics
+from .hashtags import HASHTAG_PATTERN
+from .linkedin_critiquer import MAX_ITERATIONS
+from .linkedin_state import LinkedInAgentState
+
+_LOGGER = logging.getLogger(__name__)
+
+STYLE_PRECRITIC_ENABLED = os.getenv("STYLE_PRECRITIC", "1") == "1"
+# Rejections per post before drafts go to the LLM critic regardless
+PRECRITIC_MAX_REJECTIONS = int(os.getenv("PRECRITIC_MAX_REJECTIONS", "2"))
+
+# Target bands, matching the questionnaire's descriptions of each level (None = no upper bound)
+WORD_RANGE = (150, 300)
+EMOJI_BANDS = {1: (0, 2), 2: (2, 4), 3: (4, 6), 4: (8, 12), 5: (12, None)}
+HASHTAG_BANDS = {1: (3, 5), 2: (5, 7), 3: (6, 10), 4: (10, 15), 5: (15, 20)}
+
+# How far outside a band a draft may be before the miss counts as a hard violation
+WORD_SLACK = 0.2
+EMOJI_SLACK = 2
+HASHTAG_SLACK = 2
+MIN_PARAGRAPHS = 3
+
+_EMOJI_CHARS = "\U0001F300-\U0001F5FF\U0001F600-\U0001F64F\U0001F680-\U0001F6FF\U0001F900-\U0001F9FF\U0001FA70-\U0001FAFF☀-➿⭐⭕"
+# Flags, and emoji with optional skin tone / variation selector / ZWJ-joined parts, each count once
+EMOJI_PATTERN = re.compile(
+    f"[\U0001F1E6-\U0001F1FF]{{2}}|[{_EMOJI_CHARS}](?:[\U0001F3FB-\U0001F3FF️]|‍[{_EMOJI_CHARS}])*"
+)
+WORD_PATTERN = re.compile(r"[^\W_][\w'’-]*")
+PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+
+
+@dataclass
+class StyleReport:
+    """Measured style of one draft and the hard constraints it breaks."""
+
+    word_count: int
+    emoji_count: int
+    hashtag_count: int
+    paragraph_count: int
+    violations: list[str] = field(default_factory=list)
+    score: float = 10.0  # 0-10, share of constraints met
+
+    @property
+    def passed(self) -> bool:
+        return not self.violations
+
+
+def _band(low: int, high: int | None) -> str:
+    return f"{low}-{high}" if high is not None else f"{low}+"
+
+
+def _miss(value: int, low: int, high: int | None, slack: float) -> int:
+    """Signed distance beyond the band's slack (negative = too few), 0 when acceptable."""
+    if value < low - slack:
+        return value - low
+    if high is not None and value > high + slack:
+        return value - high
+    return 0
+
+
+def score_drafts(drafts: Iterable[str], emoji_level: int, hashtag_level: int) -> list[StyleReport]:
+    """Check many drafts against the same style settings.
+    
+    Bands and compiled patterns are resolved once per call, so scoring a batch
+    of thousands of drafts costs a few regex passes per draft.
+    """
+    emoji_low, emoji_high = EMOJI_BANDS.get(emoji_level, EMOJI_BANDS[3])
+    hashtag_low, hashtag_high = HASHTAG_BANDS.get(hashtag_level, HASHTAG_BANDS[3])
+    word_low, word_high = WORD_RANGE
+    word_slack = word_low * WORD_SLACK
+
+    reports = []
+    for draft in drafts:
+        hashtags = HASHTAG_PATTERN.findall(draft)
+        words = len(WORD_PATTERN.findall(HASHTAG_PATTERN.sub(" ", draft)))
+        emojis = len(EMOJI_PATTERN.findall(draft))
+        paragraphs = sum(1 for chunk in PARAGRAPH_SPLIT.split(draft.strip()) if chunk.strip())
+
+        violations = []
+        word_miss = _miss(words, word_low, word_high, word_slack)
+        if word_miss < 0:
+            violations.append(f"Length: {words} words, target is {word_low}-{word_high}. Add about {-word_miss} words.")
+        elif word_miss > 0:
+            violations.append(f"Length: {words} words, target is {word_low}-{word_high}. Cut about {word_miss} words.")
+
+        emoji_miss = _miss(emojis, emoji_low, emoji_high, EMOJI_SLACK)
+        if emoji_miss:
+            action = f"Add {-emoji_miss}" if emoji_miss < 0 else f"Remove {emoji_miss}"
+            violations.append(
+                f"Emojis: {emojis} used, emoji_level={emoji_level} needs {_band(emoji_low, emoji_high)}. {action} emojis."
+            )
+
+        hashtag_miss = _miss(len(hashtags), hashtag_low, hashtag_high, HASHTAG_SLACK)
+        if hashtag_miss:
+            action = f"Add {-hashtag_miss}" if hashtag_miss < 0 else f"Remove {hashtag_miss}"
+            violations.append(
+                f"Hashtags: {len(hashtags)} used, hashtag_level={hashtag_level} needs "
+                f"{_band(hashtag_low, hashtag_high)}. {action} hashtags."
+            )
+
+        if paragraphs < MIN_PARAGRAPHS:
+            violations.append(
+                f"Structure: {paragraphs} paragraph(s). Break the post into at least {MIN_PARAGRAPHS} short paragraphs separated by blank lines."
+            )
+
+        reports.append(StyleReport(
+            word_count=words,
+            emoji_count=emojis,
+            hashtag_count=len(hashtags),
+            paragraph_count=paragraphs,
+            violations=violations,
+            score=round(10 * (1 - len(violations) / 4), 1),
+        ))
+    return reports
+
+
+def check_draft(draft: str, state: LinkedInAgentState) -> StyleReport:
+    """Check a single draft against the state's style settings."""
+    return score_drafts([draft], state.emoji_level, state.hashtag_level)[0]
+
+
+def format_style_feedback(report: StyleReport, draft_number: int) -> str:
+    """Feedback in the shape of an LLM critique, for the author's revision prompt."""
+    violations = "\n".join(f"- {violation}" for violation in report.violations)
+    return f"""
+DRAFT #{draft_number} STYLE CHECK (automatic):
+
+❌ HARD STYLE CONSTRAINTS BROKEN:
+{violations}
+
+🔧 SPECIFIC IMPROVEMENTS FOR NEXT DRAFT:
+- Fix exactly the counts above; keep the content, hook and image reference otherwise unchanged.
+
+🎯 VERDICT: CONTINUE
+""".strip()
+
+
+async def style_precritic(state: LinkedInAgentState, config: RunnableConfig) -> dict[str, Any]:
+    """Reject drafts that clearly break measurable style constraints before the LLM critique."""
+    
+    if not STYLE_PRECRITIC_ENABLED or not state.post_drafts:
+        return {"messages": []}
+    
+    draft_number = len(state.post_drafts)
+    report = check_draft(state.post_drafts[-1], state)
+    metrics.incr("precritic.checked")
+    
+    if report.passed:
+        _LOGGER.info(f"📏 Draft #{draft_number} passes style checks ({report.word_count} words, {report.emoji_count} emojis, {report.hashtag_count} hashtags)")
+        return {"style_violations": [], "messages": []}
+    
+    _LOGGER.info(f"📏 Draft #{draft_number} breaks {len(report.violations)} style constraint(s): {'; '.join(report.violations)}")
+    if state.precritic_rejections >= PRECRITIC_MAX_REJECTIONS:
+        # Out of automatic rejections: let the LLM critic weigh the draft as a whole
+        return {"style_violations": [], "messages": []}
+    
+    metrics.incr("precritic.rejections")
+    return {
+        "style_violations": report.violations,
+        "precritic_rejections": state.precritic_rejections + 1,
+        "critique_feedback": state.critique_feedback + [format_style_feedback(report, draft_number)],
+        "messages": [],
+    }
+
+
+def should_precritic_reject(state: LinkedInAgentState, config: RunnableConfig | None = None) -> str:
+    """Send drafts the pre-critic rejected straight back to the author.
+    
+    Over budget, a draft that already exists goes straight to formatting.
+    """
+    
+    if state.post_drafts and budget_exhausted(config, "critique"):
+        return "finish"
+    if state.style_violations and len(state.post_drafts) < MAX_ITERATIONS:
+        return "revise"
+    return "critique"
@@ -0,0 +1,194 @@
+"""
+Deterministic repair of mechanical style misses.
+
+Runs between the author and the pre-critic. Hashtag and emoji counts are
+pulled into their questionnaire bands, duplicate hashtags are removed (using
+the trending spelling where one exists) and over-long drafts are trimmed at a
+sentence boundary, so the LLM critique/revise loop only has to deal with the
+content itself.
+"""
+
+import logging
+import os
+import re
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+
+from . import metrics
+from .hashtags import HASHTAG_PATTERN, extract_hashtags
+from .linkedin_state import LinkedInAgentState
+from .style_check import EMOJI_BANDS, EMOJI_PATTERN, HASHTAG_BANDS, PARAGRAPH_SPLIT, WORD_PATTERN, WORD_RANGE
+
+_LOGGER = logging.getLogger(__name__)
+
+STYLE_REPAIR_ENABLED = os.getenv("STYLE_REPAIR", "1") == "1"
+
+# Emojis appended to paragraph ends when a draft has too few
+EMOJI_PALETTE = ["🚀", "💡", "🔥", "🙌", "💪", "✨", "🎯", "👇", "📈", "🤝", "💯", "🌟"]
+
+_HASHTAG_LINE = re.compile(r"^[\s,]*(?:#\w+[\s,]*)+$")
+# Every tag in the closing block, including ones the mining pattern skips (#X, #5G)
+_BLOCK_HASHTAG = re.compile(r"#\w+")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])(\s+)")
+
+
+def _count_words(text: str) -> int:
+    return len(WORD_PATTERN.findall(HASHTAG_PATTERN.sub(" ", text)))
+
+
+def _split_hashtag_block(draft: str) -> tuple[str, list[str]]:
+    """Split trailing lines made only of hashtags off the post body."""
+    lines = draft.rstrip().split("\n")
+    block: list[str] = []
+    while lines and (not lines[-1].strip() or _HASHTAG_LINE.match(lines[-1])):
+        block.insert(0, lines.pop())
+    return "\n".join(lines).rstrip(), _BLOCK_HASHTAG.findall("\n".join(block))
+
+
+def trim_words(body: str, max_words: int) -> tuple[str, int]:
+    """Cut a body to at most max_words at a sentence boundary, keeping a closing question.
+    
+    Returns the body and the number of words removed (0 when it already fits or
+    cannot be trimmed without dropping below the minimum length).
+    """
+    total = _count_words(body)
+    if total <= max_words:
+        return body, 0
+    
+    paragraphs = [paragraph for paragraph in PARAGRAPH_SPLIT.split(body.strip()) if paragraph.strip()]
+    closing = paragraphs.pop() if len(paragraphs) > 1 and "?" in paragraphs[-1] else None
+    budget = max_words - (_count_words(closing) if closing else 0)
+    
+    kept: list[str] = []
+    used = 0
+    for paragraph in paragraphs:
+        pieces = _SENTENCE_SPLIT.split(paragraph.strip())  # [sentence, separator, sentence, ...]
+        taken = ""
+        complete = True
+        for i in range(0, len(pieces), 2):
+            words = _count_words(pieces[i])
+            if used + words > budget:
+                complete = False
+                break
+            taken += pieces[i] + (pieces[i + 1] if i + 1 < len(pieces) else "")
+            used += words
+        if taken.strip():
+            kept.append(taken.rstrip())
+        if not complete:
+            break
+    
+    if closing:
+        kept.append(closing)
+    trimmed = "\n\n".join(kept)
+    if _count_words(trimmed) < WORD_RANGE[0]:
+        return body, 0
+    return trimmed, total - _count_words(trimmed)
+
+
+def fit_emojis(body: str, low: int, high: int | None) -> tuple[str, int]:
+    """Drop emojis beyond the band's top, or add palette emojis up to its bottom.
+    
+    Returns the body and the signed change in emoji count.
+    """
+    matches = list(EMOJI_PATTERN.finditer(body))
+    
+    if high is not None and len(matches) > high:
+        # Keep the first `high` emojis, which usually carry the hook
+        for match in reversed(matches[high:]):
+            body = body[:match.start()] + body[match.end():]
+        body = re.sub(r"[ \t]{2,}", " ", body)
+        body = re.sub(r"[ \t]+\n", "\n", body)
+        return body, high - len(matches)
+    
+    missing = low - len(matches)
+    if missing <= 0:
+        return body, 0
+    
+    used = {match.group() for match in matches}
+    palette = [emoji for emoji in EMOJI_PALETTE if emoji not in used] or EMOJI_PALETTE
+    paragraphs = [paragraph for paragraph in PARAGRAPH_SPLIT.split(body.strip()) if paragraph.strip()]
+    if not paragraphs:
+        return body, 0
+    for added in range(missing):
+        index = added % len(paragraphs)
+        paragraphs[index] = f"{paragraphs[index].rstrip()} {palette[added % len(palette)]}"
+    return "\n\n".join(paragraphs), missing
+
+
+def fit_hashtags(body: str, block: list[str], low: int, high: int, trending: list[str]) -> tuple[list[str], list[str]]:
+    """Deduplicate the closing hashtags and bring the post's total into [low, high].
+    
+    Hashtags used inline in the body are kept and count towards the total; only
+    the closing block is changed. Trending hashtags are kept in preference to
+    others and used to fill up a short block. Returns (block, change notes).
+    """
+    notes: list[str] = []
+    canonical = {tag.lower(): tag for tag in trending}
+    seen = {tag.lower() for tag in extract_hashtags(body)}
+    inline = len(seen)
+    
+    tags: list[str] = []
+    for tag in block:
+        if tag.lower() in seen:
+            continue
+        seen.add(tag.lower())
+        tags.append(canonical.get(tag.lower(), tag))
+    if len(tags) < len(block):
+        notes.append(f"removed {len(block) - len(tags)} duplicate hashtag(s)")
+    
+    room = max(0, high - inline)
+    if len(tags) > room:
+        # Keep trending tags first, then the author's own, preserving their order
+        priority = sorted(range(len(tags)), key=lambda i: (tags[i].lower() not in canonical, i))
+        keep = set(priority[:room])
+        notes.append(f"removed {len(tags) - room} hashtag(s) over the limit of {high}")
+        tags = [tag for i, tag in enumerate(tags) if i in keep]
+    
+    missing = low - inline - len(tags)
+    if missing > 0:
+        extra = [tag for tag in trending if tag.lower() not in seen][:missing]
+        if extra:
+            notes.append(f"added {len(extra)} trending hashtag(s)")
+            tags += extra
+    
+    return tags, notes
+
+
+def repair_draft(draft: str, emoji_level: int, hashtag_level: int, trending_hashtags: list[str]) -> tuple[str, list[str]]:
+    """Apply all deterministic repairs to a draft. Returns (draft, change notes)."""
+    
+    body, block = _split_hashtag_block(draft)
+    notes: list[str] = []
+    
+    body, removed_words = trim_words(body, WORD_RANGE[1])
+    if removed_words:
+        notes.append(f"trimmed {removed_words} words at a sentence boundary")
+    
+    body, emoji_change = fit_emojis(body, *EMOJI_BANDS.get(emoji_level, EMOJI_BANDS[3]))
+    if emoji_change:
+        notes.append(f"{'added' if emoji_change > 0 else 'removed'} {abs(emoji_change)} emoji(s)")
+    
+    low, high = HASHTAG_BANDS.get(hashtag_level, HASHTAG_BANDS[3])
+    tags, hashtag_notes = fit_hashtags(body, block, low, high, trending_hashtags)
+    notes += hashtag_notes
+    
+    if not notes:
+        return draft, []
+    return f"{body}\n\n{' '.join(tags)}" if tags else body, notes
+
+
+async def style_repair(state: LinkedInAgentState, config: RunnableConfig) -> dict[str, Any]:
+    """Fix hashtag/emoji counts and length of the latest draft in place."""
+    
+    if not STYLE_REPAIR_ENABLED or not state.post_drafts:
+        return {"messages": []}
+    
+    draft, notes = repair_draft(state.post_drafts[-1], state.emoji_level, state.hashtag_level, state.trending_hashtags)
+    metrics.incr("style_repair.checked")
+    if not notes:
+        return {"messages": []}
+    
+    metrics.incr("style_repair.repaired")
+    _LOGGER.info(f"🔧 Repaired draft #{len(state.post_drafts)}: {'; '.join(notes)}")
+    return {"post_drafts": state.post_drafts[:-1] + [draft], "messages": []}
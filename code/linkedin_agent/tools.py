@@ -9,14 +9,22 @@ from pathlib import Path
 
 from langchain_core.tools import tool
 from tavily import AsyncTavilyClient
-from PIL import Image
+
+from agent_runtime.source_index import SEARCH_OFFLINE, indexed_search
+
+from . import hashtags
+from . import offload
+from .blob_store import ingest_image_file
+from .limits import search_slot
 
 _LOGGER = logging.getLogger(__name__)
 
 # Initialize Tavily client only if API key is available
+# TAVILY_BASE_URL points searches at another endpoint (e.g. a local stand-in)
+_TAVILY_BASE_URL = {"api_base_url": os.getenv("TAVILY_BASE_URL")} if os.getenv("TAVILY_BASE_URL") else {}
 tavily_client = None
 if os.getenv("TAVILY_API_KEY"):
-    tavily_client = AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+    tavily_client = AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"), **_TAVILY_BASE_URL)
 else:
     _LOGGER.warning("TAVILY_API_KEY not found - search functionality will be limited")
 INCLUDE_RAW_CONTENT = False
@@ -85,25 +93,24 @@ def _deduplicate_and_format_sources(
     return formatted_text.strip()
 
 
-@tool(parse_docstring=True)
-async def search_linkedin_content(
-    queries: list[str],
-    content_type: Literal["trends", "posts", "engagement"] = "trends",
-) -> str:
-    """Search for LinkedIn-specific content and trends.
+async def _tavily_search(query: str, **kwargs) -> dict:
+    if tavily_client is None:
+        raise RuntimeError("Tavily search is unavailable - TAVILY_API_KEY is not set")
+    async with search_slot():
+        return await tavily_client.search(query, **kwargs)
 
-    Args:
-        queries: List of LinkedIn-focused search queries.
-        content_type: Type of LinkedIn content to search for.
-          trends - LinkedIn trending topics and hashtags
-          posts - High-engagement LinkedIn post examples  
-          engagement - LinkedIn algorithm and engagement best practices
 
-    Returns:
-        A string of the formatted search results.
-    """
-    _LOGGER.info("Searching for LinkedIn content using Tavily API")
+async def _search(query: str, **kwargs) -> dict:
+    """Run a single search, from the local source index when it can answer it, else on
+    Tavily within the shared search budget."""
+    return await indexed_search(_tavily_search, query, **kwargs)
 
+
+async def fetch_linkedin_search_results(
+    queries: list[str],
+    content_type: Literal["trends", "posts", "engagement"] = "trends",
+) -> list[dict]:
+    """Run LinkedIn-focused Tavily searches and return the raw responses."""
     # Add LinkedIn-specific search terms to queries
     linkedin_queries = []
     for query in queries:
@@ -121,7 +128,7 @@ async def search_linkedin_content(
         _LOGGER.info("Searching for LinkedIn query: %s", query)
         search_jobs.append(
             asyncio.create_task(
-                tavily_client.search(
+                _search(
                     query,
                     max_results=MAX_RESULTS,
                     include_raw_content=INCLUDE_RAW_CONTENT,
@@ -131,8 +138,11 @@ async def search_linkedin_content(
             )
         )
 
-    search_docs = await asyncio.gather(*search_jobs)
+    return await asyncio.gather(*search_jobs)
 
+
+def format_search_results(search_docs: list[dict]) -> str:
+    """Deduplicate and format raw Tavily responses for use in prompts."""
     formatted_search_docs = _deduplicate_and_format_sources(
         search_docs,
         max_tokens_per_source=MAX_TOKENS_PER_SOURCE,
@@ -142,6 +152,29 @@ async def search_linkedin_content(
     return formatted_search_docs
 
 
+@tool(parse_docstring=True)
+async def search_linkedin_content(
+    queries: list[str],
+    content_type: Literal["trends", "posts", "engagement"] = "trends",
+) -> str:
+    """Search for LinkedIn-specific content and trends.
+
+    Args:
+        queries: List of LinkedIn-focused search queries.
+        content_type: Type of LinkedIn content to search for.
+          trends - LinkedIn trending topics and hashtags
+          posts - High-engagement LinkedIn post examples  
+          engagement - LinkedIn algorithm and engagement best practices
+
+    Returns:
+        A string of the formatted search results.
+    """
+    _LOGGER.info("Searching for LinkedIn content using Tavily API")
+
+    search_docs = await fetch_linkedin_search_results(queries, content_type)
+    return format_search_results(search_docs)
+
+
 @tool(parse_docstring=True)
 async def process_image_for_analysis(image_path: str) -> dict:
     """Process uploaded image for LinkedIn content analysis.
@@ -150,33 +183,28 @@ async def process_image_for_analysis(image_path: str) -> dict:
         image_path: Path to the image file to process.
 
     Returns:
-        Dictionary with image metadata and base64 encoding.
+        Dictionary with image metadata and a reference to the stored image.
     """
     _LOGGER.info("Processing image for analysis: %s", image_path)
     
     try:
         # Validate image exists
-        if not Path(image_path).exists():
+        if not await asyncio.to_thread(Path(image_path).exists):
             raise FileNotFoundError(f"Image not found: {image_path}")
         
-        # Open and analyze image
-        with Image.open(image_path) as img:
-            # Get basic metadata
-            metadata = {
-                "width": img.width,
-                "height": img.height,
-                "format": img.format,
-                "mode": img.mode,
-                "size_mb": Path(image_path).stat().st_size / (1024 * 1024)
-            }
-        
-        # Convert to base64 for API calls
-        with open(image_path, "rb") as f:
-            image_b64 = base64.b64encode(f.read()).decode()
+        # Hash, inspect and store the image in a single pass over the file, off the event loop
+        image_ref = await offload.run_cpu_bound(ingest_image_file, image_path)
+        metadata = {
+            "width": image_ref.width,
+            "height": image_ref.height,
+            "format": image_ref.format,
+            "mode": image_ref.mode,
+            "size_mb": image_ref.size_bytes / (1024 * 1024)
+        }
         
         return {
             "metadata": metadata,
-            "base64": image_b64,
+            "image_ref": image_ref.model_dump(),
             "file_path": image_path,
             "processed": True
         }
@@ -189,6 +217,11 @@ async def process_image_for_analysis(image_path: str) -> dict:
         }
 
 
+def _read_base64(path: str) -> str:
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode()
+
+
 @tool(parse_docstring=True)
 async def encode_image_to_base64(image_input: str) -> str:
     """Convert image to base64 encoding for API calls.
@@ -207,14 +240,25 @@ async def encode_image_to_base64(image_input: str) -> str:
     
     # Otherwise treat as file path
     try:
-        with open(image_input, "rb") as f:
-            image_b64 = base64.b64encode(f.read()).decode()
-        return image_b64
+        return await asyncio.to_thread(_read_base64, image_input)
     except Exception as e:
         _LOGGER.error("Error encoding image to base64: %s", e)
         raise
 
 
+DEFAULT_HASHTAGS = [
+    "#Leadership",
+    "#Innovation",
+    "#Growth",
+    "#Success",
+    "#Motivation",
+    "#CareerDevelopment",
+    "#BusinessTips",
+    "#Networking",
+    "#ProfessionalDevelopment"
+]
+
+
 @tool(parse_docstring=True)
 async def get_trending_hashtags(industry: str) -> list[str]:
     """Get trending hashtags for specific industry.
@@ -227,31 +271,25 @@ async def get_trending_hashtags(industry: str) -> list[str]:
     """
     _LOGGER.info("Getting trending hashtags for industry: %s", industry)
     
-    # Use Tavily to search for trending hashtags
-    query = f"trending LinkedIn hashtags {industry} 2024"
-    
-    search_result = await tavily_client.search(
-        query,
-        max_results=3,
-        include_raw_content=False,
-        topic="general"
-    )
-    
-    # Extract hashtags from search results (simplified)
-    hashtags = [
-        f"#{industry.title()}",
-        "#Leadership", 
-        "#Innovation",
-        "#Growth",
-        "#Success",
-        "#Motivation",
-        "#CareerDevelopment",
-        "#BusinessTips",
-        "#Networking",
-        "#ProfessionalDevelopment"
-    ]
+    # Mine hashtags from a fresh search into the industry's rolling frequency table
+    if tavily_client is not None or SEARCH_OFFLINE:
+        query = f"trending LinkedIn hashtags {industry} 2024"
+        try:
+            search_result = await _search(
+                query,
+                max_results=3,
+                include_raw_content=False,
+                topic="general"
+            )
+            if not search_result.get("source_index"):  # indexed sources were counted when fetched
+                found = await asyncio.to_thread(hashtags.get_index().observe, industry, search_result.get("results", []))
+                _LOGGER.info("Found %d distinct hashtags for %s", found, industry)
+        except Exception as e:
+            _LOGGER.warning("Hashtag search failed for %s: %s", industry, e)
     
-    return hashtags[:8]  # Return top 8 hashtags
+    # Rank from the frequency table, topping up with generic hashtags
+    fallback = [f"#{industry.title().replace('_', '')}"] + DEFAULT_HASHTAGS
+    return hashtags.rank_hashtags(industry, 8, fallback)  # Return top 8 hashtags
 
 
 # Re-export the original search function for backward compatibility
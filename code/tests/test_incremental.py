@@ -0,0 +1,85 @@
+"""Tests for docgen_agent.incremental: which sections of an updated plan keep their previous content."""
+
+from docgen_agent import incremental
+from docgen_agent.author import Section
+from docgen_agent.incremental import match_sections
+
+DESCRIPTION = "Aspect 1 of the topic, with examples and trade-offs"
+
+
+def section(name: str, description: str = DESCRIPTION, research: bool = True, content: str = "") -> Section:
+    return Section(name=name, description=description, research=research, content=content)
+
+
+def written(name: str, description: str = DESCRIPTION, research: bool = True) -> Section:
+    return section(name, description, research, content=f"Content of {name}")
+
+
+def test_unchanged_plan_reuses_every_section():
+    previous = [written("Introduction", research=False), written("Serving"), written("Conclusion", research=False)]
+    sections = [section(old.name, old.description, old.research) for old in previous]
+    assert match_sections(previous, sections) == [0, 1, 2]
+
+
+def test_case_and_whitespace_do_not_count_as_changes():
+    assert match_sections([written("Serving")], [section("  SERVING ", DESCRIPTION.upper())]) == [0]
+
+
+def test_small_rewording_above_the_threshold_is_reused():
+    reworded = "Aspect 1 of the topic, with examples and tradeoffs"
+    assert match_sections([written("Serving")], [section("Serving", reworded)]) == [0]
+
+
+def test_rewritten_description_is_written_again():
+    rewritten = "Aspect 1 of the topic, rewritten around cost and operations"
+    assert match_sections([written("Serving")], [section("Serving", rewritten)]) == [None]
+
+
+def test_renamed_section_is_written_again():
+    assert match_sections([written("Introduction")], [section("Intro")]) == [None]
+
+
+def test_threshold_is_configurable(monkeypatch):
+    rewritten = "Aspect 1 of the topic, rewritten around cost and operations"
+    monkeypatch.setattr(incremental, "SECTION_REUSE_SIMILARITY", 0.6)
+    assert match_sections([written("Serving")], [section("Serving", rewritten)]) == [0]
+
+
+def test_quick_ratio_short_circuit_scores_dissimilar_text_zero():
+    assert incremental._similarity("Serving", "serving") == 1.0
+    assert incremental._similarity("abcdef", "uvwxyz") == 0.0
+    reworded = "Aspect 1 of the topic, with examples and tradeoffs"
+    assert 0.9 < incremental._similarity(DESCRIPTION, reworded) < 1.0
+
+
+def test_research_flag_must_match():
+    assert match_sections([written("Serving", research=True)], [section("Serving", research=False)]) == [None]
+
+
+def test_previous_section_without_content_is_not_reused():
+    assert match_sections([section("Serving")], [section("Serving")]) == [None]
+
+
+def test_moved_sections_keep_their_content():
+    previous = [written("Hardware"), written("Serving"), written("Costs")]
+    sections = [section("Costs"), section("Hardware"), section("Benchmarks"), section("Serving")]
+    assert match_sections(previous, sections) == [2, 0, None, 1]
+
+
+def test_each_previous_section_is_reused_once():
+    # A duplicated section keeps the content once, in its first place
+    assert match_sections([written("Serving")], [section("Serving"), section("Serving")]) == [0, None]
+
+
+def test_best_match_is_paired_first():
+    reworded = "Aspect 1 of the topic, with examples and tradeoffs"
+    previous = [written("Serving")]
+    # The exact match wins the previous section, although the near match comes first
+    assert match_sections(previous, [section("Serving", reworded), section("Serving")]) == [None, 0]
+
+
+def test_leftover_previous_sections_pair_with_their_next_best_match():
+    reworded = "Aspect 1 of the topic, with examples and tradeoffs"
+    previous = [written("Serving"), written("Serving", reworded)]
+    sections = [section("Serving", reworded), section("Serving")]
+    assert match_sections(previous, sections) == [1, 0]
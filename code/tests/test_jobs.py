@@ -0,0 +1,95 @@
+"""Tests for agent_runtime.jobs: claiming, leases, retries and giving up on a job."""
+
+import pytest
+
+from agent_runtime.jobs import JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    yield store
+    store.close()
+
+
+def test_claims_the_oldest_job_once(store):
+    first = store.enqueue("reports", {"topic": "first"})
+    second = store.enqueue("reports", {"topic": "second"})
+
+    job = store.claim("w1")
+    assert (job.id, job.payload, job.attempts) == (first, {"topic": "first"}, 1)
+    assert store.claim("w2").id == second
+    assert store.claim("w3") is None
+    assert store.get(first)["lease_owner"] == "w1"
+
+
+def test_claim_filters_by_kind(store):
+    store.enqueue("reports", {})
+    post = store.enqueue("linkedin", {})
+    assert store.claim("w1", kinds=["linkedin"]).id == post
+    assert store.claim("w1", kinds=["linkedin"]) is None
+
+
+def test_completed_job_stores_its_result(store):
+    job_id = store.enqueue("linkedin", {})
+    store.claim("w1")
+    assert store.complete(job_id, "w1", {"type": "done", "final_post": "post"})
+    job = store.get(job_id)
+    assert (job["status"], job["result"]) == ("succeeded", {"type": "done", "final_post": "post"})
+    assert store.stats()["succeeded"] == 1
+
+
+def test_failed_attempts_are_retried_until_max_attempts(store):
+    job_id = store.enqueue("linkedin", {}, max_attempts=2)
+    store.claim("w1")
+    assert store.fail(job_id, "w1", "first failure")
+    assert store.get(job_id)["status"] == "queued"
+
+    job = store.claim("w2")
+    assert job.attempts == 2
+    assert store.fail(job_id, "w2", "second failure")
+    job = store.get(job_id)
+    assert (job["status"], job["error"]) == ("failed", "second failure")
+    assert store.claim("w3") is None
+
+
+def test_failure_without_retry_is_final(store):
+    job_id = store.enqueue("linkedin", {}, max_attempts=3)
+    store.claim("w1")
+    store.fail(job_id, "w1", "invalid payload", retry=False)
+    assert store.get(job_id)["status"] == "failed"
+    assert store.claim("w2") is None
+
+
+def test_expired_lease_is_reclaimed_and_the_old_worker_loses_the_job(store):
+    job_id = store.enqueue("linkedin", {})
+    store.claim("w1", lease_seconds=-1)  # already expired: w1 stopped heartbeating
+
+    job = store.claim("w2")
+    assert (job.id, job.attempts) == (job_id, 2)
+    # w1 is told to cancel its run, and cannot overwrite w2's outcome
+    assert not store.heartbeat(job_id, "w1")
+    assert not store.complete(job_id, "w1", {"type": "done"})
+    assert not store.fail(job_id, "w1", "late failure")
+    assert store.heartbeat(job_id, "w2")
+    assert store.complete(job_id, "w2", {"type": "done"})
+    assert store.get(job_id)["status"] == "succeeded"
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(store):
+    job_id = store.enqueue("linkedin", {}, max_attempts=1)
+    store.claim("w1", lease_seconds=-1)
+    assert store.claim("w2") is None
+    job = store.get(job_id)
+    assert (job["status"], job["error"]) == ("failed", "lease expired on final attempt")
+
+
+def test_heartbeat_extends_the_lease(store):
+    job_id = store.enqueue("linkedin", {})
+    store.claim("w1", lease_seconds=-1)
+    assert store.heartbeat(job_id, "w1", lease_seconds=60)
+    assert store.claim("w2") is None
+
+
+def test_unknown_job(store):
+    assert store.get("missing") is None
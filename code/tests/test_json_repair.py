@@ -0,0 +1,157 @@
+"""Tests for agent_runtime.json_repair: the reply shapes its docstring promises to recover."""
+
+import pytest
+from pydantic import BaseModel
+
+from agent_runtime.json_repair import extract_json, json_repair_stats, reset_json_repair_stats
+
+SCORE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "verdict": {"type": "string"},
+        "score": {"type": "number"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["verdict", "score", "tags"],
+}
+
+
+class Section(BaseModel):
+    name: str
+    research: bool
+
+
+class Plan(BaseModel):
+    title: str
+    sections: list[Section]
+
+
+class PlannedSection(BaseModel):
+    name: str
+    description: str
+    research: bool
+    content: str
+
+
+class Report(BaseModel):
+    """The shape of the report planner's reply (docgen_agent.agent.Report)."""
+
+    title: str
+    sections: list[PlannedSection]
+
+
+@pytest.fixture(autouse=True)
+def _clean_stats():
+    reset_json_repair_stats()
+    yield
+    reset_json_repair_stats()
+
+
+def test_plain_json_is_parsed_as_is():
+    assert extract_json('{"a": 1}', site="test") == {"a": 1}
+    assert json_repair_stats()["sites"]["test"] == {"parsed": 1, "repaired": 0, "failed": 0}
+
+
+def test_fenced_reply_with_prose():
+    reply = 'Here is the critique:\n```json\n{"verdict": "DONE", "score": 8}\n```\nLet me know!'
+    assert extract_json(reply) == {"verdict": "DONE", "score": 8}
+
+
+def test_object_inside_prose():
+    assert extract_json('Sure! {"a": [1, 2]} Hope that helps.') == {"a": [1, 2]}
+
+
+def test_trailing_commas():
+    assert extract_json('{"a": [1, 2, ], "b": 3, }') == {"a": [1, 2], "b": 3}
+
+
+def test_missing_commas():
+    assert extract_json('{"a": 1 "b": "x"\n"c": [1 2]}') == {"a": 1, "b": "x", "c": [1, 2]}
+
+
+def test_single_quotes():
+    assert extract_json("{'a': 'it\\'s', 'b': 'say \"hi\"'}") == {"a": "it's", "b": 'say "hi"'}
+
+
+def test_python_literals_comments_and_unquoted_keys():
+    reply = "{a: True, // a comment\n b: None, /* another */ c: False}"
+    assert extract_json(reply) == {"a": True, "b": None, "c": False}
+
+
+@pytest.mark.parametrize(
+    "reply, expected",
+    [
+        ('{"a": 1, "b": [1, 2', {"a": 1, "b": [1, 2]}),
+        ('{"a": 1, "b": "cut off', {"a": 1, "b": "cut off"}),
+        ('{"a": 1, "b":', {"a": 1}),
+        ('{"a": 1, "b', {"a": 1}),
+        ('{"a": [{"x": tr', {"a": [{"x": True}]}),
+    ],
+)
+def test_truncated_reply_is_closed(reply, expected):
+    assert extract_json(reply) == expected
+
+
+def test_schema_coercion():
+    reply = '{"Verdict": "CONTINUE", "Score": "8/10", "tags": "short"}'
+    assert extract_json(reply, SCORE_SCHEMA) == {"verdict": "CONTINUE", "score": 8.0, "tags": ["short"]}
+
+
+def test_schema_fills_missing_strings_and_lists():
+    assert extract_json('{"score": 7}', SCORE_SCHEMA) == {"score": 7, "verdict": "", "tags": []}
+
+
+def test_schema_skips_values_of_the_wrong_shape():
+    assert extract_json('Scores: [1, 2]. Critique: {"verdict": "DONE", "score": 9}', SCORE_SCHEMA) == {
+        "verdict": "DONE",
+        "score": 9,
+        "tags": [],
+    }
+
+
+def test_pydantic_schema_returns_a_validated_instance():
+    reply = "```\n{'Title': 'GPUs', 'sections': {'Name': 'Intro', 'research': 'no'}}\n```"
+    plan = extract_json(reply, Plan)
+    assert plan == Plan(title="GPUs", sections=[Section(name="Intro", research=False)])
+
+
+def test_pydantic_schema_fills_missing_fields_below_the_top_level():
+    reply = '{"title": "GPUs", "sections": [{"name": "Intro", "description": "d", "research": false}]}'
+    assert extract_json(reply, Report).sections[0].content == ""
+
+
+def test_plan_cut_off_after_the_title_is_rejected():
+    assert extract_json('{"title": "AI"', Report, site="report_planner", retried=True) is None
+    assert json_repair_stats()["retries_avoided"] == 0
+
+
+def test_plan_cut_off_in_a_section_is_rejected():
+    reply = '{"sections": [{"name": "Intro", "description": "d", "research": true}, {"name": "Bo'
+    # The inner section object must not stand in for the whole plan
+    assert extract_json(reply, Report, site="report_planner", retried=True) is None
+    assert json_repair_stats()["sites"]["report_planner"]["failed"] == 1
+
+
+def test_retried_dict_schema_does_not_fill_top_level_fields():
+    assert extract_json('{"score": 7}', SCORE_SCHEMA, retried=True) is None
+
+
+def test_object_without_schema_keys_is_skipped():
+    schema = {"type": "object", "properties": {"verdict": {"type": "string"}}, "required": ["verdict"]}
+    assert extract_json('{"notes": "x"}', schema) is None
+    assert extract_json('{"notes": "x"} then {"verdict": "DONE"}', schema) == {"verdict": "DONE"}
+
+
+def test_nothing_usable_returns_none():
+    assert extract_json("I cannot help with that.", SCORE_SCHEMA, site="test") is None
+    assert extract_json("", site="test") is None
+    assert json_repair_stats()["sites"]["test"]["failed"] == 2
+
+
+def test_repairs_count_as_retries_only_at_retried_sites():
+    extract_json('{"a": 1,}', site="planner", retried=True)
+    extract_json('{"a": 1,}', site="critic")
+    extract_json('{"a": 1,}', site="critic")
+    stats = json_repair_stats()
+    assert stats["retries_avoided"] == 1
+    assert stats["fallbacks_avoided"] == 2
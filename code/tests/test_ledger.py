@@ -0,0 +1,110 @@
+"""Tests for agent_runtime.ledger: token accounting and the degrade and abort budget policies."""
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from agent_runtime.ledger import Budget, BudgetExceeded, UsageLedger, budget_exhausted, ledger_config
+
+
+def reply(prompt_tokens: int | None = None, completion_tokens: int = 0) -> AIMessage:
+    if prompt_tokens is None:
+        return AIMessage(content="a reply of twenty-four ch")
+    usage = {"input_tokens": prompt_tokens, "output_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+    return AIMessage(content="reply", usage_metadata=usage)
+
+
+def model(*replies: AIMessage) -> GenericFakeChatModel:
+    return GenericFakeChatModel(messages=iter(replies))
+
+
+def test_counts_reported_tokens_and_prices_them():
+    # The fake model reports no model name, so it is priced as "unknown"
+    ledger = UsageLedger(Budget(), prices={"unknown": {"input": 1.0, "output": 2.0}})
+    chat = model(reply(100, 50), reply(10, 5))
+    chat.invoke("first", ledger_config(ledger))
+    chat.invoke("second", ledger_config(ledger))
+
+    summary = ledger.summary()
+    assert (summary["calls"], summary["prompt_tokens"], summary["completion_tokens"]) == (2, 110, 55)
+    assert summary["cost"] == pytest.approx((110 * 1.0 + 55 * 2.0) / 1_000_000)
+    assert summary["by_model"]["unknown"]["calls"] == 2
+    assert summary["estimated_calls"] == 0
+
+
+def test_estimates_tokens_when_the_endpoint_reports_none():
+    ledger = UsageLedger(Budget(), prices={})
+    model(reply()).invoke("x" * 40, ledger_config(ledger))
+    summary = ledger.summary()
+    assert summary["estimated_calls"] == 1
+    assert (summary["prompt_tokens"], summary["completion_tokens"]) == (10, 6)
+
+
+def test_under_budget_nothing_is_skipped():
+    ledger = UsageLedger(Budget(max_tokens=1000, on_exceed="degrade"), prices={})
+    config = ledger_config(ledger)
+    model(reply(10, 10)).invoke("x", config)
+    assert not ledger.exceeded
+    assert budget_exhausted(config, "refinement") is False
+
+
+def test_degrade_budget_skips_optional_steps_and_lets_calls_through():
+    ledger = UsageLedger(Budget(max_tokens=30, on_exceed="degrade"), prices={})
+    config = ledger_config(ledger)
+    chat = model(reply(20, 15), reply(5, 5))
+    chat.invoke("first", config)
+    assert ledger.exceeded
+
+    assert budget_exhausted(config, "refinement") is True
+    assert budget_exhausted(config, "refinement") is True
+    assert budget_exhausted(config, "research") is True
+    # Required calls still go through, and the run is not aborted
+    assert chat.invoke("second", config).content == "reply"
+    ledger.raise_if_aborted()
+    assert ledger.summary()["budget"]["skipped"] == ["refinement", "research"]
+
+
+def test_abort_budget_fails_the_next_call_and_skips_nothing():
+    ledger = UsageLedger(Budget(max_tokens=30, on_exceed="abort"), prices={})
+    config = ledger_config(ledger)
+    chat = model(reply(20, 15), reply(5, 5))
+    chat.invoke("first", config)
+
+    assert budget_exhausted(config, "refinement") is False
+    with pytest.raises(BudgetExceeded) as raised:
+        chat.invoke("second", config)
+    assert raised.value.usage["total_tokens"] == 35
+    with pytest.raises(BudgetExceeded):
+        ledger.raise_if_aborted()
+    assert ledger.summary()["budget"]["skipped"] == []
+
+
+def test_cost_budget():
+    ledger = UsageLedger(Budget(max_cost=0.001, on_exceed="degrade"), prices={"unknown": {"input": 10.0}})
+    model(reply(200, 0)).invoke("x", ledger_config(ledger))
+    assert ledger.exceeded
+
+
+def test_cached_replies_do_not_count_against_the_budget():
+    ledger = UsageLedger(Budget(max_tokens=30, on_exceed="abort"), prices={})
+    cached = reply(50, 50)
+    # The response cache marks replayed generations with generation_info["cached"]
+    ledger.on_chat_model_start({}, [[]], run_id=ledger.run_id)
+    ledger.on_llm_end(
+        LLMResult(generations=[[ChatGeneration(message=cached, generation_info={"cached": True})]]),
+        run_id=ledger.run_id,
+    )
+    assert not ledger.exceeded
+    assert ledger.summary()["cached"]["total_tokens"] == 100
+    assert ledger.summary()["total_tokens"] == 0
+
+
+def test_budget_exhausted_without_a_ledger():
+    assert budget_exhausted(None, "refinement") is False
+    assert budget_exhausted({"callbacks": []}, "refinement") is False
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        Budget(on_exceed="ignore")
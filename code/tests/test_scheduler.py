@@ -0,0 +1,145 @@
+"""Tests for agent_runtime.scheduler: priority classes, aging and fair sharing between flows."""
+
+import asyncio
+
+from agent_runtime.scheduler import LLMScheduler, llm_priority
+
+
+async def grant_order(scheduler: LLMScheduler, calls: list[tuple], wait: float = 0.0) -> list[str]:
+    """Queue (name, class, flow[, weight]) calls behind one held slot, in order, and return the
+    order they ran in.
+
+    `wait` is how long the queue stands before the held slot is released.
+    """
+    order: list[str] = []
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with scheduler.slot():
+            await release.wait()
+
+    async def call(name: str, cls: str, flow: str, weight: float = 1.0) -> None:
+        with llm_priority(cls, flow=flow, weight=weight):
+            async with scheduler.slot():
+                order.append(name)
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    tasks = []
+    for spec in calls:
+        tasks.append(asyncio.create_task(call(*spec)))
+        await asyncio.sleep(0)  # queue them in list order
+    await asyncio.sleep(wait)
+    release.set()
+    await asyncio.gather(holder, *tasks)
+    assert scheduler.active == 0
+    return order
+
+
+def test_free_slots_are_granted_without_queueing():
+    async def run() -> int:
+        scheduler = LLMScheduler(max_concurrent=2)
+        async with scheduler.slot(), scheduler.slot():
+            return scheduler.active
+
+    assert asyncio.run(run()) == 2
+
+
+def test_higher_classes_go_first():
+    calls = [("background", "background", "a"), ("batch", "batch", "b"), ("interactive", "interactive", "c")]
+    order = asyncio.run(grant_order(LLMScheduler(max_concurrent=1, aging_seconds=0), calls))
+    assert order == ["interactive", "batch", "background"]
+
+
+def test_flows_in_a_class_take_turns():
+    calls = [("a1", "batch", "a"), ("a2", "batch", "a"), ("a3", "batch", "a"), ("b1", "batch", "b"), ("b2", "batch", "b")]
+    order = asyncio.run(grant_order(LLMScheduler(max_concurrent=1, aging_seconds=0), calls))
+    assert order == ["a1", "b1", "a2", "b2", "a3"]
+
+
+def test_weighted_flow_gets_a_larger_share():
+    calls = [("a1", "batch", "a"), ("a2", "batch", "a"), ("h1", "batch", "h", 2), ("h2", "batch", "h", 2), ("h3", "batch", "h", 2)]
+    order = asyncio.run(grant_order(LLMScheduler(max_concurrent=1, aging_seconds=0), calls))
+    # Finish tags: a at 1 and 2, h at 0.5, 1 and 1.5
+    assert order == ["h1", "a1", "h2", "h3", "a2"]
+
+
+def test_waiting_lifts_a_call_one_class_per_aging_period():
+    calls = [("background", "background", "a"), ("interactive", "interactive", "b")]
+    scheduler = LLMScheduler(max_concurrent=1, aging_seconds=0.05)
+    # The interactive call is queued last, but after two periods the background one ranks with it and was first
+    order = asyncio.run(grant_order(scheduler, calls, wait=0.12))
+    assert order == ["background", "interactive"]
+    assert scheduler.stats()["classes"]["background"]["aged"] == 1
+
+
+def test_without_aging_lower_classes_wait():
+    calls = [("background", "background", "a"), ("interactive", "interactive", "b")]
+    scheduler = LLMScheduler(max_concurrent=1, aging_seconds=0)
+    assert asyncio.run(grant_order(scheduler, calls, wait=0.12)) == ["interactive", "background"]
+    assert scheduler.stats()["classes"]["background"]["aged"] == 0
+
+
+def test_cancelled_waiter_does_not_hold_a_slot():
+    async def run() -> tuple[list[str], int]:
+        scheduler = LLMScheduler(max_concurrent=1)
+        order: list[str] = []
+        release = asyncio.Event()
+
+        async def hold() -> None:
+            async with scheduler.slot():
+                await release.wait()
+
+        async def call(name: str) -> None:
+            async with scheduler.slot():
+                order.append(name)
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(call("cancelled"))
+        kept = asyncio.create_task(call("kept"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(holder, kept)
+        return order, scheduler.active
+
+    assert asyncio.run(run()) == (["kept"], 0)
+
+
+def test_configure_releases_waiters():
+    async def run() -> list[str]:
+        scheduler = LLMScheduler(max_concurrent=1)
+        order: list[str] = []
+        release = asyncio.Event()
+
+        async def hold() -> None:
+            async with scheduler.slot():
+                await release.wait()
+
+        async def call() -> None:
+            async with scheduler.slot():
+                order.append("waiter")
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(call())
+        await asyncio.sleep(0)
+        assert order == []
+        scheduler.configure(2)
+        await waiter
+        release.set()
+        await holder
+        return order
+
+    assert asyncio.run(run()) == ["waiter"]
+
+
+def test_stats_count_grants_and_queue_depth():
+    scheduler = LLMScheduler(max_concurrent=1, aging_seconds=0)
+    asyncio.run(grant_order(scheduler, [("a", "interactive", "a"), ("b", "batch", "b")]))
+    classes = scheduler.stats()["classes"]
+    # The held slot itself was a batch grant
+    assert (classes["interactive"]["granted"], classes["batch"]["granted"]) == (1, 2)
+    assert classes["interactive"]["queued"] == classes["batch"]["queued"] == 0
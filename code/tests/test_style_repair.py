@@ -0,0 +1,28 @@
+"""Tests for linkedin_agent.style_repair: the closing hashtag block after repair."""
+
+from linkedin_agent.style_repair import fit_hashtags, repair_draft
+
+BODY = "A post body that is long enough to keep. " * 15
+
+
+def closing_tags(draft: str) -> list[str]:
+    return draft.rstrip().rsplit("\n", 1)[-1].split()
+
+
+def test_short_and_numeric_tags_are_kept():
+    draft, notes = repair_draft(f"{BODY}\n\n#X #5G #AI #ai #Cloud", 3, 1, [])
+    assert closing_tags(draft) == ["#X", "#5G", "#AI", "#Cloud"]
+    assert notes[-1] == "removed 1 duplicate hashtag(s)"
+
+
+def test_tags_over_the_band_are_trimmed_keeping_trending_first():
+    tags, notes = fit_hashtags(BODY, ["#X", "#5", "#AI", "#Cloud", "#Data", "#ML"], 3, 5, ["#ml"])
+    assert tags == ["#X", "#5", "#AI", "#Cloud", "#ml"]
+    assert notes == ["removed 1 hashtag(s) over the limit of 5"]
+
+
+def test_a_block_within_the_band_keeps_its_tags():
+    # The emoji repair rewrites the draft; the hashtags come through unchanged
+    draft, notes = repair_draft(f"{BODY.strip()}\n\n#X #5G #AI", 3, 1, [])
+    assert closing_tags(draft) == ["#X", "#5G", "#AI"]
+    assert not any("hashtag" in note for note in notes)
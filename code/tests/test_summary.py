@@ -0,0 +1,36 @@
+"""Tests for agent_runtime.summary: collecting the subsystem lines of the batch summary."""
+
+import pytest
+
+from agent_runtime import summary
+from agent_runtime.summary import summary_line, summary_lines
+
+
+@pytest.fixture(autouse=True)
+def providers(monkeypatch):
+    monkeypatch.setattr(summary, "_LINES", [])
+
+
+def test_lines_come_out_in_registration_order_without_empty_ones():
+    summary_line(lambda: "first")
+    summary_line(lambda: None)
+    summary_line(lambda: "")
+    summary_line(lambda: "second")
+    assert summary_lines() == ["first", "second"]
+
+
+def test_a_provider_is_registered_once():
+    def line() -> str:
+        return "line"
+
+    assert summary_line(summary_line(line)) is line
+    assert summary_lines() == ["line"]
+
+
+def test_a_failing_provider_is_skipped():
+    @summary_line
+    def broken() -> str:
+        raise KeyError("stats")
+
+    summary_line(lambda: "kept")
+    assert summary_lines() == ["kept"]